@@ -30,12 +30,254 @@ Utility functions to interact with the database.
 '''
 
 import sqlalchemy as sqa
+import csv
+import io
 import logging
+import os
 import re
+import tempfile
 
 logger_name = __name__
 logger = logging.getLogger(logger_name)
 
+# The number of rows written with one statement by the bulk insertion
+# functions. The optimal value depends on the database and the size of the
+# rows. To tune it, time the import of a representative dataset (e.g. a
+# bulletin with the event import node) for a sweep of batch sizes
+# (e.g. 100, 1000, 10000, 100000) and use the fastest one. The value can be
+# set using the PSYSMON_EVENT_BATCH_SIZE environment variable.
+default_batch_size = 10000
+
+
+def get_batch_size(value):
+    ''' Validate the batch size of the bulk insertion functions.
+
+    Parameters
+    ----------
+    value : str
+        The batch size (e.g. the value of the environment variable).
+
+    Returns
+    -------
+    int
+        The batch size. If the value is not a positive integer,
+        :data:`default_batch_size` is returned.
+    '''
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        size = None
+
+    if size is None or size <= 0:
+        logger.warning("Invalid batch size %s. Using the default batch size %d.",
+                       value, default_batch_size)
+        size = default_batch_size
+
+    return size
+
+
+batch_size = get_batch_size(os.environ.get('PSYSMON_EVENT_BATCH_SIZE',
+                                           str(default_batch_size)))
+
+# Use LOAD DATA LOCAL INFILE for the native bulk loading of MySQL
+# databases. Loading local files has to be enabled for the database
+# connection, which allows the server to request files from the client.
+# It is therefore disabled by default and can be enabled by setting the
+# PSYSMON_MYSQL_LOCAL_INFILE environment variable to 1.
+mysql_local_infile = os.environ.get('PSYSMON_MYSQL_LOCAL_INFILE', '0') == '1'
+
+# The INSERT statements used for bulk insertion. The key is the table.
+insert_statements = {}
+
+# The cache of the compiled statements used for bulk insertion. Shared by
+# all connections, the key contains the dialect.
+compiled_cache = {}
+
+
+def get_insert_statement(table):
+    ''' Get the cached INSERT statement of a table.
+
+    Parameters
+    ----------
+    table : :class:`sqlalchemy.schema.Table`
+        The database table.
+
+    Returns
+    -------
+    :class:`sqlalchemy.sql.expression.Insert`
+        The INSERT statement of the table.
+    '''
+    if table not in insert_statements:
+        insert_statements[table] = table.insert()
+    return insert_statements[table]
+
+
+def chunked(rows, size = None):
+    ''' Split the rows into chunks of a given size.
+
+    Parameters
+    ----------
+    rows : :obj:`list`
+        The rows to split.
+
+    size : int
+        The size of the chunks. If None, the module batch_size is used.
+
+    Returns
+    -------
+    generator of :obj:`list`
+        The chunks of the rows.
+    '''
+    if size is None:
+        size = batch_size
+
+    for k in range(0, len(rows), size):
+        yield rows[k:k + size]
+
+
+def bulk_insert(connection, table, rows):
+    ''' Insert rows into a table using executemany INSERT statements.
+
+    The INSERT statement is created once per table and compiled once per
+    dialect. The rows are inserted in chunks of :data:`batch_size` rows.
+
+    Parameters
+    ----------
+    connection : :class:`sqlalchemy.engine.Connection`
+        The database connection.
+
+    table : :class:`sqlalchemy.schema.Table`
+        The database table.
+
+    rows : :obj:`list` of :obj:`dict`
+        The rows to insert. The keys are the column names.
+    '''
+    if not rows:
+        return
+
+    connection = connection.execution_options(compiled_cache = compiled_cache)
+    insert_statement = get_insert_statement(table)
+    for cur_chunk in chunked(rows):
+        connection.execute(insert_statement, cur_chunk)
+
+
+def bulk_load(connection, table, rows):
+    ''' Load a large number of rows using the native loader of the database.
+
+    PostgreSQL databases are loaded using COPY FROM STDIN, MySQL databases
+    using LOAD DATA LOCAL INFILE if :data:`mysql_local_infile` is enabled.
+    This bypasses the parameter handling of the database driver. The native
+    loading is done within a SAVEPOINT. If it fails, the database is rolled
+    back to the SAVEPOINT and the rows are inserted using
+    :func:`bulk_insert`. For other dialects :func:`bulk_insert` is used
+    directly.
+
+    Parameters
+    ----------
+    connection : :class:`sqlalchemy.engine.Connection`
+        The database connection.
+
+    table : :class:`sqlalchemy.schema.Table`
+        The database table.
+
+    rows : :obj:`list` of :obj:`dict`
+        The rows to insert. The keys are the column names.
+    '''
+    if not rows:
+        return
+
+    loader = get_native_loader(connection.dialect.name)
+    if loader is not None:
+        columns = list(rows[0].keys())
+        savepoint = connection.begin_nested()
+        try:
+            loader(connection, table, columns, rows)
+        except Exception:
+            savepoint.rollback()
+            logger.exception('Native bulk loading of table %s failed. Using INSERT statements.',
+                             table.name)
+        else:
+            savepoint.commit()
+            return
+
+    bulk_insert(connection, table, rows)
+
+
+def get_native_loader(dialect_name):
+    ''' Get the native bulk loading function of a database dialect.
+
+    Parameters
+    ----------
+    dialect_name : str
+        The name of the SQLAlchemy dialect.
+
+    Returns
+    -------
+    function
+        The loader function or None if no native loader is available.
+    '''
+    if dialect_name == 'mysql' and not mysql_local_infile:
+        return None
+    return native_loaders.get(dialect_name, None)
+
+
+def postgresql_copy(connection, table, columns, rows):
+    ''' Load the rows into a PostgreSQL table using COPY FROM STDIN.
+    '''
+    cursor = connection.connection.cursor()
+    try:
+        for cur_chunk in chunked(rows):
+            csv_buffer = io.StringIO()
+            csv_writer = csv.writer(csv_buffer)
+            csv_writer.writerows([[x[y] for y in columns] for x in cur_chunk])
+            csv_buffer.seek(0)
+            cursor.copy_expert('COPY %s (%s) FROM STDIN WITH CSV' % (table.name,
+                                                                     ','.join(columns)),
+                               csv_buffer)
+    finally:
+        cursor.close()
+
+
+def mysql_load_data(connection, table, columns, rows):
+    ''' Load the rows into a MySQL table using LOAD DATA LOCAL INFILE.
+    '''
+    csv_file = tempfile.NamedTemporaryFile(mode = 'w',
+                                           encoding = 'utf-8',
+                                           newline = '',
+                                           suffix = '.csv',
+                                           delete = False)
+    try:
+        with csv_file:
+            for cur_row in rows:
+                csv_file.write(','.join([mysql_csv_value(cur_row[x]) for x in columns]) + '\n')
+        connection.execute(sqa.text("LOAD DATA LOCAL INFILE '%s' INTO TABLE %s "
+                                    "CHARACTER SET utf8 "
+                                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                                    "LINES TERMINATED BY '\\n' (%s)" % (csv_file.name.replace('\\', '/'),
+                                                                         table.name,
+                                                                         ','.join(columns))))
+    finally:
+        os.remove(csv_file.name)
+
+
+# The native bulk loading functions. The key is the dialect name.
+native_loaders = {'postgresql': postgresql_copy,
+                  'mysql': mysql_load_data}
+
+
+def mysql_csv_value(value):
+    ''' Format a value for the MySQL LOAD DATA file.
+    '''
+    if value is None:
+        return 'NULL'
+    elif isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    elif isinstance(value, bool):
+        return '1' if value else '0'
+    else:
+        return str(value)
+
+
 def db_table_migration(engine, table, prefix):
     ''' Check if a database table migration is needed and apply the changes.
     '''
@@ -128,6 +370,21 @@ def update_db_table(engine, table, metadata, prefix):
                                fk_symbol = cur_key.name)
 
 
+    # Check for changed table options.
+    for cur_option in ['mysql_row_format', 'mysql_key_block_size']:
+        new_value = new_table.dialect_kwargs.get(cur_option)
+        exist_value = exist_table.dialect_kwargs.get(cur_option)
+        if new_value is not None and str(new_value).upper() != str(exist_value).upper():
+            if not table_updated:
+                logger.info('A database table migration is needed.')
+            logger.info('Changing the table option %s of table %s from %s to %s.',
+                        cur_option, table.__table__.name, exist_value, new_value)
+            change_table_option(engine = engine,
+                                table = table,
+                                option = cur_option,
+                                value = new_value)
+            table_updated = True
+
     # Remove all unique contraints.
     insp = sqa.inspect(engine)
     unique_const = insp.get_unique_constraints(exist_table.name)
@@ -212,6 +469,14 @@ def change_column_type(engine, table, column):
     engine.execute('ALTER TABLE %s MODIFY %s %s' % (table_name, column.name, column_type))
 
 
+def change_table_option(engine, table, option, value):
+    ''' Change a MySQL table option (e.g. mysql_row_format).
+    '''
+    table_name = table.__table__.name
+    option_name = option.replace('mysql_', '', 1).upper()
+    engine.execute('ALTER TABLE %s %s=%s' % (table_name, option_name, value))
+
+
 def add_foreign_key(engine, table, columns, target_table, target_columns, on_update, on_delete):
     ''' Add a foreign key constraint.
     '''
@@ -45,3 +45,51 @@ clib_signal.moving_average.argtypes = [ctypes.c_int,
                                        np.ctypeslib.ndpointer(dtype = np.float64,
                                                               ndim=1,
                                                               flags='C_CONTIGUOUS')]
+
+# Define the sta_lta types.
+clib_signal.sta_lta.argtypes = [ctypes.c_long,
+                                ctypes.c_long,
+                                ctypes.c_long,
+                                np.ctypeslib.ndpointer(dtype = np.float32,
+                                                       ndim=1,
+                                                       flags='C_CONTIGUOUS'),
+                                np.ctypeslib.ndpointer(dtype = np.float64,
+                                                       ndim=1,
+                                                       flags='C_CONTIGUOUS'),
+                                np.ctypeslib.ndpointer(dtype = np.float64,
+                                                       ndim=1,
+                                                       flags='C_CONTIGUOUS'),
+                                np.ctypeslib.ndpointer(dtype = np.float64,
+                                                       ndim=1,
+                                                       flags='C_CONTIGUOUS')]
+
+# Define the threshold_limits types.
+clib_signal.threshold_limits.argtypes = [ctypes.c_long,
+                                         np.ctypeslib.ndpointer(dtype = np.float64,
+                                                                ndim=1,
+                                                                flags='C_CONTIGUOUS'),
+                                         ctypes.c_double,
+                                         np.ctypeslib.ndpointer(dtype = ctypes.c_long,
+                                                                ndim=1,
+                                                                flags='C_CONTIGUOUS'),
+                                         np.ctypeslib.ndpointer(dtype = ctypes.c_long,
+                                                                ndim=1,
+                                                                flags='C_CONTIGUOUS')]
+clib_signal.threshold_limits.restype = ctypes.c_long
+
+# Define the sta_lta_limits types.
+clib_signal.sta_lta_limits.argtypes = [ctypes.c_long,
+                                       np.ctypeslib.ndpointer(dtype = np.float64,
+                                                              ndim=1,
+                                                              flags='C_CONTIGUOUS'),
+                                       ctypes.c_int,
+                                       ctypes.c_long,
+                                       ctypes.c_long,
+                                       ctypes.c_double,
+                                       np.ctypeslib.ndpointer(dtype = ctypes.c_long,
+                                                              ndim=1,
+                                                              flags='C_CONTIGUOUS'),
+                                       np.ctypeslib.ndpointer(dtype = ctypes.c_long,
+                                                              ndim=1,
+                                                              flags='C_CONTIGUOUS')]
+clib_signal.sta_lta_limits.restype = ctypes.c_long
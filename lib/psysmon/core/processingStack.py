@@ -36,6 +36,8 @@ import itertools
 import weakref
 import logging
 
+from obspy.core import Stream
+
 import psysmon
 from psysmon.core.preferences_manager import PreferencesManager
 
@@ -187,6 +189,32 @@ class ProcessingStack(object):
                 curNode.execute(stream, process_limits, origin_resource)
 
 
+    def execute_batch(self, streams, process_limits = None, origin_resource = None):
+        ''' Execute the stack for multiple streams.
+
+        The traces of all streams are combined into one stream. Each
+        processing node is executed once for the combined stream instead
+        of once per stream.
+
+        Parameters
+        ----------
+        streams : :obj:`list` of :class:`obspy.core.Stream`
+            The data to process.
+
+        Returns
+        -------
+        :class:`obspy.core.Stream`
+            The processed traces of all streams.
+        '''
+        batch_stream = Stream()
+        for cur_stream in streams:
+            batch_stream += cur_stream
+
+        self.execute(batch_stream, process_limits, origin_resource)
+
+        return batch_stream
+
+
     def clear_results(self):
         ''' Clear the results of all processing nodes.
         '''
@@ -316,6 +316,10 @@ class Project(object):
         # The sqlAlchemy database base instance.
         self.dbBase = None
 
+        # The mapper classes created by the package databaseFactory
+        # functions for the current dbBase. The key is the package name.
+        self.db_factory_tables = {}
+
         # The sqlAlchemy database session.
         self.dbSessionClass = None
 
@@ -424,6 +428,7 @@ class Project(object):
         result['dbEngine'] = None
         result['dbSessionClass'] = None
         result['dbBase'] = None
+        result['db_factory_tables'] = {}
         result['dbMetaData'] = None
         result['dbTables'] = {}
         result['waveclient'] = {}
@@ -653,10 +658,16 @@ class Project(object):
         # Set the character encoding of the database queries.
         engineString = engineString + "?charset=utf8"
 
+        # Allow the bulk loading of local files (LOAD DATA LOCAL INFILE) if
+        # it has been enabled.
+        if self.dbDialect == 'mysql' and db_util.mysql_local_infile:
+            engineString = engineString + "&local_infile=1"
+
         self.dbEngine = create_engine(engineString)
         self.dbEngine.echo = False
         self.dbMetaData = MetaData(self.dbEngine)
         self.dbBase = declarative_base(metadata = self.dbMetaData)
+        self.db_factory_tables = {}
         self.dbSessionClass = sessionmaker(bind=self.dbEngine)
 
 
@@ -872,12 +883,20 @@ class Project(object):
                 continue
             else:
                 self.logger.info("%s: databaseFactory found. Retrieving the table definitions.", curPkg.name)
-                tables = curPkg.databaseFactory(self.dbBase)
+                # The mapper classes can be declared only once for a
+                # declarative base. Reuse the classes already created for
+                # the current base.
+                if curPkg.name in self.db_factory_tables:
+                    tables = self.db_factory_tables[curPkg.name]
+                else:
+                    tables = curPkg.databaseFactory(self.dbBase)
+                    for curTable in tables:
+                        # Add the table prefix.
+                        curTable.__table__.name = self.slug + "_" + curTable.__table__.name
+                    self.db_factory_tables[curPkg.name] = tables
 
                 for curTable in tables:
-                    # Add the table prefix.
-                    curName = curTable.__table__.name
-                    curTable.__table__.name = self.slug + "_" + curTable.__table__.name
+                    curName = curTable.__table__.name[len(self.slug) + 1:]
                     table_version_changed = False
                     update_success = True
 
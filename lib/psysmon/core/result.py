@@ -602,13 +602,17 @@ class Grid2dResult(Result):
 class ShelveResult(Result):
     ''' A shelve dictionary result.
     '''
-    def __init__(self, db, **kwargs):
+    def __init__(self, db, protocol = None, **kwargs):
         ''' Initialize the instance.
 
         Parameters
         ----------
         db : Dictionary
             The pickle-able instances.
+
+        protocol : int
+            The pickle protocol used by the shelve. If None, the default
+            protocol of the shelve module is used.
         '''
         Result.__init__(self, **kwargs)
 
@@ -616,6 +620,8 @@ class ShelveResult(Result):
             raise ValueError("db has to be a dictionary.")
         self.db = db
 
+        self.protocol = protocol
+
         self.filename_ext = 'db'
 
 
@@ -644,7 +650,7 @@ class ShelveResult(Result):
 
         filename = os.path.join(self.output_dir, self.filename)
 
-        db = shelve.open(filename)
+        db = shelve.open(filename, protocol = self.protocol)
         db.update(self.db)
         db.close()
 
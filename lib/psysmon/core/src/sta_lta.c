@@ -0,0 +1,206 @@
+// LICENSE
+//
+// This file is part of pSysmon.
+//
+// If you use pSysmon in any program or publication, please inform and
+// acknowledge its author Stefan Mertl (stefan@mertl-research.at).
+//
+// pSysmon is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+// copyright: Stefan Mertl
+
+#include <math.h>
+
+// Compute the classic STA/LTA of a characteristic function.
+//
+// The STA and LTA windows end at the same sample. The first value of the
+// output arrays belongs to the sample n_lta - 1 of the characteristic
+// function, so the output arrays have to hold n_cf - n_lta + 1 values.
+// The characteristic function is passed in single precision, the window
+// sums are accumulated in double precision.
+int sta_lta(const long n_cf, const long n_sta, const long n_lta,
+            const float *cf, double *sta, double *lta, double *thrf)
+{
+    long i;
+    long k;
+    long n_out;
+    double sta_sum = 0.;
+    double lta_sum = 0.;
+
+    if ((n_sta < 1) || (n_lta <= n_sta) || (n_cf < n_lta)) {
+        return -1;
+    }
+
+    // Sum up the first windows.
+    for (k = 0; k < n_lta; k++) {
+        lta_sum += cf[k];
+        if (k >= n_lta - n_sta) {
+            sta_sum += cf[k];
+        }
+    }
+
+    n_out = n_cf - n_lta + 1;
+    for (i = 0; i < n_out; i++) {
+        if (i > 0) {
+            k = i + n_lta - 1;
+            sta_sum += cf[k] - cf[k - n_sta];
+            lta_sum += cf[k] - cf[k - n_lta];
+        }
+
+        sta[i] = sta_sum / n_sta;
+        lta[i] = lta_sum / n_lta;
+
+        if (lta[i] > 0.) {
+            thrf[i] = sta[i] / lta[i];
+        }
+        else {
+            thrf[i] = 0.;
+        }
+    }
+
+    return 0;
+}
+
+
+// Find the limits of the intervals in which the threshold function reaches
+// the threshold.
+//
+// The start index is the first sample with thrf >= thr, the end index is the
+// first following sample with thrf < thr. An interval which is still active
+// at the end of the data ends with n_thrf. The starts and ends arrays have
+// to hold n_thrf / 2 + 1 values. Returns the number of intervals found.
+long threshold_limits(const long n_thrf, const double *thrf, const double thr,
+                      long *starts, long *ends)
+{
+    long k;
+    long n_limits = 0;
+    int triggered = 0;
+
+    for (k = 0; k < n_thrf; k++) {
+        if (triggered == 0) {
+            if (thrf[k] >= thr) {
+                starts[n_limits] = k;
+                triggered = 1;
+            }
+        }
+        else if (thrf[k] < thr) {
+            ends[n_limits] = k;
+            n_limits++;
+            triggered = 0;
+        }
+    }
+
+    if (triggered == 1) {
+        ends[n_limits] = n_thrf;
+        n_limits++;
+    }
+
+    return n_limits;
+}
+
+
+// Compute the characteristic function value of a data sample.
+//
+// The value is computed in single precision like the characteristic
+// function used by sta_lta.
+static float cf_value(const double x, const int cf_type)
+{
+    float xf = (float) x;
+
+    if (cf_type == 0) {
+        return fabsf(xf);
+    }
+
+    return xf * xf;
+}
+
+
+// Compute the limits of the intervals in which the STA/LTA of the data
+// reaches the threshold.
+//
+// This combines the characteristic function, sta_lta and threshold_limits
+// in one pass over the data without storing any intermediate arrays. The
+// characteristic function is the absolute value (cf_type = 0) or the square
+// (cf_type = 1) of the data. The limits refer to the STA/LTA values as
+// returned by sta_lta. The starts and ends arrays have to hold
+// (n_data - n_lta + 1) / 2 + 1 values. Returns the number of intervals found
+// or -1 if the window lengths are not valid.
+long sta_lta_limits(const long n_data, const double *data, const int cf_type,
+                    const long n_sta, const long n_lta, const double thr,
+                    long *starts, long *ends)
+{
+    long i;
+    long k;
+    long n_out;
+    long n_limits = 0;
+    int triggered = 0;
+    double sta_sum = 0.;
+    double lta_sum = 0.;
+    float cur_cf;
+    double cur_sta;
+    double cur_lta;
+    double cur_thrf;
+
+    if ((n_sta < 1) || (n_lta <= n_sta) || (n_data < n_lta)) {
+        return -1;
+    }
+
+    // Sum up the first windows.
+    for (k = 0; k < n_lta; k++) {
+        cur_cf = cf_value(data[k], cf_type);
+        lta_sum += cur_cf;
+        if (k >= n_lta - n_sta) {
+            sta_sum += cur_cf;
+        }
+    }
+
+    n_out = n_data - n_lta + 1;
+    for (i = 0; i < n_out; i++) {
+        if (i > 0) {
+            k = i + n_lta - 1;
+            cur_cf = cf_value(data[k], cf_type);
+            sta_sum += cur_cf - cf_value(data[k - n_sta], cf_type);
+            lta_sum += cur_cf - cf_value(data[k - n_lta], cf_type);
+        }
+
+        cur_sta = sta_sum / n_sta;
+        cur_lta = lta_sum / n_lta;
+        if (cur_lta > 0.) {
+            cur_thrf = cur_sta / cur_lta;
+        }
+        else {
+            cur_thrf = 0.;
+        }
+
+        if (triggered == 0) {
+            if (cur_thrf >= thr) {
+                starts[n_limits] = i;
+                triggered = 1;
+            }
+        }
+        else if (cur_thrf < thr) {
+            ends[n_limits] = i;
+            n_limits++;
+            triggered = 0;
+        }
+    }
+
+    if (triggered == 1) {
+        ends[n_limits] = n_out;
+        n_limits++;
+    }
+
+    return n_limits;
+}
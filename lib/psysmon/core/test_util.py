@@ -40,6 +40,11 @@ from psysmon.packages.geometry.db_inventory import DbInventory
 from obspy.core.utcdatetime import UTCDateTime
 
 
+# Log the SQL statements of the test database engines only if requested
+# with the PSYSMON_SQL_ECHO environment variable.
+sql_echo = bool(os.environ.get('PSYSMON_SQL_ECHO'))
+
+
 def create_psybase(package_directory = None, **kwargs):
     ''' Create the psysmon base instance.
 
@@ -250,7 +255,7 @@ def clear_database_tables(db_dialect, db_driver, db_user, db_pwd, db_host, db_na
         engine_string = dialect_string + "://" + db_user + "@" + db_host + "/" + db_name
 
     db_engine = create_engine(engine_string)
-    db_engine.echo = True
+    db_engine.echo = sql_echo
     db_metadata = MetaData(db_engine)
 
     db_metadata.reflect(db_engine)
@@ -275,7 +280,7 @@ def drop_database_tables(db_dialect, db_driver, db_user, db_pwd, db_host, db_nam
         engine_string = dialect_string + "://" + db_user + "@" + db_host + "/" + db_name
 
     db_engine = create_engine(engine_string)
-    db_engine.echo = True
+    db_engine.echo = sql_echo
     db_metadata = MetaData(db_engine)
 
     db_metadata.reflect(db_engine)
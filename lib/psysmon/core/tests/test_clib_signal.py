@@ -5,6 +5,7 @@ Created on May 17, 2011
 '''
 from __future__ import print_function
 
+import ctypes
 import unittest
 import psysmon.core.lib_signal as lib_signal
 import numpy as np
@@ -60,6 +61,68 @@ class CLibSignalTestCase(unittest.TestCase):
         np_test.assert_almost_equal(np.min(avg[9:]), 2)
 
 
+    def test_sta_lta(self):
+        ''' Test the STA/LTA function.
+        '''
+        clib_signal = lib_signal.clib_signal
+
+        n_sta = 2
+        n_lta = 4
+        cf = np.ascontiguousarray([1, 1, 1, 1, 5, 5, 1, 1], dtype = np.float32)
+        n_cf = len(cf)
+        n_out = n_cf - n_lta + 1
+        sta = np.empty(n_out, dtype = np.float64)
+        lta = np.empty(n_out, dtype = np.float64)
+        thrf = np.empty(n_out, dtype = np.float64)
+        ret_val = clib_signal.sta_lta(n_cf, n_sta, n_lta, cf, sta, lta, thrf)
+
+        self.assertEqual(ret_val, 0)
+        np_test.assert_almost_equal(sta, [1, 3, 5, 3, 1])
+        np_test.assert_almost_equal(lta, [1, 2, 3, 3, 3])
+        np_test.assert_almost_equal(thrf, [1, 1.5, 5/3., 1, 1/3.])
+
+        # The LTA has to be longer than the STA.
+        ret_val = clib_signal.sta_lta(n_cf, n_lta, n_sta, cf, sta, lta, thrf)
+        self.assertEqual(ret_val, -1)
+
+
+    def test_threshold_limits(self):
+        ''' Test the threshold limits function.
+        '''
+        clib_signal = lib_signal.clib_signal
+
+        thrf = np.ascontiguousarray([1, 3, 3, 1, 1, 4, 1, 5], dtype = np.float64)
+        n_thrf = len(thrf)
+        starts = np.empty(n_thrf // 2 + 1, dtype = ctypes.c_long)
+        ends = np.empty(n_thrf // 2 + 1, dtype = ctypes.c_long)
+        n_limits = clib_signal.threshold_limits(n_thrf, thrf, 3, starts, ends)
+
+        self.assertEqual(n_limits, 3)
+        np_test.assert_equal(starts[:n_limits], [1, 5, 7])
+        np_test.assert_equal(ends[:n_limits], [3, 6, 8])
+
+
+    def test_sta_lta_limits(self):
+        ''' Test the combined STA/LTA limits function.
+        '''
+        clib_signal = lib_signal.clib_signal
+
+        n_sta = 2
+        n_lta = 4
+        data = np.ascontiguousarray([1, -1, 1, -1, 5, -5, 1, -1], dtype = np.float64)
+        n_data = len(data)
+        n_max = (n_data - n_lta + 1) // 2 + 1
+        starts = np.empty(n_max, dtype = ctypes.c_long)
+        ends = np.empty(n_max, dtype = ctypes.c_long)
+        n_limits = clib_signal.sta_lta_limits(n_data, data, 0, n_sta, n_lta,
+                                              1.5, starts, ends)
+
+        # The STA/LTA of the absolute values is [1, 1.5, 5/3., 1, 1/3.].
+        self.assertEqual(n_limits, 1)
+        self.assertEqual(starts[0], 1)
+        self.assertEqual(ends[0], 3)
+
+
 def suite():
     return unittest.makeSuite(CLibSignalTestCase, 'test')
 
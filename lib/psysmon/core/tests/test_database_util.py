@@ -0,0 +1,142 @@
+'''
+Created on Oct 16, 2026
+
+@author: Stefan Mertl
+'''
+
+import decimal
+import logging
+import unittest
+
+import numpy as np
+import sqlalchemy as sqa
+
+import psysmon
+import psysmon.core.database_util as db_util
+
+
+class DatabaseUtilTestCase(unittest.TestCase):
+    """
+    Test suite for psysmon.core.database_util
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Configure the logger.
+        logger = logging.getLogger('psysmon')
+        logger.setLevel('DEBUG')
+        logger.addHandler(psysmon.getLoggerHandler(log_level = 'DEBUG'))
+
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+
+    def setUp(self):
+        # Use an in-memory SQLite database. Let SQLAlchemy handle the
+        # transactions to get working SAVEPOINTs with pysqlite.
+        self.engine = sqa.create_engine('sqlite://')
+
+        @sqa.event.listens_for(self.engine, 'connect')
+        def do_connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @sqa.event.listens_for(self.engine, 'begin')
+        def do_begin(connection):
+            connection.execute('BEGIN')
+
+        metadata = sqa.MetaData()
+        self.table = sqa.Table('test_table', metadata,
+                               sqa.Column('id', sqa.Integer, primary_key = True),
+                               sqa.Column('value', sqa.Float))
+        metadata.create_all(self.engine)
+
+
+    def tearDown(self):
+        db_util.native_loaders.pop('sqlite', None)
+        self.engine.dispose()
+
+
+    def test_get_batch_size(self):
+        ''' Test the validation of the batch size.
+        '''
+        self.assertEqual(db_util.get_batch_size('500'), 500)
+        self.assertEqual(db_util.get_batch_size('abc'), db_util.default_batch_size)
+        self.assertEqual(db_util.get_batch_size('1.5'), db_util.default_batch_size)
+        self.assertEqual(db_util.get_batch_size(''), db_util.default_batch_size)
+        self.assertEqual(db_util.get_batch_size('0'), db_util.default_batch_size)
+        self.assertEqual(db_util.get_batch_size('-10'), db_util.default_batch_size)
+
+
+    def test_mysql_csv_value(self):
+        ''' Test the formatting of the MySQL LOAD DATA values.
+        '''
+        self.assertEqual(db_util.mysql_csv_value(None), 'NULL')
+        self.assertEqual(db_util.mysql_csv_value('a "b"'), '"a ""b"""')
+        self.assertEqual(db_util.mysql_csv_value(1.5), '1.5')
+        self.assertEqual(db_util.mysql_csv_value(np.float64(0.1)), '0.1')
+        self.assertEqual(db_util.mysql_csv_value(np.int64(3)), '3')
+        self.assertEqual(db_util.mysql_csv_value(decimal.Decimal('1.25')), '1.25')
+        self.assertEqual(db_util.mysql_csv_value(True), '1')
+
+
+    def test_native_loader(self):
+        ''' Test the selection of the native bulk loader.
+        '''
+        self.assertIs(db_util.get_native_loader('postgresql'), db_util.postgresql_copy)
+        self.assertIsNone(db_util.get_native_loader('sqlite'))
+
+        mysql_local_infile = db_util.mysql_local_infile
+        try:
+            db_util.mysql_local_infile = False
+            self.assertIsNone(db_util.get_native_loader('mysql'))
+            db_util.mysql_local_infile = True
+            self.assertIs(db_util.get_native_loader('mysql'), db_util.mysql_load_data)
+        finally:
+            db_util.mysql_local_infile = mysql_local_infile
+
+
+    def test_bulk_load_fallback(self):
+        ''' Test the fallback to INSERT statements after a failed native load.
+        '''
+        def failing_loader(connection, table, columns, rows):
+            # Write a part of the rows before failing.
+            connection.execute(table.insert(), rows[:2])
+            raise RuntimeError('Native loading failed.')
+
+        db_util.native_loaders['sqlite'] = failing_loader
+        rows = [{'id': x, 'value': float(x)} for x in range(5)]
+        with self.engine.connect() as connection:
+            transaction = connection.begin()
+            db_util.bulk_load(connection, self.table, rows)
+            transaction.commit()
+
+            result = connection.execute(sqa.select([self.table.c.id])).fetchall()
+        self.assertEqual(sorted([x.id for x in result]), list(range(5)))
+
+
+    def test_bulk_load(self):
+        ''' Test the native bulk loading.
+        '''
+        def loader(connection, table, columns, rows):
+            connection.execute(table.insert(), rows)
+
+        db_util.native_loaders['sqlite'] = loader
+        rows = [{'id': x, 'value': float(x)} for x in range(5)]
+        with self.engine.connect() as connection:
+            transaction = connection.begin()
+            db_util.bulk_load(connection, self.table, rows)
+            transaction.commit()
+
+            result = connection.execute(sqa.select([self.table.c.id])).fetchall()
+        self.assertEqual(sorted([x.id for x in result]), list(range(5)))
+
+
+
+def suite():
+    return unittest.makeSuite(DatabaseUtilTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
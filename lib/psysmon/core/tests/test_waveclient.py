@@ -39,6 +39,7 @@ from psysmon.core.test_util import create_empty_project
 from psysmon.core.test_util import drop_project_database_tables
 from psysmon.core.test_util import clear_project_database_tables
 from psysmon.core.test_util import remove_project_filestructure
+from psysmon.core.test_util import sql_echo
 import os
 
 @nose_attrib.attr('network')
@@ -59,7 +60,7 @@ class WaveclientTestCase(unittest.TestCase):
 
         cls.psybase = create_psybase()
         cls.project = create_empty_project(cls.psybase)
-        cls.project.dbEngine.echo = True
+        cls.project.dbEngine.echo = sql_echo
 
 
     @classmethod
@@ -31,6 +31,21 @@ import psysmon.gui.view.viewport
 import psysmon.gui.shortcut as psy_shortcut
 
 
+# The bitmaps of the decoded plugin icons.
+icon_bitmaps = {}
+
+
+def get_icon_bitmap(icon):
+    ''' Get the bitmap of an embedded icon image.
+
+    The PNG data of the icon is decoded only once. The bitmap is shared by
+    all frames showing the icon.
+    '''
+    if id(icon) not in icon_bitmaps:
+        icon_bitmaps[id(icon)] = (icon, icon.GetBitmap())
+    return icon_bitmaps[id(icon)][1]
+
+
 class DockingFrame(wx.Frame):
     ''' A base class for a frame holding AUI docks.
     '''
@@ -439,7 +454,7 @@ class DockingFrame(wx.Frame):
         for curPlugin in sorted(option_plugins, key = op.attrgetter('position_pref', 'name')):
                 # Create a tool.
                 curTool = self.ribbonToolbars[curPlugin.category].AddTool(tool_id = id_counter, 
-                                                                          bitmap = curPlugin.icons['active'].GetBitmap(), 
+                                                                          bitmap = get_icon_bitmap(curPlugin.icons['active']), 
                                                                           help_string = curPlugin.name,
                                                                           kind = ribbon.RIBBON_BUTTON_TOGGLE)
                 self.ribbonToolbars[curPlugin.category].Bind(ribbon.EVT_RIBBONTOOLBAR_CLICKED, 
@@ -452,11 +467,11 @@ class DockingFrame(wx.Frame):
                 # the tool parameters in a foldpanel.
                 if len(curPlugin.pref_manager) == 0:
                     curTool = self.ribbonToolbars[curPlugin.category].AddTool(tool_id = id_counter,
-                                                                              bitmap = curPlugin.icons['active'].GetBitmap(),
+                                                                              bitmap = get_icon_bitmap(curPlugin.icons['active']),
                                                                               help_string = curPlugin.name)
                 else:
                     curTool = self.ribbonToolbars[curPlugin.category].AddHybridTool(tool_id = id_counter,
-                                                                                    bitmap = curPlugin.icons['active'].GetBitmap(),
+                                                                                    bitmap = get_icon_bitmap(curPlugin.icons['active']),
                                                                                     help_string = curPlugin.name)
                     self.ribbonToolbars[curPlugin.category].Bind(ribbon.EVT_RIBBONTOOLBAR_DROPDOWN_CLICKED,
                                                                  lambda evt, curPlugin=curPlugin: self.on_command_tool_dropdown_clicked(evt, curPlugin),
@@ -472,11 +487,11 @@ class DockingFrame(wx.Frame):
                 # the tool parameters in a foldpanel.
                 if len(curPlugin.pref_manager) == 0:
                     curTool = self.ribbonToolbars[curPlugin.category].AddTool(tool_id = id_counter,
-                                                                              bitmap = curPlugin.icons['active'].GetBitmap(),
+                                                                              bitmap = get_icon_bitmap(curPlugin.icons['active']),
                                                                               help_string = curPlugin.name)
                 else:
                     curTool = self.ribbonToolbars[curPlugin.category].AddHybridTool(tool_id = id_counter,
-                                                                                    bitmap = curPlugin.icons['active'].GetBitmap(),
+                                                                                    bitmap = get_icon_bitmap(curPlugin.icons['active']),
                                                                                     help_string = curPlugin.name)
                     self.ribbonToolbars[curPlugin.category].Bind(ribbon.EVT_RIBBONTOOLBAR_DROPDOWN_CLICKED,
                                                                  lambda evt, curPlugin=curPlugin: self.on_interactive_tool_dropdown_clicked(evt, curPlugin),
@@ -492,12 +507,12 @@ class DockingFrame(wx.Frame):
                 # the tool parameters in a foldpanel.
                 if len(curPlugin.pref_manager) == 0:
                     curTool = self.ribbonToolbars[curPlugin.category].AddTool(tool_id = id_counter,
-                                                                              bitmap = curPlugin.icons['active'].GetBitmap(),
+                                                                              bitmap = get_icon_bitmap(curPlugin.icons['active']),
                                                                               help_string = curPlugin.name)
 
                 else:
                     curTool = self.ribbonToolbars[curPlugin.category].AddHybridTool(tool_id = id_counter,
-                                                                                    bitmap = curPlugin.icons['active'].GetBitmap(),
+                                                                                    bitmap = get_icon_bitmap(curPlugin.icons['active']),
                                                                                     help_string = curPlugin.name)
                     self.ribbonToolbars[curPlugin.category].Bind(ribbon.EVT_RIBBONTOOLBAR_DROPDOWN_CLICKED,
                                                                  lambda evt, curPlugin=curPlugin: self.on_view_tool_dropdown_clicked(evt, curPlugin),
@@ -21,6 +21,25 @@
 import wx
 
 
+# The system window colour used as the background of valid fields.
+window_colour = None
+
+
+def set_valid_colour(ctrl):
+    ''' Reset the background colour of a validated control.
+
+    The system window colour is queried only once. The control is
+    refreshed only if the background colour changes.
+    '''
+    global window_colour
+    if window_colour is None:
+        window_colour = wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOW)
+
+    if ctrl.GetBackgroundColour() != window_colour:
+        ctrl.SetBackgroundColour(window_colour)
+        ctrl.Refresh()
+
+
 class NotEmptyValidator(wx.Validator):
     '''  A dialog field validator which doesn't allow empty field values.
     '''
@@ -51,8 +70,7 @@ class NotEmptyValidator(wx.Validator):
             ctrl.Refresh()
             return False
         else:
-            ctrl.SetBackgroundColour(wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOW))
-            ctrl.Refresh()
+            set_valid_colour(ctrl)
             return True
 
     ## The method called when entering the dialog.      
@@ -105,8 +123,7 @@ class IsEqualValidator(wx.Validator):
             ctrl.Refresh()
             return False
         else:
-            ctrl.SetBackgroundColour(wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOW))
-            ctrl.Refresh()
+            set_valid_colour(ctrl)
             return True
 
     ## The method called when entering the dialog.    
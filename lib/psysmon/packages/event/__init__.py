@@ -65,8 +65,13 @@ def databaseFactory(base):
     from sqlalchemy import String
     from sqlalchemy import Text
     from sqlalchemy import Float
+    from sqlalchemy import Enum
     from sqlalchemy import ForeignKey
     from sqlalchemy import UniqueConstraint
+    from sqlalchemy import and_
+    from sqlalchemy import event
+    from sqlalchemy import inspect
+    from sqlalchemy import select
     from sqlalchemy.orm import relationship
     from sqlalchemy.orm import backref
 
@@ -76,12 +81,21 @@ def databaseFactory(base):
     ###########################################################################
     # EVENT_SET table mapper class
     class EventCatalogDb(base):
+        ''' The event catalog database table mapper.
+
+        History
+        -------
+        1.1.0 - 2026-10-16
+        Use the compressed InnoDB row format.
+        '''
         __tablename__  = 'event_catalog'
         __table_args__ = (
                           UniqueConstraint('name'),
-                          {'mysql_engine': 'InnoDB'}
+                          {'mysql_engine': 'InnoDB',
+                           'mysql_row_format': 'COMPRESSED',
+                           'mysql_key_block_size': '8'}
                          )
-        _version = '1.0.0'
+        _version = '1.1.0'
 
         id = Column(Integer, primary_key = True, autoincrement = True)
         name = Column(String(191), nullable = False)
@@ -93,7 +107,8 @@ def databaseFactory(base):
         events = relationship('EventDb',
                                cascade = 'all',
                                backref = 'parent',
-                               lazy = 'select')
+                               lazy = 'select',
+                               passive_deletes = True)
 
         def __init__(self, name, description, agency_uri,
                      author_uri, creation_time):
@@ -109,12 +124,21 @@ def databaseFactory(base):
     ###########################################################################
     # EVENT_TYPE table mapper class
     class EventTypeDb(base):
+        ''' The event type database table mapper.
+
+        History
+        -------
+        1.1.0 - 2026-10-16
+        Use the compressed InnoDB row format.
+        '''
         __tablename__  = 'event_type'
         __table_args__ = (
                           UniqueConstraint('name'),
-                          {'mysql_engine': 'InnoDB'}
+                          {'mysql_engine': 'InnoDB',
+                           'mysql_row_format': 'COMPRESSED',
+                           'mysql_key_block_size': '8'}
                          )
-        _version = '1.0.0'
+        _version = '1.1.0'
 
         id = Column(Integer, primary_key = True, autoincrement = True)
         parent_id = Column(Integer,
@@ -144,21 +168,141 @@ def databaseFactory(base):
     tables.append(EventTypeDb)
 
 
+    ###########################################################################
+    # EVENT_TYPE_CLOSURE table mapper class
+    class EventTypeClosureDb(base):
+        ''' The event type closure database table mapper.
+
+        Each row links an event type with one of its descendants
+        (including itself with a depth of 0). The rows are maintained by
+        the EventTypeDb mapper events. A complete subtree can be queried
+        using a single SELECT.
+        '''
+        __tablename__  = 'event_type_closure'
+        __table_args__ = (
+                          {'mysql_engine': 'InnoDB'}
+                         )
+        _version = '1.0.0'
+
+        ancestor_id = Column(Integer,
+                             ForeignKey('event_type.id',
+                                        onupdate = 'cascade',
+                                        ondelete = 'cascade'),
+                             primary_key = True,
+                             nullable = False)
+        descendant_id = Column(Integer,
+                               ForeignKey('event_type.id',
+                                          onupdate = 'cascade',
+                                          ondelete = 'cascade'),
+                               primary_key = True,
+                               nullable = False)
+        depth = Column(Integer, nullable = False)
+
+        def __init__(self, ancestor_id, descendant_id, depth):
+            self.ancestor_id = ancestor_id
+            self.descendant_id = descendant_id
+            self.depth = depth
+
+    tables.append(EventTypeClosureDb)
+
+
+    @event.listens_for(EventTypeClosureDb.__table__, 'after_create')
+    def event_type_closure_after_create(target, connection, **kwargs):
+        ''' Fill a new closure table with the paths of the existing event types.
+
+        The closure table is created when a project is created or when an
+        existing project is migrated to the new table.
+        '''
+        import psysmon.packages.event.core as ev_core
+        event_type = EventTypeDb.__table__
+        query = select([event_type.c.id, event_type.c.parent_id])
+        parents = dict([(x.id, x.parent_id) for x in connection.execute(query)])
+        paths = ev_core.get_event_type_closure_paths(parents)
+        if paths:
+            connection.execute(target.insert(), paths)
+
+
+    @event.listens_for(EventTypeDb, 'after_insert')
+    def event_type_after_insert(mapper, connection, target):
+        ''' Add the paths of a new event type to the closure table.
+        '''
+        closure = EventTypeClosureDb.__table__
+        paths = [{'ancestor_id': target.id,
+                  'descendant_id': target.id,
+                  'depth': 0}]
+        if target.parent_id is not None:
+            query = select([closure.c.ancestor_id, closure.c.depth]).\
+                    where(closure.c.descendant_id == target.parent_id)
+            paths.extend([{'ancestor_id': x.ancestor_id,
+                           'descendant_id': target.id,
+                           'depth': x.depth + 1} for x in connection.execute(query)])
+        connection.execute(closure.insert(), paths)
+
+
+    @event.listens_for(EventTypeDb, 'after_update')
+    def event_type_after_update(mapper, connection, target):
+        ''' Move the subtree of a reparented event type in the closure table.
+        '''
+        if not inspect(target).attrs.parent_id.history.has_changes():
+            return
+
+        closure = EventTypeClosureDb.__table__
+        query = select([closure.c.descendant_id, closure.c.depth]).\
+                where(closure.c.ancestor_id == target.id)
+        subtree = connection.execute(query).fetchall()
+        subtree_ids = [x.descendant_id for x in subtree]
+
+        # Remove the paths from the old ancestors to the subtree.
+        connection.execute(closure.delete().\
+                           where(and_(closure.c.descendant_id.in_(subtree_ids),
+                                      ~closure.c.ancestor_id.in_(subtree_ids))))
+
+        # Add the paths from the new ancestors to the subtree.
+        if target.parent_id is not None:
+            query = select([closure.c.ancestor_id, closure.c.depth]).\
+                    where(closure.c.descendant_id == target.parent_id)
+            ancestors = connection.execute(query).fetchall()
+            paths = [{'ancestor_id': cur_anc.ancestor_id,
+                      'descendant_id': cur_desc.descendant_id,
+                      'depth': cur_anc.depth + cur_desc.depth + 1} for cur_anc in ancestors for cur_desc in subtree]
+            if paths:
+                connection.execute(closure.insert(), paths)
+
+
 
     ###########################################################################
     # EVENT table mapper class
     class EventDb(base):
+        ''' The event database table mapper.
+
+        History
+        -------
+        1.1.0 - 2026-10-16
+        Changed the ev_type_certainty column to an enum type.
+
+        1.2.0 - 2026-10-16
+        Cascade the deletes of the event catalog in the database.
+
+        1.3.0 - 2026-10-16
+        Use the compressed InnoDB row format.
+
+        1.4.0 - 2026-10-16
+        Added a unique constraint on the public_id within an event catalog.
+        '''
         __tablename__  = 'event'
         __table_args__ = (
-                          {'mysql_engine': 'InnoDB'}
+                          UniqueConstraint('public_id', 'ev_catalog_id'),
+                          {'mysql_engine': 'InnoDB',
+                           'mysql_row_format': 'COMPRESSED',
+                           'mysql_key_block_size': '8'}
                          )
-        _version = '1.0.1'
+        _version = '1.4.0'
 
         id = Column(Integer, primary_key = True, autoincrement = True)
         ev_catalog_id = Column(Integer,
                                ForeignKey('event_catalog.id',
                                           onupdate = 'cascade',
-                                          ondelete = 'set null'),
+                                          ondelete = 'cascade'),
                                nullable = True)
         start_time = Column(Float(53), nullable = False)
         end_time = Column(Float(53), nullable = False)
@@ -171,7 +315,10 @@ def databaseFactory(base):
                                        onupdate = 'cascade',
                                        ondelete = 'set null'),
                             nullable = True)
-        ev_type_certainty = Column(String(50), nullable = True)
+        ev_type_certainty = Column(Enum('known', 'suspected', 'damaging',
+                                        'felt', 'heard',
+                                        name = 'certainty_enum'),
+                                   nullable = True)
         pref_origin_id = Column(Integer, nullable = True)
         pref_magnitude_id = Column(Integer, nullable = True)
         pref_focmec_id = Column(Integer, nullable = True)
@@ -211,12 +358,21 @@ def databaseFactory(base):
     ###########################################################################
     # DETECTION_CATALOG table mapper class
     class DetectionCatalogDb(base):
+        ''' The detection catalog database table mapper.
+
+        History
+        -------
+        1.1.0 - 2026-10-16
+        Use the compressed InnoDB row format.
+        '''
         __tablename__  = 'detection_catalog'
         __table_args__ = (
                           UniqueConstraint('name'),
-                          {'mysql_engine': 'InnoDB'}
+                          {'mysql_engine': 'InnoDB',
+                           'mysql_row_format': 'COMPRESSED',
+                           'mysql_key_block_size': '8'}
                          )
-        _version = '1.0.0'
+        _version = '1.1.0'
 
         id = Column(Integer, primary_key = True, autoincrement = True)
         name = Column(String(191), nullable = False)
@@ -228,7 +384,8 @@ def databaseFactory(base):
         detections = relationship('DetectionDb',
                                   cascade = 'all',
                                   backref = 'parent',
-                                  lazy = 'noload')
+                                  lazy = 'noload',
+                                  passive_deletes = True)
 
         def __init__(self, name, description, agency_uri,
                      author_uri, creation_time):
@@ -245,15 +402,27 @@ def databaseFactory(base):
     ###########################################################################
     # DETECTION table mapper class
     class DetectionDb(base):
+        ''' The detection database table mapper.
+
+        History
+        -------
+        1.1.0 - 2026-10-16
+        Cascade the deletes of the detection catalog in the database.
+
+        1.2.0 - 2026-10-16
+        Use the compressed InnoDB row format.
+        '''
         __tablename__  = 'detection'
-        __table_args__ = {'mysql_engine': 'InnoDB'}
-        _version = '1.0.0'
+        __table_args__ = {'mysql_engine': 'InnoDB',
+                          'mysql_row_format': 'COMPRESSED',
+                          'mysql_key_block_size': '8'}
+        _version = '1.2.0'
 
         id = Column(Integer, primary_key = True, autoincrement = True)
         catalog_id = Column(Integer,
                             ForeignKey('detection_catalog.id',
                                         onupdate = 'cascade',
-                                        ondelete = 'set null'),
+                                        ondelete = 'cascade'),
                             nullable = True)
         rec_stream_id = Column(Integer,
                                ForeignKey('geom_rec_stream.id',
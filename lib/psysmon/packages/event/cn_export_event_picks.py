@@ -433,43 +433,33 @@ class EventPickExporter(object):
             self.logger.info("Processing interval timespan %s to %s.",
                              cur_start_time.isoformat(),
                              cur_end_time.isoformat())
-            catalog.clear_events()
-
             if event_ids is None:
-                # Load the events for the given time span from the database.
+                # Stream the events for the given time span from the database.
                 # TODO: Remove the hardcoded min_event_length value and create
                 # user-selectable filter fields.
-                catalog.load_events(project = self.project,
-                                    start_time = cur_start_time,
-                                    end_time = cur_end_time,
-                                    min_event_length = 0.1,
-                                    event_tags = event_tags)
+                events = catalog.stream_events(project = self.project,
+                                               start_time = cur_start_time,
+                                               end_time = cur_end_time,
+                                               min_event_length = 0.1,
+                                               event_tags = event_tags)
             else:
-                # Load the events with the given ids from the database. Ignore the
+                # Stream the events with the given ids from the database. Ignore the
                 # time-span.
-                catalog.load_events(event_id = event_ids)
-
-            # Abort the execution if no events are available for the time span.
-            if not catalog.events:
-                if event_ids is None:
-                    self.logger.info('No events found for the timespan %s to %s.', cur_start_time.isoformat(), cur_end_time.isoformat())
-                else:
-                    self.logger.info('No events found for the specified event IDs: %s.', event_ids)
-                continue
+                events = catalog.stream_events(project = self.project,
+                                               event_id = event_ids)
 
             res_columns = ['event_public_id', 'event_start_time',
                            'event_end_time', 'network', 'station',
                            'location', 'channel', 'pick_label',
                            'time']
 
-            # Loop through the events.
-            n_events = len(catalog.events)
-            sorted_events = sorted(catalog.events,
-                                   key = lambda x: x.start_time)
-            for k, cur_event in enumerate(sorted_events):
-                self.logger.info("Processing event %d (%d/%d).",
+            # Loop through the events. The events are sorted by the start
+            # time.
+            n_events = 0
+            for cur_event in events:
+                n_events += 1
+                self.logger.info("Processing event %d (%d).",
                                  cur_event.db_id,
-                                 k + 1,
                                  n_events)
                 
                 pick_catalog.clear_picks()
@@ -523,3 +513,9 @@ class EventPickExporter(object):
                 
                 if len(event_picks) > 0:
                     cur_res.save(with_timewindow = False)
+
+            if n_events == 0:
+                if event_ids is None:
+                    self.logger.info('No events found for the timespan %s to %s.', cur_start_time.isoformat(), cur_end_time.isoformat())
+                else:
+                    self.logger.info('No events found for the specified event IDs: %s.', event_ids)
@@ -38,7 +38,6 @@ import logging
 import os
 
 import obspy.core.utcdatetime as utcdatetime
-import sqlalchemy
 
 import psysmon
 import psysmon.core.packageNodes as package_nodes
@@ -377,18 +376,7 @@ class EventExporter(object):
     def load_event_types(self):
         ''' Load the available event types from the database.
         '''
-        db_session = self.project.getDbSession()
-        event_types = []
-        try:
-            event_type_table = self.project.dbTables['event_type']
-            query = db_session.query(event_type_table)
-            query = query.options(sqlalchemy.orm.immediateload(event_type_table.children))
-            query = query.options(sqlalchemy.orm.immediateload(event_type_table.parent))
-            event_types = query.all()
-        finally:
-            db_session.close()
-
-        return event_types
+        return event_core.load_event_types(project = self.project)
 
     def create_public_id(self, utc_datetime, agency_id, author_id,
                          service_id, project_id, resource_id):
@@ -443,31 +431,21 @@ class EventExporter(object):
             self.logger.info("Processing interval timespan %s to %s.",
                              cur_start_time.isoformat(),
                              cur_end_time.isoformat())
-            catalog.clear_events()
-
             if event_ids is None:
-                # Load the events for the given time span from the database.
+                # Stream the events for the given time span from the database.
                 # TODO: Remove the hardcoded min_event_length value and create
                 # user-selectable filter fields.
-                catalog.load_events(project = self.project,
-                                    start_time = cur_start_time,
-                                    end_time = cur_end_time,
-                                    min_event_length = 0.1,
-                                    event_tags = event_tags)
+                events = catalog.stream_events(project = self.project,
+                                               start_time = cur_start_time,
+                                               end_time = cur_end_time,
+                                               min_event_length = 0.1,
+                                               event_tags = event_tags)
             else:
-                # Load the events with the given ids from the database. Ignore the
+                # Stream the events with the given ids from the database. Ignore the
                 # time-span.
-                catalog.load_events(project = self.project,
-                                    event_id = event_ids)
+                events = catalog.stream_events(project = self.project,
+                                               event_id = event_ids)
 
-            # Abort the execution if no events are available for the time span.
-            if not catalog.events:
-                if event_ids is None:
-                    self.logger.info('No events found for the timespan %s to %s.', cur_start_time.isoformat(), cur_end_time.isoformat())
-                else:
-                    self.logger.info('No events found for the specified event IDs: %s.', event_ids)
-                continue
-            
             # Create the event result.
             res_columns = ['public_id', 'event_start_time', 'event_end_time',
                            'n_stations', 'detection_scnl', 'detection_start',
@@ -492,10 +470,12 @@ class EventExporter(object):
                                              origin_resource = self.parent_rid,
                                              column_names = det_columns)
 
-            # Loop through the events.
-            n_events = len(catalog.events)
-            for k, cur_event in enumerate(sorted(catalog.events, key = lambda x: x.start_time)):
-                self.logger.info("Processing event %d (%d/%d).", cur_event.db_id, k, n_events)
+            # Loop through the events. The events are sorted by the start
+            # time.
+            n_events = 0
+            for cur_event in events:
+                n_events += 1
+                self.logger.info("Processing event %d (%d).", cur_event.db_id, n_events)
 
                 # Assign the channel instance to the detections.
                 cur_event.assign_channel_to_detections(self.project.geometry_inventory)
@@ -550,6 +530,14 @@ class EventExporter(object):
                                         event_start_time = event_start,
                                         event_end_time = event_end)
 
+            # Skip the interval if no events are available for the time span.
+            if n_events == 0:
+                if event_ids is None:
+                    self.logger.info('No events found for the timespan %s to %s.', cur_start_time.isoformat(), cur_end_time.isoformat())
+                else:
+                    self.logger.info('No events found for the specified event IDs: %s.', event_ids)
+                continue
+
             # Save the results.
             cur_res.base_output_dir = self.output_dir
             cur_res.save(with_timewindow = False)
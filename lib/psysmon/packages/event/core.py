@@ -27,8 +27,11 @@ import logging
 import warnings
 
 import obspy.core.utcdatetime as utcdatetime
+import sqlalchemy
+from sqlalchemy.orm.attributes import set_committed_value
 
 import psysmon
+import psysmon.core.database_util as database_util
 import psysmon.packages.event.detect as detect
 
 #from profilehooks import profile
@@ -258,6 +261,20 @@ class Event(object):
         db_event_orm_class = project.dbTables['event']
         d2e_orm_class = project.dbTables['detection_to_event']
 
+        db_event = db_event_orm_class(**self.get_db_dict())
+
+        for cur_detection in self.detections:
+            cur_d2e_orm = d2e_orm_class(ev_id = None,
+                                        det_id = cur_detection.db_id)
+            #cur_d2e_orm.detection = cur_detection.get_db_orm(project)
+            db_event.detections.append(cur_d2e_orm)
+
+        return db_event
+
+    def get_db_dict(self):
+        ''' Get the event table column values to use them for bulk
+        insertion into the database.
+        '''
         if self.creation_time is not None:
             cur_creation_time = self.creation_time.isoformat()
         else:
@@ -268,6 +285,13 @@ class Event(object):
         else:
             catalog_id = None
 
+        # TODO: Fix the confusion with the event_type usage.
+        # Sometimes it seems, that the event type is an instance.
+        try:
+            ev_type_id = self.event_type.id
+        except Exception:
+            ev_type_id = self.event_type
+
         labels = ['ev_catalog_id', 'start_time', 'end_time',
                   'public_id', 'description', 'comment', 'tags',
                   'ev_type_id', 'ev_type_certainty', 'pref_origin_id',
@@ -281,7 +305,7 @@ class Event(object):
                             self.description,
                             self.comment,
                             ','.join(self.tags),
-                            self.event_type,
+                            ev_type_id,
                             self.event_type_certainty,
                             None,
                             None,
@@ -289,15 +313,7 @@ class Event(object):
                             self.agency_uri,
                             self.author_uri,
                             cur_creation_time))))
-        db_event = db_event_orm_class(**db_dict)
-
-        for cur_detection in self.detections:
-            cur_d2e_orm = d2e_orm_class(ev_id = None,
-                                        det_id = cur_detection.db_id)
-            #cur_d2e_orm.detection = cur_detection.get_db_orm(project)
-            db_event.detections.append(cur_d2e_orm)
-
-        return db_event
+        return db_dict
 
     @classmethod
     def from_db_event(cls, db_event):
@@ -329,6 +345,51 @@ class Event(object):
         return event
 
 
+    @classmethod
+    def from_db_rows(cls, rows):
+        ''' Convert database rows of an event joined with its detections to
+        an event.
+
+        Parameters
+        ----------
+        rows : :obj:`list` of database rows
+            The rows of a single event as selected by
+            :meth:`Catalog.stream_events`.
+        '''
+        db_event = rows[0]
+        if db_event.tags:
+            event_tags = db_event.tags.split(',')
+        else:
+            event_tags = []
+
+        detections = [detect.Detection(start_time = x.det_start_time,
+                                       end_time = x.det_end_time,
+                                       db_id = x.det_id,
+                                       rec_stream_id = x.det_rec_stream_id,
+                                       catalog_id = x.det_catalog_id,
+                                       method = x.det_method,
+                                       agency_uri = x.det_agency_uri,
+                                       author_uri = x.det_author_uri,
+                                       creation_time = x.det_creation_time,
+                                       changed = False) for x in rows if x.det_id is not None]
+
+        event = cls(start_time = db_event.start_time,
+                    end_time = db_event.end_time,
+                    db_id = db_event.id,
+                    public_id = db_event.public_id,
+                    event_type = db_event.ev_type_id,
+                    event_type_certainty = db_event.ev_type_certainty,
+                    description = db_event.description,
+                    tags = event_tags,
+                    agency_uri = db_event.agency_uri,
+                    author_uri = db_event.author_uri,
+                    creation_time = db_event.creation_time,
+                    detections = detections,
+                    changed = False
+                    )
+        return event
+
+
 
 
 class Catalog(object):
@@ -466,22 +527,60 @@ class Catalog(object):
 
         # Write or update all events of the catalog to the database.
         if bulk_insert:
-            db_data = self.get_events_db_data(project = project)
+            # Update the changed events which are already in the database.
+            for cur_event in [x for x in self.events if x.db_id is not None and x.changed is True]:
+                cur_event.write_to_database(project)
+
+            # Insert the new events. The ids of the events with detections
+            # are needed for the detection_to_event rows. These events and
+            # the events without a public id are flushed to get the ids.
+            # The other events are bulk loaded and their ids are queried
+            # using the public id, which is unique within the catalog.
+            db_event_orm_class = project.dbTables['event']
+            d2e_table = project.dbTables['detection_to_event'].__table__
+            new_events = [x for x in self.events if x.db_id is None]
+            linked_events = [x for x in new_events if x.detections or x.public_id is None]
+            unlinked_events = [x for x in new_events if not x.detections and x.public_id is not None]
             db_session = project.getDbSession()
             try:
-                assigned_detections = [x.detections for x in db_data]
-
-                for cur_db_data in db_data:
-                    cur_db_data.detections = []
+                connection = db_session.connection()
+                # Flush the events with detections to get the ids.
+                ev_ids = []
+                for cur_events in database_util.chunked(linked_events):
+                    db_data = [db_event_orm_class(**x.get_db_dict()) for x in cur_events]
+                    db_session.add_all(db_data)
+                    db_session.flush()
+                    ev_ids.extend([x.id for x in db_data])
+                    db_session.expunge_all()
+
+                d2e_rows = [{'ev_id': cur_id, 'det_id': cur_detection.db_id}
+                            for cur_event, cur_id in zip(linked_events, ev_ids)
+                            for cur_detection in cur_event.detections]
+                database_util.bulk_insert(connection = connection,
+                                          table = d2e_table,
+                                          rows = d2e_rows)
+
+                # Use the native bulk loading of the database for the events
+                # without detections.
+                ev_table = db_event_orm_class.__table__
+                database_util.bulk_load(connection = connection,
+                                        table = ev_table,
+                                        rows = [x.get_db_dict() for x in unlinked_events])
+                loaded_ids = {}
+                for cur_chunk in database_util.chunked([x.public_id for x in unlinked_events]):
+                    query = sqlalchemy.select([ev_table.c.public_id, ev_table.c.id]).\
+                            where(sqlalchemy.and_(ev_table.c.ev_catalog_id == self.db_id,
+                                                  ev_table.c.public_id.in_(cur_chunk)))
+                    loaded_ids.update([(x.public_id, x.id) for x in connection.execute(query)])
+                db_session.commit()
 
-                db_session.add_all(db_data)
-                db_session.flush()
+                for cur_event, cur_id in zip(linked_events, ev_ids):
+                    cur_event.db_id = cur_id
+                    cur_event.changed = False
 
-                for k, cur_db_data in enumerate(db_data):
-                    for cur_detection in assigned_detections[k]:
-                        cur_detection.ev_id = cur_db_data.id
-                db_session.add_all(itertools.chain.from_iterable(assigned_detections))
-                db_session.commit()
+                for cur_event in unlinked_events:
+                    cur_event.db_id = loaded_ids[cur_event.public_id]
+                    cur_event.changed = False
             finally:
                 db_session.close()
         else:
@@ -515,24 +614,13 @@ class Catalog(object):
         db_session = project.getDbSession()
         try:
             events_table = project.dbTables['event']
-            query = db_session.query(events_table).\
-                    filter(events_table.ev_catalog_id == self.db_id)
-
-            if start_time:
-                query = query.filter(events_table.start_time >= start_time.timestamp)
-
-            if end_time:
-                query = query.filter(events_table.start_time <= end_time.timestamp)
-
-            if event_id:
-                query = query.filter(events_table.id.in_(event_id))
-
-            if min_event_length:
-                query = query.filter(events_table.end_time - events_table.start_time >= min_event_length)
-
-            if event_tags:
-                for cur_tag in event_tags:
-                    query = query.filter(events_table.tags.like('%' + cur_tag + '%'))
+            query = db_session.query(events_table)
+            query = query.filter(*self.get_events_filter(events_table = events_table,
+                                                         start_time = start_time,
+                                                         end_time = end_time,
+                                                         event_id = event_id,
+                                                         min_event_length = min_event_length,
+                                                         event_tags = event_tags))
 
             self.logger.info('Query: %s.', query.statement)
             events_to_add = []
@@ -548,6 +636,164 @@ class Catalog(object):
             db_session.close()
 
 
+    def load_events_in_timespan(self, project, start_time, end_time):
+        ''' Load the events overlapping a time-span from the database.
+
+        Only the columns needed to display the events are selected. The
+        detections of the events are not loaded. Use :meth:`load_events`
+        to load the events with all details.
+
+        Parameters
+        ----------
+        start_time : :class:`obspy.core.utcdatetime.UTCDateTime`
+            The begin of the time-span to load.
+
+        end_time : :class:`obspy.core.utcdatetime.UTCDateTime`
+            The end of the time-span to load.
+        '''
+        if project is None:
+            raise RuntimeError("The project is None. Can't query the database without a project.")
+
+        ev_table = project.dbTables['event'].__table__
+        columns = [ev_table.c.id, ev_table.c.start_time, ev_table.c.end_time,
+                   ev_table.c.public_id, ev_table.c.ev_type_id,
+                   ev_table.c.agency_uri, ev_table.c.author_uri]
+        query = sqlalchemy.select(columns).\
+                where(sqlalchemy.and_(ev_table.c.ev_catalog_id == self.db_id,
+                                      ev_table.c.start_time <= end_time.timestamp,
+                                      ev_table.c.end_time >= start_time.timestamp)).\
+                order_by(ev_table.c.start_time)
+
+        db_session = project.getDbSession()
+        try:
+            events_to_add = []
+            for cur_row in db_session.connection().execute(query):
+                cur_event = Event(start_time = cur_row.start_time,
+                                  end_time = cur_row.end_time,
+                                  db_id = cur_row.id,
+                                  public_id = cur_row.public_id,
+                                  event_type = cur_row.ev_type_id,
+                                  agency_uri = cur_row.agency_uri,
+                                  author_uri = cur_row.author_uri,
+                                  changed = False)
+                events_to_add.append(cur_event)
+            self.add_events(events_to_add)
+        finally:
+            db_session.close()
+
+
+    def stream_events(self, project, start_time = None, end_time = None, event_id = None,
+            min_event_length = None, event_tags = None, batch_size = 1000):
+        ''' Stream events from the database without adding them to the catalog.
+
+        The events and their detections are selected with a single query
+        sorted by the event start time. The rows are fetched in batches
+        and converted directly to :class:`Event` instances without
+        creating ORM objects. Use this method to iterate over a large
+        number of events, e.g. for exporting.
+
+        Parameters
+        ----------
+        start_time : :class:`obspy.core.utcdatetime.UTCDateTime`
+            The begin of the time-span to load.
+
+        end_time : :class:`obspy.core.utcdatetime.UTCDateTime`
+            The end of the time-span to load.
+
+        batch_size : int
+            The number of rows fetched from the database at once.
+
+        Returns
+        -------
+        generator of :class:`Event`
+            The events matching the search criteria.
+        '''
+        if project is None:
+            raise RuntimeError("The project is None. Can't query the database without a project.")
+
+        events_table = project.dbTables['event']
+        ev_table = events_table.__table__
+        d2e_table = project.dbTables['detection_to_event'].__table__
+        det_table = project.dbTables['detection'].__table__
+
+        columns = [ev_table.c.id, ev_table.c.start_time, ev_table.c.end_time,
+                   ev_table.c.public_id, ev_table.c.ev_type_id,
+                   ev_table.c.ev_type_certainty, ev_table.c.description,
+                   ev_table.c.tags, ev_table.c.agency_uri,
+                   ev_table.c.author_uri, ev_table.c.creation_time,
+                   det_table.c.id.label('det_id'),
+                   det_table.c.rec_stream_id.label('det_rec_stream_id'),
+                   det_table.c.catalog_id.label('det_catalog_id'),
+                   det_table.c.start_time.label('det_start_time'),
+                   det_table.c.end_time.label('det_end_time'),
+                   det_table.c.method.label('det_method'),
+                   det_table.c.agency_uri.label('det_agency_uri'),
+                   det_table.c.author_uri.label('det_author_uri'),
+                   det_table.c.creation_time.label('det_creation_time')]
+        join = ev_table.outerjoin(d2e_table, d2e_table.c.ev_id == ev_table.c.id).\
+                outerjoin(det_table, det_table.c.id == d2e_table.c.det_id)
+        query = sqlalchemy.select(columns).\
+                select_from(join).\
+                where(sqlalchemy.and_(*self.get_events_filter(events_table = events_table,
+                                                              start_time = start_time,
+                                                              end_time = end_time,
+                                                              event_id = event_id,
+                                                              min_event_length = min_event_length,
+                                                              event_tags = event_tags))).\
+                order_by(ev_table.c.start_time, ev_table.c.id)
+
+        db_session = project.getDbSession()
+        try:
+            connection = db_session.connection().execution_options(stream_results = True)
+            rows = connection.execute(query)
+            batches = iter(lambda: rows.fetchmany(batch_size), [])
+            event_rows = itertools.groupby(itertools.chain.from_iterable(batches),
+                                           key = lambda x: x.id)
+            for cur_id, cur_rows in event_rows:
+                cur_rows = list(cur_rows)
+                try:
+                    yield Event.from_db_rows(cur_rows)
+                except Exception:
+                    self.logger.exception("Error when creating an event object from database values for event %d. Skipping this event.", cur_id)
+        finally:
+            db_session.close()
+
+
+    def get_events_filter(self, events_table, start_time = None, end_time = None,
+                          event_id = None, min_event_length = None, event_tags = None):
+        ''' Get the filter expressions to select the events of the catalog.
+
+        Parameters
+        ----------
+        events_table : SQLAlchemy ORM
+            The ORM of the events database table.
+
+        Returns
+        -------
+        :obj:`list`
+            The filter expressions.
+        '''
+        db_filter = [events_table.ev_catalog_id == self.db_id]
+
+        if start_time:
+            db_filter.append(events_table.start_time >= start_time.timestamp)
+
+        if end_time:
+            db_filter.append(events_table.start_time <= end_time.timestamp)
+
+        if event_id:
+            db_filter.append(events_table.id.in_(event_id))
+
+        if min_event_length:
+            db_filter.append(events_table.end_time - events_table.start_time >= min_event_length)
+
+        if event_tags:
+            for cur_tag in event_tags:
+                db_filter.append(events_table.tags.like('%' + cur_tag + '%'))
+
+        return db_filter
+
+
     def clear_events(self):
         ''' Clear the events list.
         '''
@@ -773,7 +1019,7 @@ class Library(object):
                 query = query.filter(events_table.id == ev_id)
 
             if public_id is not None:
-                query = query.filter(events_table.public_id.like(public_id))
+                query = query.filter(events_table.public_id == public_id)
 
             for cur_orm in query:
                 try:
@@ -842,3 +1088,107 @@ class Library(object):
 
 
 
+def load_event_types(project, root_id = None):
+    ''' Load the event type tree from the database.
+
+    All event types are loaded with a single query. The parent and children
+    relationships are assembled from the loaded event types, so that walking
+    the tree doesn't emit additional queries.
+
+    Parameters
+    ----------
+    project : :class:`~psysmon.core.project.Project`
+        The project used to access the database.
+
+    root_id : int
+        The database id of the root event type. If specified, only the
+        subtree of this event type is loaded using the event type closure
+        table. The closure table is filled when it is created. Use
+        :func:`rebuild_event_type_closure` to repair a closure table that
+        is out of sync with the event types.
+
+    Returns
+    -------
+    :obj:`list` of EventTypeDb
+        The event types loaded from the database.
+    '''
+    db_session = project.getDbSession()
+    event_types = []
+    try:
+        event_type_table = project.dbTables['event_type']
+        query = db_session.query(event_type_table)
+
+        if root_id is not None:
+            closure_table = project.dbTables['event_type_closure']
+            query = query.join(closure_table,
+                               closure_table.descendant_id == event_type_table.id).\
+                    filter(closure_table.ancestor_id == root_id)
+
+        event_types = query.all()
+
+        types_by_id = dict([(x.id, x) for x in event_types])
+        children = dict([(x.id, []) for x in event_types])
+        for cur_type in event_types:
+            if cur_type.parent_id in children:
+                children[cur_type.parent_id].append(cur_type)
+
+        for cur_type in event_types:
+            set_committed_value(cur_type, 'children', children[cur_type.id])
+            set_committed_value(cur_type, 'parent', types_by_id.get(cur_type.parent_id))
+    finally:
+        db_session.close()
+
+    return event_types
+
+
+def get_event_type_closure_paths(parents):
+    ''' Compute the closure table rows of an event type tree.
+
+    Parameters
+    ----------
+    parents : dict
+        The parent ids of the event types keyed by the event type ids.
+        Root event types have a parent id of None.
+
+    Returns
+    -------
+    :obj:`list` of :obj:`dict`
+        The closure table rows (ancestor_id, descendant_id, depth).
+    '''
+    paths = []
+    for cur_id in parents:
+        ancestor_id = cur_id
+        depth = 0
+        while ancestor_id is not None:
+            paths.append({'ancestor_id': ancestor_id,
+                          'descendant_id': cur_id,
+                          'depth': depth})
+            ancestor_id = parents.get(ancestor_id)
+            depth += 1
+    return paths
+
+
+def rebuild_event_type_closure(db_session, project):
+    ''' Rebuild the event type closure table from the event type tree.
+
+    This is a maintenance function to repair a closure table which is out
+    of sync with the event types. The changes are committed.
+
+    Parameters
+    ----------
+    db_session : :class:`sqlalchemy.orm.session.Session`
+        The database session used to rebuild the closure table.
+
+    project : :class:`~psysmon.core.project.Project`
+        The project used to access the database.
+    '''
+    event_type_table = project.dbTables['event_type']
+    closure_table = project.dbTables['event_type_closure']
+    parents = dict(db_session.query(event_type_table.id,
+                                    event_type_table.parent_id))
+    paths = get_event_type_closure_paths(parents)
+
+    db_session.execute(closure_table.__table__.delete())
+    if paths:
+        db_session.execute(closure_table.__table__.insert(), paths)
+    db_session.commit()
@@ -29,18 +29,21 @@
 
 '''
 from __future__ import division
-from builtins import str
-from builtins import range
-from builtins import object
-from past.utils import old_div
+import collections
+import concurrent.futures
+import ctypes
 import logging
 import copy
+import os
+import threading
 import numpy as np
 import matplotlib.pyplot as plt
 
 import psysmon
+import psysmon.core.database_util as database_util
 from psysmon.core.packageNodes import CollectionNode
 import psysmon.core.preferences_manager as psy_pm
+from obspy.core import Stream
 from obspy.core.utcdatetime import UTCDateTime
 import psysmon.core.lib_signal as lib_signal
 
@@ -65,8 +68,28 @@ class StaLtaDetectionNode(CollectionNode):
 
         # Setup the pages of the preference manager.
         self.create_general_prefs()
-        self.create_sta_lta_prefs()
-        self.create_processing_prefs()
+        self.create_sta_lta_page()
+        self.create_processing_preferences()
+
+        # The processed data of the recent intervals. The cache is shared
+        # by the successive executions of the node.
+        self.processed_cache = collections.OrderedDict()
+
+
+    def __getstate__(self):
+        ''' Remove the cached processed data before pickling the instance.
+        '''
+        result = CollectionNode.__getstate__(self)
+        result.pop('processed_cache', None)
+        return result
+
+
+    def __setstate__(self, d):
+        ''' Create an empty processed data cache after unpickling.
+        '''
+        CollectionNode.__setstate__(self, d)
+        self.processed_cache = collections.OrderedDict()
+
 
     def create_general_prefs(self):
         ''' Create the general preferences.
@@ -178,6 +201,21 @@ class StaLtaDetectionNode(CollectionNode):
                                      tool_tip = 'Edit the processing stack nodes.')
         ps_group.add_item(item)
 
+        par_group = proc_page.add_group('parallel processing')
+        item = psy_pm.IntegerSpinPrefItem(name = 'n_workers',
+                                          label = 'worker threads',
+                                          value = 0,
+                                          limit = (0, 256),
+                                          tool_tip = 'The number of threads used to process the channels. Use 0 to select the number of threads automatically.')
+        par_group.add_item(item)
+
+        item = psy_pm.IntegerSpinPrefItem(name = 'cache_size',
+                                          label = 'cached intervals',
+                                          value = 0,
+                                          limit = (0, 1000),
+                                          tool_tip = 'The number of processed intervals kept in memory. Repeated detections of the same intervals with the same processing stack reuse the processed data. Use 0 to disable the cache.')
+        par_group.add_item(item)
+
 
     def edit(self):
         if self.project.geometry_inventory:
@@ -204,25 +242,36 @@ class StaLtaDetectionNode(CollectionNode):
         processing_stack = ProcessingStack(name = 'pstack',
                                            project = self.project,
                                            nodes = self.pref_manager.get_value('processing_stack'))
+        cache_size = self.pref_manager.get_value('cache_size')
+        if cache_size == 0:
+            self.processed_cache.clear()
         detector = StaLtaDetector(cf_type = self.pref_manager.get_value('cf_type'),
                                   sta_len = self.pref_manager.get_value('sta_len'),
                                   lta_len = self.pref_manager.get_value('lta_len'),
                                   thr = self.pref_manager.get_value('thr'),
                                   project = self.project,
-                                  processing_stack = processing_stack)
+                                  processing_stack = processing_stack,
+                                  cache_size = cache_size,
+                                  processed_cache = self.processed_cache)
 
         detector.detect(start_time = self.pref_manager.get_value('start_time'),
                         end_time = self.pref_manager.get_value('end_time'),
                         stations = self.pref_manager.get_value('stations'),
-                        channels = self.pref_manager.get_value('channels'))
+                        channels = self.pref_manager.get_value('channels'),
+                        n_workers = self.pref_manager.get_value('n_workers'))
 
 
 
 class StaLtaDetector(object):
 
+    # The number of samples processed at once. Long traces are split into
+    # overlapping blocks to limit the size of the intermediate arrays.
+    block_size = 2**20
+
     def __init__(self, cf_type = 'square', sta_len = 2,
                  lta_len = 10, thr = 3, project = None,
-                 processing_stack = None):
+                 processing_stack = None, use_clib = True, cache_size = 0,
+                 processed_cache = None):
 
         # The logging logger instance.
         self.logger = psysmon.get_logger(self)
@@ -248,8 +297,33 @@ class StaLtaDetector(object):
         # detection.
         self.processing_stack = processing_stack
 
+        # Use the libsignal C library to compute the STA/LTA. If False, the
+        # NumPy implementation is used.
+        self.use_clib = use_clib
+
+        # The buffer holding the characteristic function. It is reused for
+        # all traces and grown if needed. Each thread uses its own buffer.
+        self._cf_buf = threading.local()
+
+        # The sample offset of the threshold function and the sampling
+        # interval for each sampling rate and LTA length.
+        self.sample_params = {}
+
+        # The number of processed intervals kept in memory. Repeated
+        # detections of the same intervals with the same processing stack,
+        # e.g. with different thresholds, reuse the processed data. The
+        # cache is disabled if the size is 0.
+        self.cache_size = cache_size
 
-    def detect(self, start_time, end_time, stations, channels, interval = 3600.):
+        # The processed streams of the recent intervals. Pass the cache of
+        # a previous detector to reuse the processed data of its intervals.
+        if processed_cache is None:
+            processed_cache = collections.OrderedDict()
+        self.processed_cache = processed_cache
+
+
+    def detect(self, start_time, end_time, stations, channels, interval = 3600.,
+               n_workers = None):
         ''' Start the detection.
 
         Parameters
@@ -269,16 +343,25 @@ class StaLtaDetector(object):
         interval : float
             The interval into which the time span is split to run successive detections.
 
+        n_workers : int
+            The number of threads used to process the SCNLs of an interval.
+            If None or 0, the number of SCNLs limited to the number of CPUs
+            is used.
+
         '''
         interval = float(interval)
 
-        n_intervals = old_div((end_time - start_time), interval)
-        interval_list = [start_time + x*interval for x in range(0, int(n_intervals))]
-
-        if not interval_list:
-            interval_list.append(start_time)
+        # Split the time span into intervals. The last interval is shortened
+        # to end at the end time. If the time span is empty, one interval
+        # starting at the start time is processed.
+        n_intervals = max(int(np.ceil((end_time - start_time) / interval)), 1)
+        interval_starts = start_time.timestamp + np.arange(n_intervals) * interval
+        interval_ends = interval_starts + interval
+        if end_time > start_time:
+            interval_ends = np.minimum(interval_ends, end_time.timestamp)
 
         scnl = []
+        channel_by_scnl = {}
         for cur_station_name in stations:
             for cur_channel_name in channels:
                 cur_channel = self.project.geometry_inventory.get_channel(station = cur_station_name,
@@ -287,94 +370,578 @@ class StaLtaDetector(object):
                     raise RuntimeError("More than one channel returned. Expected 0 or 1. There seems to be a problem in the geometry inventory.")
                 if cur_channel:
                     scnl.append(cur_channel[0].scnl)
+                    channel_by_scnl[cur_channel[0].scnl] = cur_channel[0]
 
 
         data_sources = self.get_data_sources(scnl)
 
-        for cur_start_time in interval_list:
-            cur_end_time = cur_start_time + interval
-            self.logger.info("Processing timespan %s to %s.", cur_start_time.isoformat(),
-                              cur_end_time.isoformat())
+        if not n_workers:
+            n_workers = max(min(len(scnl), os.cpu_count() or 1), 1)
+
+        # The SCNLs are independent of each other. Process them in parallel
+        # threads and write the results in the calling thread.
+        # The rows are collected over the intervals and written in batches
+        # using one database session.
+        detection_data = []
+        event_data = []
+        db_session = self.project.getDbSession()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers = n_workers) as executor:
+                for cur_start_ts, cur_end_ts in zip(interval_starts, interval_ends):
+                    cur_start_time = UTCDateTime(cur_start_ts)
+                    cur_end_time = UTCDateTime(cur_end_ts)
+                    self.logger.info("Processing timespan %s to %s.", cur_start_time.isoformat(),
+                                      cur_end_time.isoformat())
+
+                    cur_detection_data, cur_event_data = self.process_interval(executor = executor,
+                                                                               scnl = scnl,
+                                                                               channel_by_scnl = channel_by_scnl,
+                                                                               data_sources = data_sources,
+                                                                               start_time = cur_start_time,
+                                                                               end_time = cur_end_time)
+                    detection_data.extend(cur_detection_data)
+                    event_data.extend(cur_event_data)
+
+                    if len(detection_data) + len(event_data) >= database_util.batch_size:
+                        self.write_to_database(db_session, detection_data, event_data)
+                        detection_data = []
+                        event_data = []
+
+            self.write_to_database(db_session, detection_data, event_data)
+        finally:
+            db_session.close()
+
+
+    def write_to_database(self, db_session, detection_data, event_data):
+        ''' Write the detection results to the database.
+
+        The rows are written with executemany Core INSERT statements
+        instead of ORM instances. All rows are written in one
+        transaction.
+
+        Parameters
+        ----------
+        db_session : :class:`sqlalchemy.orm.Session`
+            The database session used to write the rows.
+
+        detection_data : :obj:`list` of :obj:`dict`
+            The rows of the detection table.
+
+        event_data : :obj:`list` of :obj:`dict`
+            The rows of the event table.
+        '''
+        if not detection_data and not event_data:
+            return
+
+        try:
+            connection = db_session.connection()
+            database_util.bulk_insert(connection = connection,
+                                      table = self.project.dbTables['detection'].__table__,
+                                      rows = detection_data)
+            database_util.bulk_insert(connection = connection,
+                                      table = self.project.dbTables['event'].__table__,
+                                      rows = event_data)
+            db_session.commit()
+        except Exception:
+            db_session.rollback()
+            raise
+
+
+    def process_interval(self, executor, scnl, channel_by_scnl, data_sources,
+                         start_time, end_time):
+        ''' Run the detection for all SCNLs of one time interval.
+
+        The data of the waveclients is requested and the events of the
+        SCNLs are detected in parallel threads. The processing stack is
+        executed once for the traces of all SCNLs. If this fails, the
+        SCNLs are processed one by one and the SCNLs with processing
+        errors are skipped. If cache_size is larger than 0, the processed
+        data of the interval is cached.
+
+        Parameters
+        ----------
+        executor : :class:`concurrent.futures.Executor`
+            The executor running the parallel tasks.
+
+        scnl : :obj:`list` of :obj:`tuple`
+            The SCNLs to process.
+
+        channel_by_scnl : :obj:`dict`
+            The inventory channels of the SCNLs.
+
+        data_sources : :obj:`dict`
+            The names of the waveclients of the SCNLs.
+
+        start_time : :class:`~obspy.core.utcdatetime.UTCDateTime`
+            The start time of the interval.
+
+        end_time : :class:`~obspy.core.utcdatetime.UTCDateTime`
+            The end time of the interval.
+
+        Returns
+        -------
+        detection_data : :obj:`list` of :obj:`dict`
+            The rows of the detection table.
+
+        event_data : :obj:`list` of :obj:`dict`
+            The rows of the event table.
+        '''
+        if self.cache_size > 0:
+            # The processed data depends on the requested time span and the
+            # settings of the processing stack.
+            cache_key = (tuple(scnl), start_time.timestamp, end_time.timestamp,
+                         self.lta_len, repr(self.processing_stack.get_settings()))
+            if cache_key in self.processed_cache:
+                self.logger.info("Using the cached processed data.")
+                streams = self.processed_cache.pop(cache_key)
+            else:
+                streams = self.get_processed_streams(executor = executor,
+                                                     scnl = scnl,
+                                                     data_sources = data_sources,
+                                                     start_time = start_time,
+                                                     end_time = end_time)
+            self.processed_cache[cache_key] = streams
+            while len(self.processed_cache) > self.cache_size:
+                self.processed_cache.popitem(last = False)
+        else:
+            streams = self.get_processed_streams(executor = executor,
+                                                 scnl = scnl,
+                                                 data_sources = data_sources,
+                                                 start_time = start_time,
+                                                 end_time = end_time)
+
+        futures = [executor.submit(self.detect_stream_events,
+                                   scnl = cur_scnl,
+                                   channel = channel_by_scnl[cur_scnl],
+                                   start_time = start_time,
+                                   end_time = end_time,
+                                   stream = streams[cur_scnl]) for cur_scnl in scnl if cur_scnl in streams]
+
+        detection_data = []
+        event_data = []
+        for cur_future in futures:
+            cur_detection_data, cur_event_data = cur_future.result()
+            detection_data.extend(cur_detection_data)
+            event_data.extend(cur_event_data)
+
+        return detection_data, event_data
+
+
+    def get_processed_streams(self, executor, scnl, data_sources,
+                              start_time, end_time):
+        ''' Request and process the data of all SCNLs of one time interval.
+
+        Parameters
+        ----------
+        executor : :class:`concurrent.futures.Executor`
+            The executor running the parallel tasks.
 
+        scnl : :obj:`list` of :obj:`tuple`
+            The SCNLs to process.
+
+        data_sources : :obj:`dict`
+            The names of the waveclients of the SCNLs.
+
+        start_time : :class:`~obspy.core.utcdatetime.UTCDateTime`
+            The start time of the interval.
+
+        end_time : :class:`~obspy.core.utcdatetime.UTCDateTime`
+            The end time of the interval.
+
+        Returns
+        -------
+        :obj:`dict`
+            The processed streams keyed by the SCNL.
+        '''
+        # Request the data of all SCNLs of a waveclient at once. The
+        # waveclients are requested in parallel.
+        scnl_by_source = {}
+        for cur_scnl in scnl:
+            scnl_by_source.setdefault(data_sources[cur_scnl], []).append(cur_scnl)
+
+        futures = [executor.submit(self.get_waveform,
+                                   scnl = cur_scnl_list,
+                                   start_time = start_time,
+                                   end_time = end_time,
+                                   data_source = cur_source) for cur_source, cur_scnl_list in scnl_by_source.items()]
+        source_streams = [x.result() for x in futures]
+        source_streams = [x for x in source_streams if x]
+
+        if not source_streams:
+            return {}
+
+        streams = {}
+        try:
+            # Execute each processing node once for the traces of all SCNLs.
+            # The traces are grouped by the requested SCNL because the
+            # processing might change the SCNL of the trace stats.
+            batch_stream = self.processing_stack.execute_batch(source_streams)
+            for cur_trace in batch_stream:
+                cur_scnl = cur_trace.stats.get('request_scnl', None)
+                if cur_scnl is None:
+                    self.logger.warning('The trace %s has no requested SCNL. Skipping it.', cur_trace)
+                    continue
+                streams.setdefault(cur_scnl, Stream()).append(cur_trace)
+        except Exception as e:
+            # The traces might be partially processed. Request the data
+            # again and process the SCNLs one by one.
+            self.logger.error('Error when processing the streams of all SCNLs. Processing the SCNLs one by one:\n%s', e)
+            streams = {}
             for cur_scnl in scnl:
+                cur_stream = self.get_waveform(scnl = [cur_scnl, ],
+                                               start_time = start_time,
+                                               end_time = end_time,
+                                               data_source = data_sources[cur_scnl])
+                if not cur_stream:
+                    continue
+
                 try:
-                    cur_channel = self.project.geometry_inventory.get_channel(station = cur_scnl[0], name = cur_scnl[1], network = cur_scnl[2])[0]
-                    cur_timebox = cur_channel.get_stream(start_time = cur_start_time, end_time = cur_end_time)[0]
-                    cur_stream_id = cur_timebox.item.id
-                except:
-                    cur_stream_id = None
-
-                cur_waveclient = self.project.waveclient[data_sources[cur_scnl]]
-                # Request data with a preceding window of length lta_len to
-                # eliminate the lta buildup effects at the start of the time
-                # window.
-                cur_stream = cur_waveclient.getWaveform(startTime = cur_start_time - self.lta_len,
-                                                        endTime = cur_end_time,
-                                                        scnl = [cur_scnl, ])
-                cur_stream = cur_stream.copy()
-
-                if cur_stream:
-                    self.logger.info("Processing stream %s.", cur_stream)
-                    try:
-                        cur_stream = cur_stream.split()
-                        self.processing_stack.execute(cur_stream)
-                        #cur_stream.detrend(type = 'constant')
-                        #cur_stream.filter('bandpass', freqmin = 1.0, freqmax = 100.0)
-                    except Exception as e:
-                        self.logger.error('Error when processing the stream %s:\n%s', str(cur_stream), e)
-                        continue
-
-                    db_data = []
-                    for cur_trace in cur_stream.traces:
-                        cf = self.compute_cf(cur_trace.data)
-                        cur_sps = cur_trace.stats.sampling_rate
-                        thrf, sta, lta = self.compute_thrf(cf, cur_sps)
-                        n_lta = int(self.lta_len * cur_sps)
-                        event_marker = self.compute_event_limits(cur_trace.data[n_lta:],
-                                                                 thrf, sta, lta)
-                        detection_table = self.project.dbTables['detection']
-                        event_table = self.project.dbTables['event']
-                        for det_start_ind, det_end_ind in event_marker:
-                            det_start_time = cur_trace.stats.starttime + old_div((n_lta + det_start_ind), cur_sps)
-                            det_end_time = det_start_time + old_div((det_end_ind - det_start_ind), cur_sps)
-                            cur_orm = detection_table(catalog_id = None,
-                                                      rec_stream_id = cur_stream_id,
-                                                      start_time = det_start_time.timestamp,
-                                                      end_time = det_end_time.timestamp,
-                                                      method = 'STA/LTA',
-                                                      agency_uri = self.project.activeUser.agency_uri,
-                                                      author_uri = self.project.activeUser.author_uri,
-                                                      creation_time = UTCDateTime().isoformat())
-                            db_data.append(cur_orm)
-
-                            # TODO: Remove this export to the events database
-                            # when the event binding is working.
-                            # Add the events detected on station AP01 and
-                            # channel HHZ to the events database.
-                            # This is used as a workaround because of a missing
-                            # event binding.
-                            if cur_scnl == ('AP01', 'HHZ', 'APO', '00'):
-                                comment_string = 'Detected on SCNL %s.' % str(cur_scnl)
-                                #comment_string = 'delete me'
-                                cur_orm = event_table(ev_catalog_id = None,
-                                                      start_time = det_start_time.timestamp,
-                                                      end_time = det_end_time.timestamp,
-                                                      comment = comment_string,
-                                                      agency_uri = self.project.activeUser.agency_uri,
-                                                      author_uri = self.project.activeUser.author_uri,
-                                                      creation_time = UTCDateTime().isoformat())
-                                db_data.append(cur_orm)
-
-                if db_data:
-                    db_session = self.project.getDbSession()
-                    db_session.add_all(db_data)
-                    db_session.commit()
-                    db_session.close()
+                    self.processing_stack.execute(cur_stream)
+                except Exception as e:
+                    self.logger.error('Error when processing the stream %s:\n%s', str(cur_stream), e)
+                    continue
+                streams[cur_scnl] = cur_stream
+
+        return streams
 
 
+    def get_waveform(self, scnl, start_time, end_time, data_source):
+        ''' Request the data of SCNLs from one waveclient.
 
+        The data is requested with a preceding window of length lta_len to
+        eliminate the LTA buildup effects at the start of the time window.
+        The method is thread safe.
 
+        Parameters
+        ----------
+        scnl : :obj:`list` of :obj:`tuple`
+            The SCNLs of the channels to process.
 
+        start_time : :class:`~obspy.core.utcdatetime.UTCDateTime`
+            The start time of the processing time window.
+
+        end_time : :class:`~obspy.core.utcdatetime.UTCDateTime`
+            The end time of the processing time window.
+
+        data_source : String
+            The name of the waveclient providing the data.
+
+        Returns
+        -------
+        :class:`obspy.core.Stream`
+            The data of all SCNLs split at the data gaps. The requested
+            SCNL of each trace is stored in the trace stats (request_scnl).
+        '''
+        cur_waveclient = self.project.waveclient[data_source]
+        cur_stream = cur_waveclient.getWaveform(startTime = start_time - self.lta_len,
+                                                endTime = end_time,
+                                                scnl = scnl)
+        # The waveclients return copies of their stock data. The stream can
+        # be processed in place without copying it.
+        if cur_stream:
+            self.logger.info("Processing stream %s.", cur_stream)
+            cur_stream = cur_stream.split()
+            for cur_trace in cur_stream:
+                cur_trace_scnl = (cur_trace.stats.station, cur_trace.stats.channel,
+                                  cur_trace.stats.network, cur_trace.stats.location)
+                if cur_trace_scnl in scnl:
+                    cur_trace.stats.request_scnl = cur_trace_scnl
+                elif len(scnl) == 1:
+                    cur_trace.stats.request_scnl = scnl[0]
+
+        return cur_stream
+
+
+    def detect_stream_events(self, scnl, channel, start_time, end_time, stream):
+        ''' Detect the events in the processed data stream of one SCNL.
+
+        The method is thread safe. The detections are returned as
+        dictionaries of the database table columns, the database is not
+        accessed.
+
+        Parameters
+        ----------
+        scnl : tuple of Strings
+            The SCNL of the channel to process.
+
+        channel : :class:`~psysmon.packages.geometry.inventory.Channel`
+            The inventory channel of the SCNL.
+
+        start_time : :class:`~obspy.core.utcdatetime.UTCDateTime`
+            The start time of the processing time window.
+
+        end_time : :class:`~obspy.core.utcdatetime.UTCDateTime`
+            The end time of the processing time window.
+
+        stream : :class:`obspy.core.Stream`
+            The processed data of the SCNL.
+
+        Returns
+        -------
+        detection_data : :obj:`list` of :obj:`dict`
+            The rows of the detection table.
+
+        event_data : :obj:`list` of :obj:`dict`
+            The rows of the event table.
+        '''
+        detection_data = []
+        event_data = []
+
+        try:
+            cur_timebox = channel.get_stream(start_time = start_time, end_time = end_time)[0]
+            cur_stream_id = cur_timebox.item.id
+        except (IndexError, AttributeError):
+            self.logger.debug("No recorder stream found for SCNL %s from %s to %s.",
+                              scnl, start_time.isoformat(), end_time.isoformat())
+            cur_stream_id = None
+
+        creation_time = UTCDateTime().isoformat()
+        for cur_trace in stream.traces:
+            cur_sps = cur_trace.stats.sampling_rate
+            param_key = (cur_sps, self.lta_len)
+            if param_key not in self.sample_params:
+                # The first STA/LTA value belongs to the last sample
+                # of the first LTA window.
+                n_offset = int(self.lta_len * cur_sps) - 1
+                self.sample_params[param_key] = (n_offset, 1. / cur_sps)
+            n_offset, delta = self.sample_params[param_key]
+            trace_start = cur_trace.stats.starttime.timestamp
+
+            event_marker = self.compute_trace_events(cur_trace.data, cur_sps)
+            for det_start_ind, det_end_ind in event_marker:
+                det_start_time = trace_start + (n_offset + det_start_ind) * delta
+                det_end_time = det_start_time + (det_end_ind - det_start_ind) * delta
+                detection_data.append({'catalog_id': None,
+                                       'rec_stream_id': cur_stream_id,
+                                       'start_time': det_start_time,
+                                       'end_time': det_end_time,
+                                       'method': 'STA/LTA',
+                                       'agency_uri': self.project.activeUser.agency_uri,
+                                       'author_uri': self.project.activeUser.author_uri,
+                                       'creation_time': creation_time})
+
+                # TODO: Remove this export to the events database
+                # when the event binding is working.
+                # Add the events detected on station AP01 and
+                # channel HHZ to the events database.
+                # This is used as a workaround because of a missing
+                # event binding.
+                if scnl == ('AP01', 'HHZ', 'APO', '00'):
+                    comment_string = 'Detected on SCNL %s.' % str(scnl)
+                    #comment_string = 'delete me'
+                    event_data.append({'ev_catalog_id': None,
+                                       'start_time': det_start_time,
+                                       'end_time': det_end_time,
+                                       'comment': comment_string,
+                                       'agency_uri': self.project.activeUser.agency_uri,
+                                       'author_uri': self.project.activeUser.author_uri,
+                                       'creation_time': creation_time})
+
+        return detection_data, event_data
+
+
+    def compute_cf(self, data):
+        ''' Compute the characteristic function.
+
+        The characteristic function is written into a float32 buffer which
+        is reused by the next call of the same thread. The returned array
+        is valid until compute_cf is called again. The single precision
+        halves the memory traffic of the STA/LTA computation, the sums of
+        the STA and LTA windows are accumulated in double precision.
+
+        Parameters
+        ----------
+        data : :class:`numpy.ndarray`
+            The data samples.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The characteristic function of the data.
+        '''
+        if self.cf_type not in ['abs', 'square']:
+            raise ValueError("Wrong value for cf_type: %s." % self.cf_type)
+
+        n_data = len(data)
+        cf_buf = getattr(self._cf_buf, 'data', None)
+        if cf_buf is None or len(cf_buf) < n_data:
+            cf_buf = np.empty(n_data, dtype = np.float32)
+            self._cf_buf.data = cf_buf
+        cf = cf_buf[:n_data]
+
+        if self.cf_type == 'abs':
+            np.abs(data, out = cf, dtype = np.float32)
+        elif self.cf_type == 'square':
+            np.multiply(data, data, out = cf, dtype = np.float32)
+
+        return cf
+
+
+    def compute_thrf(self, cf, sps):
+        ''' Compute the STA/LTA threshold function.
+
+        The STA and the LTA are computed by the libsignal C library or,
+        if use_clib is False, using the cumulative sum of the
+        characteristic function. The STA and LTA windows end at the same
+        sample. The first values of the
+        returned arrays belong to the last sample of the first complete LTA
+        window.
+
+        Parameters
+        ----------
+        cf : :class:`numpy.ndarray`
+            The characteristic function.
+
+        sps : float
+            The sampling rate of the characteristic function.
+
+        Returns
+        -------
+        thrf : :class:`numpy.ndarray`
+            The STA/LTA ratio.
+
+        sta : :class:`numpy.ndarray`
+            The short-term average.
+
+        lta : :class:`numpy.ndarray`
+            The long-term average.
+        '''
+        n_sta = int(self.sta_len * sps)
+        n_lta = int(self.lta_len * sps)
+        if n_sta < 1 or n_lta <= n_sta:
+            raise ValueError("The LTA length has to be larger than the STA length (n_sta: %d, n_lta: %d)." % (n_sta, n_lta))
+
+        n_cf = len(cf)
+        if n_cf < n_lta:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        if self.use_clib:
+            cf = np.ascontiguousarray(cf, dtype = np.float32)
+            n_out = n_cf - n_lta + 1
+            sta = np.empty(n_out, dtype = np.float64)
+            lta = np.empty(n_out, dtype = np.float64)
+            thrf = np.empty(n_out, dtype = np.float64)
+            lib_signal.clib_signal.sta_lta(n_cf, n_sta, n_lta, cf, sta, lta, thrf)
+        else:
+            # Compute the window sums as differences of the cumulative sum.
+            # The float64 accumulator avoids the loss of precision for long
+            # LTA windows.
+            cs = np.concatenate(([0.], np.cumsum(cf, dtype = np.float64)))
+            sta = (cs[n_sta:] - cs[:-n_sta])[n_lta - n_sta:] / n_sta
+            lta = (cs[n_lta:] - cs[:-n_lta]) / n_lta
+            thrf = np.zeros(len(lta), dtype = np.float64)
+            np.divide(sta, lta, out = thrf, where = lta > 0)
+
+        return thrf, sta, lta
+
+
+    def compute_event_limits(self, thrf):
+        ''' Compute the event limits from the threshold function.
+
+        An event starts when the threshold function reaches the threshold
+        and ends when it drops below the threshold. An event which is still
+        active at the end of the threshold function ends with the last
+        sample. The threshold crossings are searched by the libsignal C
+        library if use_clib is True, otherwise by the edges of the NumPy
+        trigger state array.
+
+        Parameters
+        ----------
+        thrf : :class:`numpy.ndarray`
+            The STA/LTA threshold function.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`tuple`
+            The start and end indices of the events.
+        '''
+        if self.use_clib:
+            thrf = np.ascontiguousarray(thrf, dtype = np.float64)
+            n_thrf = len(thrf)
+            starts = np.empty(n_thrf // 2 + 1, dtype = ctypes.c_long)
+            ends = np.empty(n_thrf // 2 + 1, dtype = ctypes.c_long)
+            n_limits = lib_signal.clib_signal.threshold_limits(n_thrf, thrf, self.thr,
+                                                               starts, ends)
+            return list(zip(starts[:n_limits].tolist(), ends[:n_limits].tolist()))
+
+        # Find the edges of the trigger state. The padding with zeros
+        # closes an event which is still active at the end.
+        state = np.asarray(thrf) >= self.thr
+        edges = np.diff(state.astype(np.int8), prepend = 0, append = 0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        return list(zip(starts.tolist(), ends.tolist()))
+
+
+    def compute_trace_events(self, data, sps):
+        ''' Compute the event limits of a data trace.
+
+        If use_clib is True, the characteristic function, the STA/LTA and
+        the threshold crossings are computed in one pass over the data by
+        the libsignal C library without storing intermediate arrays.
+
+        Otherwise the data is processed in blocks of block_size samples.
+        The blocks overlap by one LTA window, so that the threshold
+        functions of the blocks join without a gap. Events spanning a
+        block border are merged.
+
+        Parameters
+        ----------
+        data : :class:`numpy.ndarray`
+            The data samples.
+
+        sps : float
+            The sampling rate of the data.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`tuple`
+            The start and end indices of the events. The indices refer to
+            the threshold function of the complete trace.
+        '''
+        n_lta = int(self.lta_len * sps)
+
+        if self.use_clib:
+            n_sta = int(self.sta_len * sps)
+            if n_sta < 1 or n_lta <= n_sta:
+                raise ValueError("The LTA length has to be larger than the STA length (n_sta: %d, n_lta: %d)." % (n_sta, n_lta))
+
+            n_data = len(data)
+            if n_data < n_lta:
+                return []
+
+            data = np.ascontiguousarray(data, dtype = np.float64)
+            n_max = (n_data - n_lta + 1) // 2 + 1
+            starts = np.empty(n_max, dtype = ctypes.c_long)
+            ends = np.empty(n_max, dtype = ctypes.c_long)
+            cf_types = {'abs': 0, 'square': 1}
+            if self.cf_type not in cf_types:
+                raise ValueError("Wrong value for cf_type: %s." % self.cf_type)
+            n_limits = lib_signal.clib_signal.sta_lta_limits(n_data, data,
+                                                             cf_types[self.cf_type],
+                                                             n_sta, n_lta, self.thr,
+                                                             starts, ends)
+            return list(zip(starts[:n_limits].tolist(), ends[:n_limits].tolist()))
+
+        block_size = max(self.block_size, 2 * n_lta)
+        step = block_size - (n_lta - 1)
+
+        event_marker = []
+        for block_start in range(0, max(len(data) - n_lta + 1, 1), step):
+            cf = self.compute_cf(data[block_start:block_start + block_size])
+            thrf, sta, lta = self.compute_thrf(cf, sps)
+            for cur_start, cur_end in self.compute_event_limits(thrf):
+                cur_start += block_start
+                cur_end += block_start
+                if event_marker and event_marker[-1][1] == cur_start:
+                    # The event continues an event open at the end of the
+                    # previous block.
+                    event_marker[-1] = (event_marker[-1][0], cur_end)
+                else:
+                    event_marker.append((cur_start, cur_end))
+
+        return event_marker
 
 
     def get_data_sources(self, scnl):
@@ -86,20 +86,30 @@ class DetectionBinder(object):
         ''' Bind the detections to events.
         '''
         # Get the detections of the channels and sort them according to time.
+        # The detections of each channel are processed in time order. Instead
+        # of removing the processed detections from the lists, the index of
+        # the next unprocessed detection of each channel is stored in
+        # next_ind. The start times are kept as float timestamps for the
+        # comparisons.
         detections = {}
+        start_times = {}
         for cur_scnl in channel_scnl:
             detections[cur_scnl] = catalog.get_detections(scnl = cur_scnl)
             detections[cur_scnl] = sorted(detections[cur_scnl],
                                           key = op.attrgetter('start_time'))
+            start_times[cur_scnl] = [x.start_time.timestamp for x in detections[cur_scnl]]
+        next_ind = dict([(x, 0) for x in detections])
 
-        # Get the earlies detection of each channel. Remove these detections
-        # from the detections list.
-        next_detections = [x[0] for x in list(detections.values()) if len(x) > 0]
+        # Get the earliest unprocessed detection of each channel.
+        next_scnl = [x for x in detections if next_ind[x] < len(detections[x])]
 
-        while len(next_detections) > 0:
+        while len(next_scnl) > 0:
 
-            next_detections = sorted(next_detections,
-                                     key = op.attrgetter('start_time'))
+            next_scnl = sorted(next_scnl,
+                               key = lambda x: start_times[x][next_ind[x]])
+            next_detections = [detections[x][next_ind[x]] for x in next_scnl]
+            first_start = start_times[next_scnl[0]][next_ind[next_scnl[0]]]
+            next_start = [start_times[x][next_ind[x]] for x in next_scnl[1:]]
             first_detection = next_detections.pop(0)
 
             self.logger.debug('Processing detection %d, %s, %s.',
@@ -126,7 +136,7 @@ class DetectionBinder(object):
             self.logger.debug('Extended search windows: %s', ext_sw)
 
             # Get the detections matching the search window.
-            match_detections = [x for k, x in enumerate(next_detections) if x.start_time <= first_detection.start_time + ext_sw[k]]
+            match_detections = [x for k, x in enumerate(next_detections) if next_start[k] <= first_start + ext_sw[k]]
             self.logger.debug('Matching detections: %s.', [(x.db_id, x.start_time, x.snl) for x in match_detections])
 
             # Check if there are matching detections on neighboring stations.
@@ -186,15 +196,17 @@ class DetectionBinder(object):
                                   event.start_time,
                                   event.end_time)
 
-                # Remove the matching detections from the detections list.
+                # Mark the matching detections as processed. The matching
+                # detections are the earliest unprocessed detections of
+                # their channels.
                 for cur_detection in match_detections:
-                    detections[cur_detection.scnl].remove(cur_detection)
+                    next_ind[cur_detection.scnl] += 1
             else:
-                # Remove the first detection from the detections list.
-                detections[first_detection.scnl].remove(first_detection)
+                # Mark the first detection as processed.
+                next_ind[first_detection.scnl] += 1
 
             # Get the next earliest detection of each channel.
-            next_detections = [x[0] for x in list(detections.values()) if len(x) > 0]
+            next_scnl = [x for x in detections if next_ind[x] < len(detections[x])]
 
 
     def get_search_window(self, master, slaves):
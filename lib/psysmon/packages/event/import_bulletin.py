@@ -99,7 +99,8 @@ class ImportBulletin(CollectionNode):
                 parser.parse(cur_file)
                 catalog = parser.get_catalog(author_uri = self.project.activeUser.author_uri,
                                              agency_uri = self.project.activeUser.agency_uri)
-                catalog.write_to_database(self.project)
+                catalog.write_to_database(self.project,
+                                          bulk_insert = True)
 
 
 
@@ -26,6 +26,7 @@ import numpy as np
 import obspy.core.utcdatetime as utcdatetime
 
 import psysmon
+import psysmon.core.database_util as database_util
 import psysmon.core.packageNodes as package_nodes
 import psysmon.core.preferences_manager as preferences_manager
 import psysmon.packages.event.detect as detect
@@ -282,6 +283,7 @@ class StaLtaDetection(package_nodes.LooperCollectionChildNode):
                                          stop_growth_inc = stop_growth_inc)
 
         # The list to store the data to be inserted into the database.
+        detection_table = self.project.dbTables['detection']
         db_data = []
 
         # Detect the events using the STA/LTA detector.
@@ -360,26 +362,31 @@ class StaLtaDetection(package_nodes.LooperCollectionChildNode):
             except:
                 cur_stream_id = None
 
-            # Write the detections to the database.
-            detection_table = self.project.dbTables['detection']
+            # Collect the detections to write to the database.
             for det_start_ind, det_end_ind in detection_markers:
                 det_start_time = time_array[det_start_ind]
                 det_end_time = time_array[det_end_ind]
-                cur_orm = detection_table(catalog_id = selected_catalog.id,
-                                          rec_stream_id = cur_stream_id,
-                                          start_time = float(det_start_time),
-                                          end_time = float(det_end_time),
-                                          method = self.name_slug,
-                                          agency_uri = self.project.activeUser.agency_uri,
-                                          author_uri = self.project.activeUser.author_uri,
-                                          creation_time = utcdatetime.UTCDateTime().isoformat())
-                db_data.append(cur_orm)
+                db_data.append({'catalog_id': selected_catalog.id,
+                                'rec_stream_id': cur_stream_id,
+                                'start_time': float(det_start_time),
+                                'end_time': float(det_end_time),
+                                'method': self.name_slug,
+                                'agency_uri': self.project.activeUser.agency_uri,
+                                'author_uri': self.project.activeUser.author_uri,
+                                'creation_time': utcdatetime.UTCDateTime().isoformat()})
 
         if db_data:
+            # Write all detections of the time window in one transaction
+            # using executemany Core INSERT statements.
+            db_session = self.project.getDbSession()
             try:
-                db_session = self.project.getDbSession()
-                db_session.add_all(db_data)
+                database_util.bulk_insert(connection = db_session.connection(),
+                                          table = detection_table.__table__,
+                                          rows = db_data)
                 db_session.commit()
+            except Exception:
+                db_session.rollback()
+                raise
             finally:
                 db_session.close()
 
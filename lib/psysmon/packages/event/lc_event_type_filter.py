@@ -18,11 +18,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import sqlalchemy.orm
-
 import psysmon
 import psysmon.core.packageNodes as package_nodes
 import psysmon.core.preferences_manager as psy_pm
+import psysmon.packages.event.core as event_core
 
 # Import GUI related modules only if wxPython is available.
 if psysmon.wx_available:
@@ -115,15 +114,4 @@ class TypeFilter(package_nodes.LooperCollectionChildNode):
     def load_event_types(self):
         ''' Load the available event types from the database.
         '''
-        db_session = self.project.getDbSession()
-        event_types = []
-        try:
-            event_type_table = self.project.dbTables['event_type']
-            query = db_session.query(event_type_table)
-            query = query.options(sqlalchemy.orm.immediateload(event_type_table.children))
-            query = query.options(sqlalchemy.orm.immediateload(event_type_table.parent))
-            event_types = query.all()
-        finally:
-            db_session.close()
-
-        return event_types
+        return event_core.load_event_types(project = self.project)
@@ -183,7 +183,7 @@ class CreateEvent(InteractivePlugin):
                     inv = cur_view.axes.transData.inverted()
                     tmp = inv.transform((event.x, event.y))
                     event.xdata = tmp[0]
-                if cur_view not in iter(self.bg.keys()):
+                if cur_view not in self.bg:
                     self.bg[cur_view] = cur_view.plot_panel.canvas.copy_from_bbox(cur_view.axes.bbox)
                 cur_view.plot_panel.canvas.restore_region(self.bg[cur_view])
 
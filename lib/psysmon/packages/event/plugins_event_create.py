@@ -19,19 +19,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from builtins import str
-import logging
 
-import sqlalchemy.orm
 import wx
 
 import psysmon
 from psysmon.core.plugins import InteractivePlugin
-from psysmon.gui.bricks import PrefEditPanel
 from psysmon.artwork.icons import iconsBlack16 as icons
 import psysmon.core.preferences_manager as psy_pm
 from obspy.core.utcdatetime import UTCDateTime
-import wx.lib.mixins.listctrl as listmix
-from wx.lib.stattext import GenStaticText as StaticText
 import psysmon.packages.event.core as event_core
 
 import psysmon.gui.validator as psy_val
@@ -64,12 +59,33 @@ class CreateEvent(InteractivePlugin):
         # The name of the selected catalog.
         self.selected_catalog_name = None
 
+        # The catalog name and time window of the last events loaded from
+        # the database.
+        self._last_loaded_window = None
+
+        # The cached names of the catalogs available in the database.
+        self.catalog_names = None
+
+        # The created events not yet written to the database.
+        self._pending_events = []
+        self._flush_timer = None
+
+        # The creation time of the pending events.
+        self._batch_creation_time = None
+
+        # The agency and author of the created events.
+        self._agency_uri = None
+        self._author_uri = None
+
         # The plot colors used by the plugin.
         self.colors = {}
         self.colors['event_vspan'] = '0.9'
 
         # Animation stuff.
         self.bg = {}
+        self._active_views = []
+        self._pending_motion = None
+        self._motion_timer = None
         self.startTime = None
         self.endTime = None
 
@@ -107,8 +123,10 @@ class CreateEvent(InteractivePlugin):
     def buildFoldPanel(self, panelBar):
         ''' Create the foldpanel GUI.
         '''
+        from psysmon.gui.bricks import PrefEditPanel
+
         # Set the limits of the event_catalog field.
-        catalog_names = self.library.get_catalogs_in_db(project = self.parent.project)
+        catalog_names = self.get_catalog_names()
         self.pref_manager.set_limit('event_catalog', catalog_names)
         if catalog_names:
             self.pref_manager.set_value('event_catalog', catalog_names[0])
@@ -147,8 +165,12 @@ class CreateEvent(InteractivePlugin):
         self.logger.debug("Activating the create event plugin.")
         InteractivePlugin.activate(self)
 
+        active_user = self.parent.project.activeUser
+        self._agency_uri = active_user.agency_uri
+        self._author_uri = active_user.author_uri
+
         if not self.selected_catalog_name:
-            catalog_names = self.library.get_catalogs_in_db(self.parent.project)
+            catalog_names = self.get_catalog_names()
             self.pref_manager.set_limit('event_catalog', catalog_names)
             if catalog_names:
                 self.pref_manager.set_value('event_catalog', catalog_names[0])
@@ -163,7 +185,12 @@ class CreateEvent(InteractivePlugin):
     def deactivate(self):
         ''' Deactivate the plugin.
         '''
+        # Remove the annotation artists kept for the reuse in the next
+        # mouse drag.
+        for cur_node in self.parent.viewport.get_node(recursive = False):
+            cur_node.clear_annotation_artist(parent_rid = self.rid)
         self.cleanup()
+        self.flush_pending_events()
         InteractivePlugin.deactivate(self)
 
 
@@ -185,14 +212,18 @@ class CreateEvent(InteractivePlugin):
     def on_select_catalog(self):
         ''' Handle the catalog selection.
         '''
-        self.selected_catalog_name = self.pref_manager.get_value('event_catalog')
-        # Load the catalog from the database.
-        self.library.clear()
-        self.library.load_catalog_from_db(project = self.parent.project,
-                                          name = self.selected_catalog_name)
+        new_name = self.pref_manager.get_value('event_catalog')
+
+        # Load the catalog from the database only if it has not been loaded
+        # before. Catalogs already in the library are reused.
+        if new_name not in self.library.catalogs:
+            self.library.load_catalog_from_db(project = self.parent.project,
+                                              name = new_name)
+        self.selected_catalog_name = new_name
 
         # TODO: Display all existing events.
-        # Load the events.
+        # Load the events. This is a no-op if the events of the catalog
+        # have already been loaded for the current time window.
         self.load_events()
 
         # Clear existing pick lines.
@@ -219,27 +250,45 @@ class CreateEvent(InteractivePlugin):
     def load_events(self):
         ''' Load the events for the current timespan of the tracedisplay.
         '''
+        start_time = self.parent.displayManager.startTime
+        end_time = self.parent.displayManager.endTime
+        cur_window = (self.selected_catalog_name, start_time, end_time)
+        if cur_window == self._last_loaded_window:
+            return
+
         cur_catalog = self.library.catalogs[self.selected_catalog_name]
         cur_catalog.clear_events()
-        cur_catalog.load_events(project = self.parent.project,
-                                start_time = self.parent.displayManager.startTime,
-                                end_time = self.parent.displayManager.endTime)
+        cur_catalog.load_events_in_timespan(project = self.parent.project,
+                                            start_time = start_time,
+                                            end_time = end_time)
+        self._last_loaded_window = cur_window
+
+    def get_catalog_names(self, refresh = False):
+        ''' Get the names of the catalogs available in the database.
+
+        The names are queried from the database only once and cached
+        afterwards.
+
+        Parameters
+        ----------
+        refresh : Boolean
+            If True, query the catalog names from the database even if
+            they have been cached.
+
+        Returns
+        -------
+        catalog_names : List of Strings
+            The available catalog names in the database.
+        '''
+        if refresh or self.catalog_names is None:
+            self.catalog_names = self.library.get_catalogs_in_db(project = self.parent.project)
+        return list(self.catalog_names)
+
 
     def load_event_types(self):
         ''' Load the available event types from the database.
         '''
-        db_session = self.parent.project.getDbSession()
-        event_types = []
-        try:
-            event_type_table = self.parent.project.dbTables['event_type']
-            query = db_session.query(event_type_table)
-            query = query.options(sqlalchemy.orm.immediateload(event_type_table.children))
-            query = query.options(sqlalchemy.orm.immediateload(event_type_table.parent))
-            event_types = query.all()
-        finally:
-            db_session.close()
-
-        return event_types
+        return event_core.load_event_types(project = self.parent.project)
 
 
 
@@ -295,6 +344,9 @@ class CreateEvent(InteractivePlugin):
                                      author_uri = self.parent.project.activeUser.author_uri,
                                      creation_time = UTCDateTime().isoformat())
         catalog.write_to_database(self.parent.project)
+        if self.catalog_names is not None:
+            self.catalog_names.append(catalog.name)
+            self.catalog_names.sort()
         cur_limit = self.pref_manager.get_limit('event_catalog')
         cur_limit.append(catalog.name)
         self.pref_manager.set_limit('event_catalog', cur_limit)
@@ -326,82 +378,77 @@ class CreateEvent(InteractivePlugin):
             cur_node.plot_annotation_vline(x = event.xdata,
                                            parent_rid = self.rid,
                                            key = 'begin_line')
-            cur_node.draw()
-
-        #for curStation in viewport.stations:
-        #    for curChannel in curStation.channels.values():
-        #        for curView in curChannel.views.values():
-        #            #bg = curView.plotCanvas.canvas.copy_from_bbox(curView.dataAxes.bbox)
-        #            #curView.plotCanvas.canvas.restore_region(bg)
-        #
-        #            if curView in self.end_line.iterkeys():
-        #                self.end_line[curView].set_visible(False)
-        #                curView.dataAxes.draw_artist(self.end_line[curView])
-        #
-        #
-        #           if curView in self.begin_line.iterkeys():
-        #               self.begin_line[curView].set_xdata(event.xdata)
-        #           else:
-        #               self.begin_line[curView] = curView.dataAxes.axvline(x=event.xdata)
-        #
-        #           curView.plotCanvas.canvas.draw()
-        #
-        #          cid = curView.plotCanvas.canvas.mpl_connect('motion_notify_event', lambda evt, dataManager=dataManager, displayManager=displayManager, callback=self.on_mouse_motion : callback(evt, dataManager, displayManager))
-        #         self.motion_notify_cid.append((curView.plotCanvas.canvas, cid))
+
+        # Show the lines hidden at the end of the previous drag.
+        self.set_line_visibility(True)
+
+        # Draw each canvas only once. The canvas has to be drawn
+        # synchronously to get the begin line into the saved blit
+        # backgrounds.
+        canvas_list = set([x.plot_panel.canvas for x in viewport.get_node(node_type = 'view')])
+        for cur_canvas in canvas_list:
+            cur_canvas.draw()
+
+        # Collect the views once for the use in the mouse motion callback.
+        # The background of the axes is stable during the mouse drag.
+        # Save it after drawing the begin line and create the animated end
+        # line artist.
+        self._active_views = []
+        self.bg = {}
+        channel_container = viewport.get_node(group = 'channel_container', node_type = 'container')
+        for cur_container in channel_container:
+            for cur_view in cur_container.get_node(node_type = 'view'):
+                artists = cur_view.plot_annotation_vline(x = event.xdata,
+                                                         parent_rid = self.rid,
+                                                         key = 'end_line',
+                                                         animated = True)
+                if not artists:
+                    continue
+                canvas = cur_view.plot_panel.canvas
+                self.bg[cur_view] = canvas.copy_from_bbox(cur_view.axes.bbox)
+                self._active_views.append((canvas,
+                                           cur_view.axes,
+                                           cur_view,
+                                           artists[0]))
 
 
     def on_mouse_motion(self, event, parent = None):
         if event.inaxes is not None:
             self.endTime = event.xdata
 
-        viewport = self.parent.viewport
+        # Coalesce the motion events. Only the latest mouse position is
+        # drawn at most once per frame.
+        self._pending_motion = (event.xdata, event.x, event.y, event.inaxes)
+        if self._motion_timer is None:
+            self._motion_timer = wx.CallLater(16, self.flush_motion)
 
-        channel_container = viewport.get_node(group = 'channel_container', node_type = 'container')
 
-        for cur_container in channel_container:
-            view_nodes = cur_container.get_node(node_type = 'view')
-            for cur_view in view_nodes:
-                if event.inaxes is None:
-                    inv = cur_view.axes.transData.inverted()
-                    tmp = inv.transform((event.x, event.y))
-                    event.xdata = tmp[0]
-                if cur_view not in iter(self.bg.keys()):
-                    self.bg[cur_view] = cur_view.plot_panel.canvas.copy_from_bbox(cur_view.axes.bbox)
-                cur_view.plot_panel.canvas.restore_region(self.bg[cur_view])
-
-                line_artist, label_artist = cur_view.plot_annotation_vline(x = event.xdata,
-                                                                           parent_rid = self.rid,
-                                                                           key = 'end_line',
-                                                                           animated = True)
-
-                cur_view.axes.draw_artist(line_artist)
-                cur_view.plot_panel.canvas.blit()
-
-
-#        for curStation in viewport.stations:
-#            for curChannel in curStation.channels.values():
-#                for curView in curChannel.views.values():
-#                    if event.inaxes is None:
-#                        inv = curView.dataAxes.transData.inverted()
-#                        tmp = inv.transform((event.x, event.y))
-#                        self.logger.debug('xTrans: %f', tmp[0])
-#                        event.xdata = tmp[0]
-#                    canvas = curView.plotCanvas.canvas
-#                    if curView not in self.bg.iterkeys():
-#                        self.bg[curView] = canvas.copy_from_bbox(curView.dataAxes.bbox)
-#                    canvas.restore_region(self.bg[curView])
-#
-#                    if curView not in self.end_line.iterkeys():
-#                        self.end_line[curView] = curView.dataAxes.axvline(x=event.xdata, animated=True)
-#                    else:
-#                        self.end_line[curView].set_xdata(event.xdata)
-#                        self.end_line[curView].set_visible(True)
-#
-#                    curView.dataAxes.draw_artist(self.end_line[curView])
-#                    canvas.blit()
-
-
-    def on_button_release(self, event, dataManager=None, displayManager=None):
+    def flush_motion(self):
+        ''' Draw the end line at the latest pending mouse position.
+        '''
+        self._motion_timer = None
+        if self._pending_motion is None:
+            return
+        xdata, x, y, inaxes = self._pending_motion
+        self._pending_motion = None
+
+        # Draw the lines of all views and blit each canvas only once.
+        canvas_list = []
+        for canvas, axes, cur_view, line_artist in self._active_views:
+            if inaxes is None:
+                inv = axes.transData.inverted()
+                xdata = inv.transform((x, y))[0]
+            canvas.restore_region(self.bg[cur_view])
+            line_artist.set_xdata([xdata, xdata])
+            axes.draw_artist(line_artist)
+            if canvas not in canvas_list:
+                canvas_list.append(canvas)
+
+        for cur_canvas in canvas_list:
+            cur_canvas.blit()
+
+
+    def on_button_release(self, event, parent = None):
         self.logger.debug('onButtonRelease')
 
         self.cleanup()
@@ -419,33 +466,97 @@ class CreateEvent(InteractivePlugin):
     def create_event(self, start_time, end_time):
         ''' Create a new event in the database.
         '''
+        # The events written to the database at once share the creation
+        # time.
+        if self._batch_creation_time is None:
+            self._batch_creation_time = UTCDateTime()
+
         cur_catalog = self.library.catalogs[self.selected_catalog_name]
-        event = event_core.Event(start_time = UTCDateTime(start_time),
-                                 end_time = UTCDateTime(end_time),
+        event = event_core.Event(start_time = start_time,
+                                 end_time = end_time,
                                  event_type = self.selected_event_type_id,
-                                 agency_uri = self.parent.project.activeUser.agency_uri,
-                                 author_uri = self.parent.project.activeUser.author_uri,
-                                 creation_time = UTCDateTime().isoformat())
+                                 agency_uri = self._agency_uri,
+                                 author_uri = self._author_uri,
+                                 creation_time = self._batch_creation_time)
         cur_catalog.add_events([event, ])
-        event.write_to_database(self.parent.project)
+
+        # Collect the events created in quick succession and write them
+        # to the database at once.
+        self._pending_events.append(event)
+        if self._flush_timer is None:
+            self._flush_timer = wx.CallLater(50, self.flush_pending_events)
 
         # TODO: Show the new event in the views.
 
 
+    def flush_pending_events(self):
+        ''' Write the pending created events to the database.
+        '''
+        if self._flush_timer is not None:
+            self._flush_timer.Stop()
+            self._flush_timer = None
+
+        if not self._pending_events:
+            return
+        events = self._pending_events
+        self._pending_events = []
+        self._batch_creation_time = None
+
+        project = self.parent.project
+        db_event_orm_class = project.dbTables['event']
+        db_session = project.getDbSession()
+        try:
+            # Flush the events to get the ids.
+            db_data = [db_event_orm_class(**x.get_db_dict()) for x in events]
+            db_session.add_all(db_data)
+            db_session.flush()
+            ev_ids = [x.id for x in db_data]
+            db_session.commit()
+
+            for cur_event, cur_id in zip(events, ev_ids):
+                cur_event.db_id = cur_id
+                cur_event.changed = False
+        except Exception:
+            db_session.rollback()
+            self.logger.exception("Error when writing the created events to the database.")
+        finally:
+            db_session.close()
+
+
+    def set_line_visibility(self, visible):
+        ''' Show or hide the begin and end lines in all views.
+        '''
+        for cur_view in self.parent.viewport.get_node(node_type = 'view'):
+            for cur_artist in cur_view.get_annotation_artist(mode = 'vline',
+                                                             parent_rid = self.rid):
+                for cur_line_artist in cur_artist.line_artist:
+                    cur_line_artist.set_visible(visible)
 
 
     def cleanup(self):
-        ''' Remove all elements added to the views.
+        ''' Hide all elements added to the views.
         '''
-        station_nodes = self.parent.viewport.get_node(recursive = False)
-        for cur_node in station_nodes:
-            cur_node.clear_annotation_artist(parent_rid = self.rid)
-            cur_node.draw()
+        viewport = self.parent.viewport
+
+        # Hide the lines. The line artists are reused in the next drag.
+        self.set_line_visibility(False)
+
+        # Redraw each canvas only once when the GUI is idle.
+        canvas_list = set([x.plot_panel.canvas for x in viewport.get_node(node_type = 'view')])
+        for cur_canvas in canvas_list:
+            cur_canvas.draw_idle()
 
         # Clear the motion notify callbacks.
-        self.parent.viewport.clear_mpl_event_callbacks(event_name = 'motion_notify_event')
+        viewport.clear_mpl_event_callbacks(event_name = 'motion_notify_event')
+
+        # Drop a pending motion redraw.
+        if self._motion_timer is not None:
+            self._motion_timer.Stop()
+            self._motion_timer = None
+        self._pending_motion = None
 
         self.bg = {}
+        self._active_views = []
 
 
 
@@ -468,6 +579,9 @@ class EditDlg(wx.Dialog):
         else:
             self.data = data
 
+        # Suppress the repainting while creating the layout.
+        self.Freeze()
+
         # Layout using sizers.
         sizer = wx.BoxSizer(wx.VERTICAL)
 
@@ -484,6 +598,7 @@ class EditDlg(wx.Dialog):
 
         self.SetSizer(sizer)
         sizer.Fit(self)
+        self.Thaw()
 
         # Bind the events.
         self.Bind(wx.EVT_BUTTON, self.on_ok, ok_button)
@@ -502,19 +617,21 @@ class EditDlg(wx.Dialog):
     def create_dialog_fields(self):
         fgSizer = wx.FlexGridSizer(len(self.dialog_fields), 2, 5, 5)
 
+        items = []
         for curLabel, curKey, curStyle, curValidator in self.dialog_fields:
             self.label[curKey] = wx.StaticText(self, wx.ID_ANY, curLabel)
             self.edit[curKey] = wx.TextCtrl(self, size=(200, -1),
                                             style=curStyle)
 
-            if curKey in iter(self.data.keys()):
+            if curKey in self.data:
                 self.edit[curKey].SetValue(str(self.data[curKey]))
 
             if curValidator == 'not_empty':
                 self.edit[curKey].SetValidator(psy_val.NotEmptyValidator())
 
-            fgSizer.Add(self.label[curKey], 0, wx.ALIGN_RIGHT)
-            fgSizer.Add(self.edit[curKey], 0, wx.EXPAND)
+            items.append((self.label[curKey], 0, wx.ALIGN_RIGHT))
+            items.append((self.edit[curKey], 0, wx.EXPAND))
 
+        fgSizer.AddMany(items)
         fgSizer.AddGrowableCol(1)
         return fgSizer
@@ -22,7 +22,6 @@ from builtins import str
 import logging
 
 from obspy.core.utcdatetime import UTCDateTime
-import sqlalchemy.orm
 import wx
 import wx.lib.mixins.listctrl as listmix
 from wx.lib.stattext import GenStaticText as StaticText
@@ -32,6 +31,7 @@ from psysmon.core.plugins import OptionPlugin
 from psysmon.gui.bricks import PrefEditPanel
 from psysmon.artwork.icons import iconsBlack16 as icons
 import psysmon.core.preferences_manager as psy_pm
+import psysmon.packages.event.core as event_core
 
 
 class SelectEvents(OptionPlugin):
@@ -428,18 +428,7 @@ class SelectEvents(OptionPlugin):
     def load_event_types(self):
         ''' Load the available event types from the database.
         '''
-        db_session = self.parent.project.getDbSession()
-        event_types = []
-        try:
-            event_type_table = self.parent.project.dbTables['event_type']
-            query = db_session.query(event_type_table)
-            query = query.options(sqlalchemy.orm.immediateload(event_type_table.children))
-            query = query.options(sqlalchemy.orm.immediateload(event_type_table.parent))
-            event_types = query.all()
-        finally:
-            db_session.close()
-
-        return event_types
+        return event_core.load_event_types(project = self.parent.project)
 
     def on_select_event_type(self):
         ''' Handle the default event type selection.
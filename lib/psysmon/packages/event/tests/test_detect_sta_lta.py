@@ -0,0 +1,292 @@
+'''
+Created on Oct 16, 2026
+
+@author: Stefan Mertl
+'''
+
+import concurrent.futures
+import unittest
+import unittest.mock
+import logging
+
+import numpy as np
+import numpy.testing as np_test
+from obspy.core import Stream, Trace
+from obspy.core.utcdatetime import UTCDateTime
+
+import psysmon
+import psysmon.packages.event.detect_sta_lta as detect_sta_lta
+
+
+class Waveclient(object):
+    ''' A waveclient creating traces of the requested SCNLs.
+    '''
+    def __init__(self):
+        self.n_requests = 0
+
+    def getWaveform(self, startTime, endTime, scnl):
+        self.n_requests += 1
+        stream = Stream()
+        for cur_scnl in scnl:
+            cur_trace = Trace(data = np.zeros(100))
+            cur_trace.stats.station = cur_scnl[0]
+            cur_trace.stats.channel = cur_scnl[1]
+            cur_trace.stats.network = cur_scnl[2]
+            cur_trace.stats.location = cur_scnl[3]
+            cur_trace.stats.starttime = startTime
+            stream.append(cur_trace)
+        return stream
+
+
+class Project(object):
+    ''' A project providing the waveclient.
+    '''
+    def __init__(self):
+        self.waveclient = {'main client': Waveclient()}
+
+
+class RenamingStack(object):
+    ''' A processing stack changing the location of the traces.
+    '''
+    def execute_batch(self, streams):
+        batch_stream = Stream()
+        for cur_stream in streams:
+            batch_stream += cur_stream
+        for cur_trace in batch_stream:
+            cur_trace.stats.location = 'XX'
+        return batch_stream
+
+    def get_settings(self):
+        return {}
+
+
+
+class DetectStaLtaTestCase(unittest.TestCase):
+    """
+    Test suite for psysmon.packages.event.detect_sta_lta.StaLtaDetector
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Configure the logger.
+        logger = logging.getLogger('psysmon')
+        logger.setLevel('INFO')
+        logger.addHandler(psysmon.getLoggerHandler())
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_compute_cf(self):
+        ''' Test the computation of the characteristic function.
+        '''
+        data = np.arange(-5, 5, dtype = np.float64)
+        detector = detect_sta_lta.StaLtaDetector(cf_type = 'abs')
+        np_test.assert_array_equal(detector.compute_cf(data), np.abs(data))
+
+        detector.cf_type = 'square'
+        np_test.assert_array_equal(detector.compute_cf(data), data**2)
+
+        detector.cf_type = 'not_valid'
+        self.assertRaises(ValueError, detector.compute_cf, data)
+
+
+    def test_compute_thrf(self):
+        ''' Test the computation of the threshold function.
+        '''
+        sps = 100.
+        sta_len = 0.5
+        lta_len = 5
+        n_sta = int(sta_len * sps)
+        n_lta = int(lta_len * sps)
+        data = np.random.randn(10000)
+        detector = detect_sta_lta.StaLtaDetector(sta_len = sta_len,
+                                                 lta_len = lta_len)
+        cf = detector.compute_cf(data)
+        thrf, sta, lta = detector.compute_thrf(cf, sps)
+
+        # Compute the expected values using moving sums with windows ending
+        # at the same sample.
+        cf = cf.astype(np.float64)
+        exp_sta = np.convolve(cf, np.ones(n_sta), mode = 'valid')[n_lta - n_sta:] / n_sta
+        exp_lta = np.convolve(cf, np.ones(n_lta), mode = 'valid') / n_lta
+        self.assertEqual(len(thrf), len(data) - n_lta + 1)
+        np_test.assert_allclose(sta, exp_sta, rtol = 1e-5)
+        np_test.assert_allclose(lta, exp_lta, rtol = 1e-5)
+        np_test.assert_allclose(thrf, exp_sta / exp_lta, rtol = 1e-5)
+
+        # The NumPy implementation.
+        detector.use_clib = False
+        np_thrf, np_sta, np_lta = detector.compute_thrf(cf, sps)
+        np_test.assert_allclose(np_sta, exp_sta, rtol = 1e-5)
+        np_test.assert_allclose(np_lta, exp_lta, rtol = 1e-5)
+        np_test.assert_allclose(np_thrf, thrf, rtol = 1e-5)
+
+        # Data shorter than the LTA window.
+        thrf, sta, lta = detector.compute_thrf(cf[:n_lta - 1], sps)
+        self.assertEqual(len(thrf), 0)
+
+
+    def test_compute_event_limits(self):
+        ''' Test the computation of the event limits.
+        '''
+        detector = detect_sta_lta.StaLtaDetector(thr = 3)
+        thrf = np.array([1, 1, 3, 4, 2, 1, 5, 5, 1, 4, 4])
+        event_marker = detector.compute_event_limits(thrf)
+        self.assertEqual(event_marker, [(2, 4), (6, 8), (9, 11)])
+
+        event_marker = detector.compute_event_limits(np.ones(10))
+        self.assertEqual(event_marker, [])
+
+        # The NumPy implementation.
+        detector.use_clib = False
+        event_marker = detector.compute_event_limits(thrf)
+        self.assertEqual(event_marker, [(2, 4), (6, 8), (9, 11)])
+
+        event_marker = detector.compute_event_limits(np.ones(10))
+        self.assertEqual(event_marker, [])
+
+        event_marker = detector.compute_event_limits(np.array([3, 3, 1]))
+        self.assertEqual(event_marker, [(0, 2)])
+
+
+    def test_compute_trace_events(self):
+        ''' Test the block-wise computation of the trace events.
+        '''
+        sps = 100.
+        data = np.random.randn(20000)
+        data[5000:5500] *= 20
+        data[9950:10300] *= 20
+        detector = detect_sta_lta.StaLtaDetector(sta_len = 0.5,
+                                                 lta_len = 5,
+                                                 thr = 3)
+        thrf, sta, lta = detector.compute_thrf(detector.compute_cf(data), sps)
+        exp_marker = detector.compute_event_limits(thrf)
+        self.assertTrue(len(exp_marker) >= 2)
+
+        # The single pass computation of the C library.
+        event_marker = detector.compute_trace_events(data, sps)
+        self.assertEqual(event_marker, exp_marker)
+
+        # Use small blocks to split the events at the block borders.
+        detector.use_clib = False
+        detector.block_size = 1000
+        event_marker = detector.compute_trace_events(data, sps)
+        self.assertEqual(event_marker, exp_marker)
+
+
+    def test_get_processed_streams(self):
+        ''' Test the grouping of the processed traces by the requested SCNL.
+        '''
+        scnl = [('GILA', 'HHZ', 'XX', '00'), ('SITA', 'HHZ', 'XX', '00')]
+        detector = detect_sta_lta.StaLtaDetector(project = Project(),
+                                                 processing_stack = RenamingStack())
+        with concurrent.futures.ThreadPoolExecutor(max_workers = 2) as executor:
+            streams = detector.get_processed_streams(executor = executor,
+                                                     scnl = scnl,
+                                                     data_sources = dict([(x, 'main client') for x in scnl]),
+                                                     start_time = UTCDateTime('2015-01-01T00:00:00'),
+                                                     end_time = UTCDateTime('2015-01-01T01:00:00'))
+        self.assertEqual(sorted(streams.keys()), scnl)
+        for cur_scnl in scnl:
+            self.assertEqual(len(streams[cur_scnl]), 1)
+            self.assertEqual(streams[cur_scnl][0].stats.station, cur_scnl[0])
+
+
+    def test_node_n_workers(self):
+        ''' Test the passing of the number of worker threads by the node.
+        '''
+        node = detect_sta_lta.StaLtaDetectionNode()
+        self.assertEqual(node.pref_manager.get_value('n_workers'), 0)
+
+        node.pref_manager.set_value('n_workers', 3)
+        with unittest.mock.patch.object(detect_sta_lta.StaLtaDetector, 'detect') as detect:
+            node.execute()
+        self.assertEqual(detect.call_count, 1)
+        self.assertEqual(detect.call_args[1]['n_workers'], 3)
+
+
+    def test_node_processed_cache(self):
+        ''' Test the processed data cache shared by the node executions.
+        '''
+        node = detect_sta_lta.StaLtaDetectionNode()
+        self.assertEqual(node.pref_manager.get_value('cache_size'), 0)
+
+        node.pref_manager.set_value('cache_size', 2)
+        with unittest.mock.patch.object(detect_sta_lta.StaLtaDetector, 'detect',
+                                        autospec = True) as detect:
+            node.execute()
+            node.execute()
+        detectors = [x[0][0] for x in detect.call_args_list]
+        for cur_detector in detectors:
+            self.assertEqual(cur_detector.cache_size, 2)
+            self.assertIs(cur_detector.processed_cache, node.processed_cache)
+
+        # The cached data is not pickled with the node.
+        self.assertNotIn('processed_cache', node.__getstate__())
+
+
+    def test_processed_cache(self):
+        ''' Test the cache of the processed interval data.
+        '''
+        scnl = [('GILA', 'HHZ', 'XX', '00'), ]
+        data_sources = {scnl[0]: 'main client'}
+        start_times = [UTCDateTime('2015-01-01T00:00:00') + x * 3600 for x in range(3)]
+        project = Project()
+        waveclient = project.waveclient['main client']
+
+        def run_intervals(detector, start_times):
+            with concurrent.futures.ThreadPoolExecutor(max_workers = 1) as executor:
+                for cur_start_time in start_times:
+                    detector.process_interval(executor = executor,
+                                              scnl = scnl,
+                                              channel_by_scnl = {scnl[0]: None},
+                                              data_sources = data_sources,
+                                              start_time = cur_start_time,
+                                              end_time = cur_start_time + 3600)
+
+        with unittest.mock.patch.object(detect_sta_lta.StaLtaDetector,
+                                        'detect_stream_events',
+                                        return_value = ([], [])):
+            detector = detect_sta_lta.StaLtaDetector(project = project,
+                                                     processing_stack = RenamingStack(),
+                                                     cache_size = 2)
+            run_intervals(detector, start_times[:2])
+            self.assertEqual(waveclient.n_requests, 2)
+            self.assertEqual(len(detector.processed_cache), 2)
+
+            # A new detector sharing the cache reuses the processed data of
+            # the repeated intervals.
+            detector = detect_sta_lta.StaLtaDetector(project = project,
+                                                     processing_stack = RenamingStack(),
+                                                     cache_size = 2,
+                                                     processed_cache = detector.processed_cache)
+            run_intervals(detector, start_times[:2])
+            self.assertEqual(waveclient.n_requests, 2)
+
+            # The least recently used interval is removed.
+            run_intervals(detector, start_times[2:])
+            self.assertEqual(waveclient.n_requests, 3)
+            self.assertEqual(len(detector.processed_cache), 2)
+            cached_start_times = [x[1] for x in detector.processed_cache.keys()]
+            self.assertEqual(cached_start_times, [start_times[1].timestamp,
+                                                  start_times[2].timestamp])
+
+            # The cache is not used if the cache size is 0.
+            detector.cache_size = 0
+            run_intervals(detector, start_times[1:2])
+            self.assertEqual(waveclient.n_requests, 4)
+
+
+
+def suite():
+    return unittest.makeSuite(DetectStaLtaTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -20,6 +20,7 @@ from psysmon.core.test_util import clear_project_database_tables
 from psysmon.core.test_util import remove_project_filestructure
 from psysmon.core.test_util import create_full_project
 from psysmon.core.test_util import drop_database_tables
+from psysmon.core.test_util import sql_echo
 
 import psysmon.packages.event.detect as detect
 
@@ -88,7 +89,7 @@ class DetectionTestCase(unittest.TestCase):
         det = detect.Detection(start_time = start_time,
                                  end_time = end_time,
                                  creation_time = creation_time)
-        self.project.dbEngine.echo = True
+        self.project.dbEngine.echo = sql_echo
         det.write_to_database(self.project)
 
         db_detection_orm = self.project.dbTables['detection']
@@ -111,7 +112,7 @@ class DetectionTestCase(unittest.TestCase):
         det = detect.Detection(start_time = start_time,
                                  end_time = end_time,
                                  creation_time = creation_time)
-        self.project.dbEngine.echo = True
+        self.project.dbEngine.echo = sql_echo
         det.write_to_database(self.project)
         db_id = det.db_id
 
@@ -18,6 +18,7 @@ from psysmon.core.test_util import create_empty_project
 from psysmon.core.test_util import drop_project_database_tables
 from psysmon.core.test_util import clear_project_database_tables
 from psysmon.core.test_util import remove_project_filestructure
+from psysmon.core.test_util import sql_echo
 
 from psysmon.packages.event.core import Event
 import psysmon.packages.event.detect as detect
@@ -92,7 +93,7 @@ class EventTestCase(unittest.TestCase):
         event = Event(start_time = start_time,
                       end_time = end_time,
                       creation_time = creation_time)
-        self.project.dbEngine.echo = True
+        self.project.dbEngine.echo = sql_echo
         event.write_to_database(self.project)
 
         db_event_orm = self.project.dbTables['event']
@@ -115,7 +116,7 @@ class EventTestCase(unittest.TestCase):
         event = Event(start_time = start_time,
                       end_time = end_time,
                       creation_time = creation_time)
-        self.project.dbEngine.echo = True
+        self.project.dbEngine.echo = sql_echo
         event.write_to_database(self.project)
         db_id = event.db_id
 
@@ -23,12 +23,12 @@ import unittest
 import psysmon
 import logging
 import os
-import copy
 from psysmon.core.test_util import create_psybase
 from psysmon.core.test_util import create_full_project
 from psysmon.core.test_util import drop_project_database_tables
 from psysmon.core.test_util import remove_project_filestructure
 from psysmon.core.test_util import drop_database_tables
+from psysmon.core.test_util import sql_echo
 import psysmon.core.gui as psygui
 from obspy.core.utcdatetime import UTCDateTime
 import psysmon.gui.main.app as psy_app
@@ -56,7 +56,7 @@ class EventProcessorTestCase(unittest.TestCase):
         cls.psybase = create_psybase()
         create_full_project(cls.psybase)
         cls.project = cls.psybase.project
-        cls.project.dbEngine.echo = True
+        cls.project.dbEngine.echo = sql_echo
 
 
     @classmethod
@@ -81,8 +81,8 @@ class EventProcessorTestCase(unittest.TestCase):
         # Initialize the available processing nodes.
         processing_nodes = self.project.getProcessingNodes(('common', ))
 
-        node_template = [x for x in processing_nodes if x.name == 'compute amplitude features'][0]
-        node = copy.deepcopy(node_template)
+        # The processing nodes are new instances. Use them without copying.
+        node = [x for x in processing_nodes if x.name == 'compute amplitude features'][0]
         self.node.pref_manager.set_value('processing_stack', [node, ])
 
         # Initialize the preference items.
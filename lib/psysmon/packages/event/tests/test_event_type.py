@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# LICENSE
+#
+# This file is part of pSysmon.
+#
+# If you use pSysmon in any program or publication, please inform and
+# acknowledge its author Stefan Mertl (stefan@mertl-research.at).
+#
+# pSysmon is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+Test the event type tree.
+
+:copyright:
+    Stefan Mertl
+
+:license:
+    GNU General Public License, Version 3 
+    (http://www.gnu.org/licenses/gpl-3.0.html)
+
+'''
+from __future__ import print_function
+
+import unittest
+import logging
+import os
+
+import psysmon
+
+from psysmon.core.test_util import create_psybase
+from psysmon.core.test_util import create_empty_project
+from psysmon.core.test_util import drop_project_database_tables
+from psysmon.core.test_util import clear_project_database_tables
+from psysmon.core.test_util import remove_project_filestructure
+
+import psysmon.packages.event.core as ev_core
+
+
+class EventTypeTestCase(unittest.TestCase):
+    """
+    Test suite
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Configure the logger.
+        logger = logging.getLogger('psysmon')
+        logger.setLevel('INFO')
+        logger.addHandler(psysmon.getLoggerHandler())
+
+        # Create an empty project.
+        cls.psybase = create_psybase()
+        cls.project = create_empty_project(cls.psybase)
+        cls.project.dbEngine.echo = False
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.psybase.stop_project_server()
+        print("dropping database tables...\n")
+        drop_project_database_tables(cls.project)
+        print("removing temporary file structure....\n")
+        remove_project_filestructure(cls.project)
+        print("removing temporary base directory....\n")
+        os.removedirs(cls.project.base_dir)
+        print("....finished cleaning up.\n")
+
+    def setUp(self):
+        # Create the event type tree:
+        # earthquake - tectonic
+        #            - volcanic - lp
+        # blast
+        event_type_orm = self.project.dbTables['event_type']
+        db_session = self.project.getDbSession()
+        try:
+            types = {}
+            for cur_name in ['earthquake', 'tectonic', 'volcanic', 'lp', 'blast']:
+                types[cur_name] = event_type_orm(name = cur_name,
+                                                 description = None,
+                                                 agency_uri = None,
+                                                 author_uri = None,
+                                                 creation_time = None)
+            types['tectonic'].parent = types['earthquake']
+            types['volcanic'].parent = types['earthquake']
+            types['lp'].parent = types['volcanic']
+            db_session.add_all(list(types.values()))
+            db_session.commit()
+            self.type_ids = dict([(x, y.id) for x, y in types.items()])
+        finally:
+            db_session.close()
+
+    def tearDown(self):
+        clear_project_database_tables(self.project)
+
+    def test_closure_table(self):
+        ''' Test the maintenance of the event type closure table.
+        '''
+        closure_orm = self.project.dbTables['event_type_closure']
+        db_session = self.project.getDbSession()
+        try:
+            paths = db_session.query(closure_orm.ancestor_id,
+                                     closure_orm.descendant_id,
+                                     closure_orm.depth).all()
+        finally:
+            db_session.close()
+
+        self.assertEqual(set([tuple(x) for x in paths]), self.expected_paths())
+
+
+    def test_closure_table_creation(self):
+        ''' Test the filling of a newly created closure table.
+        '''
+        closure_orm = self.project.dbTables['event_type_closure']
+        closure_orm.__table__.drop(self.project.dbEngine)
+        closure_orm.__table__.create(self.project.dbEngine)
+
+        db_session = self.project.getDbSession()
+        try:
+            paths = db_session.query(closure_orm.ancestor_id,
+                                     closure_orm.descendant_id,
+                                     closure_orm.depth).all()
+        finally:
+            db_session.close()
+
+        self.assertEqual(set([tuple(x) for x in paths]), self.expected_paths())
+
+
+    def test_rebuild_closure_table(self):
+        ''' Test the explicit rebuild of the closure table.
+        '''
+        closure_orm = self.project.dbTables['event_type_closure']
+        db_session = self.project.getDbSession()
+        try:
+            db_session.query(closure_orm).delete()
+            db_session.commit()
+            ev_core.rebuild_event_type_closure(db_session, self.project)
+            paths = db_session.query(closure_orm.ancestor_id,
+                                     closure_orm.descendant_id,
+                                     closure_orm.depth).all()
+        finally:
+            db_session.close()
+
+        self.assertEqual(set([tuple(x) for x in paths]), self.expected_paths())
+
+
+    def expected_paths(self):
+        ''' The closure table rows of the event type tree.
+        '''
+        ids = self.type_ids
+        return set([(ids['earthquake'], ids['earthquake'], 0),
+                    (ids['tectonic'], ids['tectonic'], 0),
+                    (ids['volcanic'], ids['volcanic'], 0),
+                    (ids['lp'], ids['lp'], 0),
+                    (ids['blast'], ids['blast'], 0),
+                    (ids['earthquake'], ids['tectonic'], 1),
+                    (ids['earthquake'], ids['volcanic'], 1),
+                    (ids['volcanic'], ids['lp'], 1),
+                    (ids['earthquake'], ids['lp'], 2)])
+
+    def test_load_event_types(self):
+        ''' Test the loading of the event type tree.
+        '''
+        event_types = ev_core.load_event_types(project = self.project)
+        self.assertEqual(len(event_types), 5)
+        types = dict([(x.name, x) for x in event_types])
+        self.assertEqual(sorted([x.name for x in types['earthquake'].children]),
+                         ['tectonic', 'volcanic'])
+        self.assertIs(types['lp'].parent, types['volcanic'])
+        self.assertIsNone(types['blast'].parent)
+        self.assertEqual(types['blast'].children, [])
+
+        # Load a subtree.
+        event_types = ev_core.load_event_types(project = self.project,
+                                               root_id = self.type_ids['volcanic'])
+        self.assertEqual(sorted([x.name for x in event_types]),
+                         ['lp', 'volcanic'])
+
+    def test_reparent_event_type(self):
+        ''' Test the update of the closure table when moving a subtree.
+        '''
+        event_type_orm = self.project.dbTables['event_type']
+        db_session = self.project.getDbSession()
+        try:
+            volcanic = db_session.query(event_type_orm).get(self.type_ids['volcanic'])
+            volcanic.parent_id = self.type_ids['blast']
+            db_session.commit()
+        finally:
+            db_session.close()
+
+        event_types = ev_core.load_event_types(project = self.project,
+                                               root_id = self.type_ids['blast'])
+        self.assertEqual(sorted([x.name for x in event_types]),
+                         ['blast', 'lp', 'volcanic'])
+
+        event_types = ev_core.load_event_types(project = self.project,
+                                               root_id = self.type_ids['earthquake'])
+        self.assertEqual(sorted([x.name for x in event_types]),
+                         ['earthquake', 'tectonic'])
+
+
+def suite():
+    return unittest.makeSuite(EventTypeTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
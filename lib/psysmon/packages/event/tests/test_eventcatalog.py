@@ -44,6 +44,7 @@ from psysmon.core.test_util import create_empty_project
 from psysmon.core.test_util import drop_project_database_tables
 from psysmon.core.test_util import clear_project_database_tables
 from psysmon.core.test_util import remove_project_filestructure
+from psysmon.core.test_util import sql_echo
 
 import psysmon.packages.event.core as ev_core
 import psysmon.packages.event.bulletin as ev_bulletin
@@ -68,7 +69,7 @@ class EventCatalogTestCase(unittest.TestCase):
         # Create an empty project.
         cls.psybase = create_psybase()
         cls.project = create_empty_project(cls.psybase)
-        cls.project.dbEngine.echo = True
+        cls.project.dbEngine.echo = sql_echo
 
     @classmethod
     def tearDownClass(cls):
@@ -239,6 +240,114 @@ class EventCatalogTestCase(unittest.TestCase):
         self.assertEqual(len(result), 1)
 
 
+    def test_stream_events(self):
+        ''' Test the streaming of events from the database.
+        '''
+        catalog = ev_core.Catalog(name = 'test')
+        events = []
+        for cur_day in [3, 1, 2]:
+            start_time = UTCDateTime(2000, 1, cur_day)
+            events.append(ev_core.Event(start_time = start_time,
+                                        end_time = start_time + 3600,
+                                        tags = ['tag_%d' % cur_day]))
+        catalog.add_events(events)
+        catalog.write_to_database(self.project)
+
+        streamed_events = list(catalog.stream_events(project = self.project,
+                                                     batch_size = 2))
+        self.assertEqual(len(streamed_events), 3)
+        self.assertEqual([x.start_time.day for x in streamed_events], [1, 2, 3])
+        self.assertEqual([x.tags for x in streamed_events],
+                         [['tag_1'], ['tag_2'], ['tag_3']])
+        self.assertTrue(all([x.detections == [] for x in streamed_events]))
+        self.assertEqual(len(catalog.events), 3)
+
+        streamed_events = list(catalog.stream_events(project = self.project,
+                                                     start_time = UTCDateTime(2000, 1, 2)))
+        self.assertEqual([x.start_time.day for x in streamed_events], [2, 3])
+
+
+    def test_load_events_in_timespan(self):
+        ''' Test the loading of the events overlapping a time-span.
+        '''
+        catalog = ev_core.Catalog(name = 'test')
+        events = []
+        for cur_day in [1, 2, 3]:
+            start_time = UTCDateTime(2000, 1, cur_day)
+            events.append(ev_core.Event(start_time = start_time,
+                                        end_time = start_time + 3600))
+        catalog.add_events(events)
+        catalog.write_to_database(self.project)
+
+        catalog.clear_events()
+        catalog.load_events_in_timespan(project = self.project,
+                                        start_time = UTCDateTime(2000, 1, 1, 0, 30),
+                                        end_time = UTCDateTime(2000, 1, 2, 0, 30))
+        self.assertEqual([x.start_time.day for x in catalog.events], [1, 2])
+        self.assertTrue(all([x.db_id is not None for x in catalog.events]))
+        self.assertTrue(all([x.changed is False for x in catalog.events]))
+
+
+    def test_bulk_write_to_database(self):
+        ''' Test the bulk insertion of the events into the database.
+        '''
+        catalog = ev_core.Catalog(name = 'test')
+        events = []
+        for cur_day in [1, 2, 3]:
+            start_time = UTCDateTime(2000, 1, cur_day)
+            events.append(ev_core.Event(start_time = start_time,
+                                        end_time = start_time + 3600,
+                                        public_id = 'event_%d' % cur_day))
+        events.append(ev_core.Event(start_time = UTCDateTime(2000, 1, 4),
+                                    end_time = UTCDateTime(2000, 1, 4, 1)))
+        catalog.add_events(events)
+        catalog.write_to_database(self.project, bulk_insert = True)
+
+        self.assertTrue(all([x.db_id is not None for x in catalog.events]))
+        self.assertTrue(all([x.changed is False for x in catalog.events]))
+
+        db_event_orm = self.project.dbTables['event']
+        db_session = self.project.getDbSession()
+        try:
+            result = dict([(x.id, x.public_id) for x in db_session.query(db_event_orm)])
+        finally:
+            db_session.close()
+        self.assertEqual(result, dict([(x.db_id, x.public_id) for x in catalog.events]))
+
+        # A second write doesn't duplicate the events, changed events are
+        # updated.
+        events[0].description = 'changed'
+        events[0].changed = True
+        catalog.write_to_database(self.project, bulk_insert = True)
+
+        db_session = self.project.getDbSession()
+        try:
+            result = db_session.query(db_event_orm).all()
+            self.assertEqual(len(result), 4)
+            db_event = db_session.query(db_event_orm).get(events[0].db_id)
+            self.assertEqual(db_event.description, 'changed')
+        finally:
+            db_session.close()
+
+
+    def test_event_db_dict(self):
+        ''' Test the resolution of the event type in the event db dict.
+        '''
+        event = ev_core.Event(start_time = UTCDateTime(2000, 1, 1),
+                              end_time = UTCDateTime(2000, 1, 1, 1),
+                              event_type = 3)
+        self.assertEqual(event.get_db_dict()['ev_type_id'], 3)
+
+        event_type_orm = self.project.dbTables['event_type']
+        event_type = event_type_orm(name = 'earthquake',
+                                    description = None,
+                                    agency_uri = None,
+                                    author_uri = None,
+                                    creation_time = None)
+        event_type.id = 5
+        event.event_type = event_type
+        self.assertEqual(event.get_db_dict()['ev_type_id'], 5)
+
 
 
 def suite():
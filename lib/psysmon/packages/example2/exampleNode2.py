@@ -57,7 +57,12 @@ class ExampleNode2(CollectionNode):
 
         requiredData = self.requireData(origin = 'example node')
 
-        app = psy_app.PsysmonApp()
+        # Reuse a running application. Create and run an own application
+        # only if the node is executed without a GUI.
+        app = wx.GetApp()
+        own_app = app is None
+        if own_app:
+            app = psy_app.PsysmonApp()
 
         dlg = wx.MessageDialog(None, str(requiredData),
                                'Echo Echo',
@@ -66,7 +71,9 @@ class ExampleNode2(CollectionNode):
                                )
         dlg.ShowModal()
         dlg.Destroy()
-        app.MainLoop()
+
+        if own_app:
+            app.MainLoop()
 
         #self.logger.debug('requiredData: %s', requiredData)
         #print "Unpickled Data: %s" % requiredData['test_data']
@@ -28,10 +28,11 @@ The importWaveform module.
     http://www.gnu.org/licenses/gpl-3.0.html
 
 '''
-from __future__ import division
-from builtins import str
-from past.utils import old_div
+import collections
+import concurrent.futures
 import os
+import pickle
+import threading
 
 import psysmon.core.packageNodes
 import psysmon.core.result as result
@@ -42,7 +43,86 @@ if psysmon.wx_available:
     import psysmon.gui.dialog.pref_listbook as psy_lb
 
 from obspy.core.utcdatetime import UTCDateTime
-import matplotlib.mlab as mlab
+import numpy as np
+import scipy.fft
+import scipy.signal
+
+# Use pyFFTW for the FFT computation if it is available. The global pyFFTW
+# configuration is not changed.
+try:
+    import pyfftw
+    import pyfftw.builders
+except ImportError:
+    pyfftw = None
+
+# Use pyFFTW for the FFT computation. If False, scipy.fft is used.
+use_pyfftw = pyfftw is not None
+
+# The idle measured FFTW plans keyed by the data shape, the data type, the
+# FFT length and the number of threads. The psd_nfft is fixed for a
+# processing run, so the plans are reused for all traces with the same
+# length. A plan is used by one thread at a time. The plans are kept on the
+# module level, because the node is pickled with the collection.
+fft_plans = collections.OrderedDict()
+fft_plans_lock = threading.Lock()
+
+# The maximum number of cached plan keys.
+fft_plans_size = 32
+
+
+def rfft(data, n, workers = 1):
+    ''' Compute the one-dimensional real FFT along the last axis of data.
+
+    If pyFFTW is available, a cached FFTW plan created with FFTW_MEASURE
+    is used. Otherwise :func:`scipy.fft.rfft` is used. The data may be
+    overwritten.
+
+    Parameters
+    ----------
+    data : :class:`numpy.ndarray`
+        The real valued data.
+
+    n : int
+        The length of the FFT.
+
+    workers : int
+        The number of threads used for the FFT.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The spectrum of the data.
+    '''
+    if not use_pyfftw:
+        return scipy.fft.rfft(data, n = n, axis = -1, overwrite_x = True,
+                              workers = workers)
+
+    key = (data.shape, data.dtype.str, n, workers)
+    with fft_plans_lock:
+        idle_plans = fft_plans.get(key)
+        if idle_plans:
+            fft_obj = idle_plans.pop()
+        else:
+            fft_obj = None
+
+    if fft_obj is None:
+        fft_obj = pyfftw.builders.rfft(np.empty(data.shape, dtype = data.dtype),
+                                       n = n,
+                                       axis = -1,
+                                       threads = workers,
+                                       planner_effort = 'FFTW_MEASURE')
+
+    try:
+        # The output array of the plan is reused by the next call.
+        spec = fft_obj(data).copy()
+    finally:
+        with fft_plans_lock:
+            fft_plans.setdefault(key, []).append(fft_obj)
+            fft_plans.move_to_end(key)
+            while len(fft_plans) > fft_plans_size:
+                fft_plans.popitem(last = False)
+
+    return spec
 
 
 class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
@@ -64,6 +144,21 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
         # Last day of the saved psd data.
         self.save_day = {}
 
+        # The fft windows used for the PSD computation. The windows are
+        # cached by the segment length and the data type.
+        self.window_cache = {}
+
+        # The frequency arrays of the computed PSDs.
+        self.frequ_cache = {}
+
+        # The last nfft checked for an efficient FFT length.
+        self.checked_nfft = None
+
+        # The inventory channels of the processed SCNLs. The cache is
+        # filled on the first execution and cleared when the processing
+        # has finished.
+        self.channel_cache = None
+
         # The interval for which to create the results. This is ignored when
         # processing events. For events a result is created for each event.
         # TODO: Make the save interval user selectable.
@@ -80,7 +175,7 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
                                              label = 'nfft',
                                              value = 8192,
                                              limit = [0, 1000000],
-                                             tool_tip = 'The length of the fft window [samples].'
+                                             tool_tip = 'The length of the fft window [samples]. Lengths with small prime factors (e.g. powers of 2) are computed fastest.'
                                              )
         psd_group.add_item(pref_item)
 
@@ -92,6 +187,28 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
                                              )
         psd_group.add_item(pref_item)
 
+        pref_item = psy_pm.CheckBoxPrefItem(name = 'psd_single_precision',
+                                            label = 'single precision',
+                                            value = False,
+                                            tool_tip = 'Compute the PSD using single precision (float32) data.'
+                                            )
+        psd_group.add_item(pref_item)
+
+        pref_item = psy_pm.CheckBoxPrefItem(name = 'psd_store_db',
+                                            label = 'store in dB',
+                                            value = False,
+                                            tool_tip = 'Store the PSD in decibel (10 * log10(P)) using single precision (float32) values.'
+                                            )
+        psd_group.add_item(pref_item)
+
+
+    def initialize(self, **kwargs):
+        ''' Initialize the node.
+        '''
+        super(ComputePsdNode, self).initialize()
+        # The inventory might have changed since the last processing.
+        self.channel_cache = None
+
 
     def edit(self):
         ''' Show the node edit dialog.
@@ -106,15 +223,24 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
         '''
         psd_nfft = self.pref_manager.get_value('psd_nfft')
         psd_overlap = self.pref_manager.get_value('psd_overlap')
+        psd_single_precision = self.pref_manager.get_value('psd_single_precision')
+        psd_store_db = self.pref_manager.get_value('psd_store_db')
+
+        # The FFT length defines the frequencies of the PSD shared by all
+        # results. Don't change it, but point out slow FFT lengths.
+        if psd_nfft != self.checked_nfft:
+            fast_nfft = scipy.fft.next_fast_len(psd_nfft, real = True)
+            if fast_nfft != psd_nfft:
+                self.logger.warning("The nfft %d is not an efficient FFT length. Consider using an nfft of %d.",
+                                    psd_nfft, fast_nfft)
+            self.checked_nfft = psd_nfft
 
         start_time = process_limits[0]
         end_time = process_limits[1]
 
-        if 'event' in iter(kwargs.keys()):
-            cur_event = kwargs['event']
-        else:
-            cur_event = None
+        cur_event = kwargs.get('event', None)
 
+        trace_list = []
         for cur_trace in stream:
             self.logger.info('###Processing trace with id %s.', cur_trace.id)
 
@@ -126,10 +252,7 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
                 self.check_result_needed(cur_scnl, start_time)
 
             # Get the channel instance from the inventory.
-            cur_channel = self.project.geometry_inventory.get_channel(station = cur_trace.stats.station,
-                                                                      name = cur_trace.stats.channel,
-                                                                      network = cur_trace.stats.network,
-                                                                      location = cur_trace.stats.location)
+            cur_channel = self.get_channels(cur_scnl)
             if len(cur_channel) == 0:
                 self.logger.error("No channel found for trace %s", cur_trace.id)
                 continue
@@ -138,57 +261,45 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
             else:
                 cur_channel = cur_channel[0]
 
-            psd_data = {}
-
+            trace_list.append((cur_trace, cur_scnl))
+
+        # Compute the PSD of all traces containing data.
+        psd_list = self.compute_psd(traces = [x[0] for x in trace_list if x[0]],
+                                    psd_nfft = psd_nfft,
+                                    psd_overlap = psd_overlap,
+                                    single_precision = psd_single_precision,
+                                    db = psd_store_db)
+        psd_list = iter(psd_list)
+
+        # The metadata shared by all PSD records.
+        base_meta = {'window_length': self.parent.pref_manager.get_value('window_length'),
+                     'window_overlap': self.parent.pref_manager.get_value('window_overlap'),
+                     'psd_nfft': psd_nfft,
+                     'psd_overlap': psd_overlap,
+                     'db': psd_store_db,
+                     'start_time': start_time,
+                     'end_time': end_time}
+
+        for cur_trace, cur_scnl in trace_list:
             if cur_trace:
-                # Compute the PSD using matplotlib.mlab.psd
-                m_psd_nfft = psd_nfft
-                m_pad_to = None
-                if len(cur_trace.data) < psd_nfft:
-                    m_psd_nfft = old_div(len(cur_trace.data), 4)
-                    m_pad_to = psd_nfft
-                n_overlap = old_div(m_psd_nfft, 100 * psd_overlap)
-
-                (P, frequ) = mlab.psd(cur_trace.data,
-                                      Fs = cur_trace.stats.sampling_rate,
-                                      NFFT = m_psd_nfft,
-                                      noverlap = n_overlap,
-                                      detrend = 'constant',
-                                      scale_by_freq = True,
-                                      pad_to = m_pad_to)
-
-                if P.ndim == 2:
-                    P = P.squeeze()
+                frequ, P = next(psd_list)
 
                 # Get the units of the trace data.
                 unit = cur_trace.stats.unit
 
-                cur_psd = {}
-                cur_psd['sps'] = cur_trace.stats.sampling_rate
-                cur_psd['frequ'] = frequ
-                cur_psd['P'] = P
-                cur_psd['window_length'] = self.parent.pref_manager.get_value('window_length')
-                cur_psd['window_overlap'] = self.parent.pref_manager.get_value('window_overlap')
-                cur_psd['psd_nfft'] = psd_nfft
-                cur_psd['psd_overlap'] = psd_overlap
-                cur_psd['scnl'] = cur_scnl
-                cur_psd['unit'] = unit
-                cur_psd['start_time'] = start_time
-                cur_psd['end_time'] = end_time
-                psd_data[start_time.isoformat()] = cur_psd
+                cur_psd = {**base_meta,
+                           'sps': cur_trace.stats.sampling_rate,
+                           'frequ': frequ,
+                           'P': P,
+                           'scnl': cur_scnl,
+                           'unit': unit}
             else:
-                cur_psd = {}
-                cur_psd['sps'] = None
-                cur_psd['frequ'] = None
-                cur_psd['P'] = None
-                cur_psd['window_length'] = self.parent.pref_manager.get_value('window_length')
-                cur_psd['window_overlap'] = self.parent.pref_manager.get_value('window_overlap')
-                cur_psd['psd_nfft'] = psd_nfft
-                cur_psd['psd_overlap'] = psd_overlap
-                cur_psd['scnl'] = cur_scnl
-                cur_psd['unit'] = 'undefined'
-                cur_psd['start_time'] = start_time
-                cur_psd['end_time'] = end_time
+                cur_psd = {**base_meta,
+                           'sps': None,
+                           'frequ': None,
+                           'P': None,
+                           'scnl': cur_scnl,
+                           'unit': 'undefined'}
 
             if cur_event:
                 cur_psd['event_id'] = cur_event.db_id
@@ -202,6 +313,272 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
                                      origin_resource = origin_resource)
 
 
+    def compute_psd(self, traces, psd_nfft, psd_overlap, single_precision = False,
+                    db = False):
+        ''' Compute the PSD of the traces using the Welch method.
+
+        The data of traces with the same sampling rate and number of
+        samples is stacked and the PSDs of these traces are computed with
+        a single call.
+
+        Parameters
+        ----------
+        traces : :obj:`list` of :class:`obspy.core.trace.Trace`
+            The traces for which to compute the PSD.
+
+        psd_nfft : int
+            The length of the fft window [samples].
+
+        psd_overlap : int
+            The overlap of the fft windows [%].
+
+        single_precision : bool
+            If True, the PSD is computed from the data converted to
+            float32 and the returned PSD is of type float32.
+
+        db : bool
+            If True, the PSD is returned in decibel (10 * log10(P)) as
+            float32 values.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`tuple`
+            The frequencies and the PSD of each trace.
+        '''
+        groups = {}
+        for k, cur_trace in enumerate(traces):
+            cur_key = (cur_trace.stats.sampling_rate, len(cur_trace.data))
+            groups.setdefault(cur_key, []).append(k)
+
+        psd_list = [None] * len(traces)
+
+        if single_precision:
+            dtype = np.float32
+        else:
+            dtype = np.float64
+
+        # Prepare the stacked data and the fft parameters of each group.
+        group_list = []
+        for (cur_sps, n_samples), cur_ind in groups.items():
+            m_psd_nfft = psd_nfft
+            m_pad_to = None
+            if n_samples < psd_nfft:
+                m_psd_nfft = n_samples // 4
+                m_pad_to = psd_nfft
+            n_overlap = self.compute_n_overlap(m_psd_nfft, psd_overlap)
+
+            # The seismic data is real valued. The one-sided spectrum
+            # is computed using a real FFT with psd_nfft / 2 + 1
+            # frequencies as expected by the PSD image creation.
+            # The data of a single trace is used as a view without copying.
+            if len(cur_ind) == 1:
+                data = np.real(traces[cur_ind[0]].data)[np.newaxis, :]
+            else:
+                data = np.stack([np.real(traces[k].data) for k in cur_ind])
+            data = data.astype(dtype, copy = False)
+            group_list.append((data, cur_sps, self.get_window(m_psd_nfft, dtype),
+                               n_overlap, m_pad_to, db))
+
+        if len(group_list) > 1:
+            # The groups are independent of each other. NumPy and the FFT
+            # release the GIL, so compute them in parallel threads. Each
+            # FFT uses a single thread.
+            n_workers = min(len(group_list), os.cpu_count() or 1)
+            with concurrent.futures.ThreadPoolExecutor(max_workers = n_workers) as executor:
+                group_psd = list(executor.map(self.compute_group_psd,
+                                              *zip(*group_list)))
+        else:
+            # Use all available CPUs for the FFT of a single group.
+            group_psd = [self.compute_group_psd(*x, workers = os.cpu_count() or 1) for x in group_list]
+
+        for ((cur_sps, n_samples), cur_ind), (frequ, P) in zip(groups.items(), group_psd):
+            # All PSD records with the same frequencies share one
+            # frequency array.
+            frequ = self.frequ_cache.setdefault((len(frequ), cur_sps, frequ[-1]), frequ)
+            for k, cur_P in zip(cur_ind, P):
+                psd_list[k] = (frequ, cur_P)
+
+        return psd_list
+
+
+    def get_channels(self, scnl):
+        ''' Get the inventory channels of a SCNL.
+
+        The channels of the geometry inventory are indexed by their SCNL
+        on the first call.
+
+        Parameters
+        ----------
+        scnl : :obj:`tuple` of str
+            The station, channel, network and location.
+
+        Returns
+        -------
+        :obj:`list` of :class:`psysmon.packages.geometry.inventory.Channel`
+            The channels matching the SCNL.
+        '''
+        if self.channel_cache is None:
+            self.channel_cache = {}
+            for cur_station in self.project.geometry_inventory.get_station():
+                for cur_channel in cur_station.channels:
+                    self.channel_cache.setdefault(cur_channel.scnl, []).append(cur_channel)
+
+        return self.channel_cache.get(scnl, [])
+
+
+    def compute_group_psd(self, data, fs, window, noverlap, nfft = None,
+                          db = False, workers = 1):
+        ''' Compute the PSD of a group of traces with equal length.
+
+        Parameters
+        ----------
+        data : :class:`numpy.ndarray`
+            The 2D data array. The PSD is computed for each row.
+
+        fs : float
+            The sampling rate of the data.
+
+        window : :class:`numpy.ndarray`
+            The window applied to the fft segments.
+
+        noverlap : int
+            The number of overlapping samples of the fft segments.
+
+        nfft : int
+            The length of the FFT. If None, the window length is used.
+
+        db : bool
+            If True, the PSD is returned in decibel as float32 values.
+
+        workers : int
+            The number of threads used for the FFT.
+
+        Returns
+        -------
+        frequ : :class:`numpy.ndarray`
+            The frequencies of the PSD.
+
+        P : :class:`numpy.ndarray`
+            The PSD of each row of data.
+        '''
+        frequ, P = self.welch(data,
+                              fs = fs,
+                              window = window,
+                              noverlap = noverlap,
+                              nfft = nfft,
+                              workers = workers)
+        if db:
+            P = np.log10(P, out = np.empty(P.shape, dtype = np.float32))
+            P *= 10
+        return frequ, P
+
+
+    def compute_n_overlap(self, nfft, overlap):
+        ''' Compute the number of overlapping samples of the fft windows.
+
+        Parameters
+        ----------
+        nfft : int
+            The length of the fft window [samples].
+
+        overlap : int
+            The overlap of the fft windows [%].
+
+        Returns
+        -------
+        int
+            The number of overlapping samples.
+        '''
+        return (nfft * overlap) // 100
+
+
+    def welch(self, data, fs, window, noverlap, nfft = None, workers = 1):
+        ''' Compute the one-sided PSD of the rows of data using the Welch method.
+
+        The result is equal to :func:`scipy.signal.welch` using a constant
+        detrend and the density scaling. The segments are taken as a
+        strided view of the data and the detrend and the windowing are
+        done in place in a single segment buffer.
+
+        Parameters
+        ----------
+        data : :class:`numpy.ndarray`
+            The 2D data array. The PSD is computed for each row.
+
+        fs : float
+            The sampling rate of the data.
+
+        window : :class:`numpy.ndarray`
+            The window applied to the segments. The length of the window
+            is the segment length.
+
+        noverlap : int
+            The number of overlapping samples of the segments.
+
+        nfft : int
+            The length of the FFT. If None, the segment length is used.
+
+        workers : int
+            The number of threads used for the FFT.
+
+        Returns
+        -------
+        frequ : :class:`numpy.ndarray`
+            The frequencies of the PSD.
+
+        P : :class:`numpy.ndarray`
+            The PSD of each row of data.
+        '''
+        nperseg = len(window)
+        if nfft is None:
+            nfft = nperseg
+        step = nperseg - noverlap
+
+        segments = np.lib.stride_tricks.sliding_window_view(data, nperseg, axis = -1)[:, ::step, :]
+        seg_buffer = np.empty(segments.shape, dtype = np.result_type(data, window))
+        np.subtract(segments, segments.mean(axis = -1, keepdims = True), out = seg_buffer)
+        np.multiply(seg_buffer, window, out = seg_buffer)
+
+        # The segment buffer is not needed after the FFT and may be used as
+        # workspace.
+        spec = rfft(seg_buffer, n = nfft, workers = workers)
+        P = spec.real**2 + spec.imag**2
+        P = P.mean(axis = -2)
+        P *= 1. / (fs * np.sum(window**2))
+
+        # Double the power of the one-sided spectrum except the DC and the
+        # Nyquist frequency.
+        if nfft % 2:
+            P[..., 1:] *= 2
+        else:
+            P[..., 1:-1] *= 2
+
+        frequ = scipy.fft.rfftfreq(nfft, 1. / fs)
+        return frequ, P
+
+
+    def get_window(self, n_samples, dtype = np.float64):
+        ''' Get the Hann window used for the PSD computation.
+
+        Parameters
+        ----------
+        n_samples : int
+            The length of the window [samples].
+
+        dtype : numpy dtype
+            The data type of the window.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The window.
+        '''
+        cur_key = (n_samples, np.dtype(dtype).name)
+        if cur_key not in self.window_cache:
+            self.window_cache[cur_key] = scipy.signal.get_window('hann', n_samples).astype(dtype)
+        return self.window_cache[cur_key]
+
+
     def save_psd_data(self, psd,
                       origin_resource = None):
         ''' Save the psd data to a file.
@@ -212,19 +589,15 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
         scnl = psd['scnl']
         start_time = psd['start_time']
 
-        if scnl not in iter(self.psd_data.keys()):
-            self.psd_data[scnl] = {}
+        scnl_psd_data = self.psd_data.setdefault(scnl, {})
 
-        if scnl not in iter(self.save_day.keys()):
-            self.save_day[scnl] = None
-
-        if self.save_day[scnl] is None:
+        if self.save_day.get(scnl, None) is None:
             self.save_day[scnl] = UTCDateTime(start_time.timestamp - start_time.timestamp % self.save_interval)
 
-        if 'event_id' in iter(psd.keys()):
-            self.psd_data[scnl][psd['event_id']] = psd
+        if 'event_id' in psd:
+            scnl_psd_data[psd['event_id']] = psd
         else:
-            self.psd_data[scnl][start_time.isoformat()] = psd
+            scnl_psd_data[start_time.isoformat()] = psd
 
 
 
@@ -232,7 +605,7 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
                             origin_resource = None):
         ''' Check if a result has to be created for the given SCNL.
         '''
-        if scnl not in self.save_day.keys():
+        if scnl not in self.save_day:
             return
 
         last_save_day = self.save_day[scnl]
@@ -252,8 +625,8 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
         '''
         export_data = self.psd_data[scnl]
 
-        first_time = UTCDateTime(sorted(export_data.keys())[0])
-        last_time = UTCDateTime(sorted(export_data.keys())[-1])
+        first_time = UTCDateTime(min(export_data.keys()))
+        last_time = UTCDateTime(max(export_data.keys()))
         #last_key = sorted(export_data.iterkeys())[-1]
         #last_time = export_data[last_key]['end_time']
         #first_time = sorted([x['start_time'] for x in export_data.values()])[0]
@@ -269,7 +642,8 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
                                                              "{0:04d}_{1:03d}".format(first_time.year,
                                                                                       first_time.julday)),
                                             postfix = '_'.join(scnl),
-                                            db = export_data)
+                                            db = export_data,
+                                            protocol = pickle.HIGHEST_PROTOCOL)
         self.result_bag.add(shelve_result)
         self.logger.info("Published the result for scnl %s (%s to %s).", scnl,
                                                                          first_time.isoformat(),
@@ -281,7 +655,7 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
     def create_event_result(self, event, origin_resource = None):
         ''' Write the psd data for the given scnl to file.
         '''
-        export_data = dict((str(':'.join(key)), value) for (key, value) in list(self.psd_data.items()))
+        export_data = {':'.join(key): value for key, value in self.psd_data.items()}
         export_data['event_id'] = event.db_id
 
         shelve_result = result.ShelveResult(name = 'psd',
@@ -289,16 +663,19 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
                                             end_time = event.end_time,
                                             origin_name = self.name,
                                             origin_resource = origin_resource,
-                                            db = export_data)
+                                            db = export_data,
+                                            protocol = pickle.HIGHEST_PROTOCOL)
         self.result_bag.add(shelve_result)
         self.logger.info("Published the result for event %d (%s to %s).",
                          event.db_id,
                          event.start_time.isoformat(),
                          event.end_time.isoformat())
 
+        # The save day is keyed by the SCNL tuples.
+        save_day = UTCDateTime(event.start_time.timestamp - event.start_time.timestamp % self.save_interval)
+        for cur_scnl in self.psd_data.keys():
+            self.save_day[cur_scnl] = save_day
         self.psd_data = {}
-        for cur_scnl in export_data.keys():
-            self.save_day[cur_scnl] = UTCDateTime(event.start_time.timestamp - event.start_time.timestamp % self.save_interval)
 
     def cleanup(self, origin_resource = None):
         ''' Publish all remaining psd data to results.
@@ -307,5 +684,7 @@ class ComputePsdNode(psysmon.core.packageNodes.LooperCollectionChildNode):
             if cur_data:
                 self.create_result(cur_scnl, origin_resource = origin_resource)
 
+        self.channel_cache = None
+
 
 
@@ -476,7 +476,8 @@ class PSDPlotter(object):
         time_key.extend(gap_fill)
         time_key = sorted(time_key)
 
-        # Create the PSD matrix used for plotting.
+        # Create the PSD matrix used for plotting. The PSD values are stored
+        # in decibel.
         psd_matrix = np.zeros((int(psd_nfft / 2 + 1), len(time_key)))
         psd_matrix[:] = np.nan
 
@@ -485,7 +486,10 @@ class PSDPlotter(object):
                 continue
 
             if cur_psd['frequ'] is not None:
-                psd_matrix[:, m] = cur_psd['P']
+                if cur_psd.get('db', False):
+                    psd_matrix[:, m] = cur_psd['P']
+                else:
+                    psd_matrix[:, m] = 10 * np.log10(np.abs(cur_psd['P']))
                 if frequ is None:
                     frequ = cur_psd['frequ']
 
@@ -597,7 +601,7 @@ class PSDPlotter(object):
         ax_psd.set_ylim((min_frequ, max_frequ))
         ax_psd.set_xlim((0, (self.endtime - self.starttime) / 3600.))
         
-        amp_resp = 10 * np.log10(np.abs(psd_matrix))
+        amp_resp = psd_matrix
         if unit == 'm/s':
             self.logger.info("time: %s", time.dtype)
             self.logger.info("frequ: %s", frequ.dtype)
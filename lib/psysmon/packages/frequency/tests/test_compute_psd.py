@@ -0,0 +1,158 @@
+'''
+Created on Oct 16, 2026
+
+@author: Stefan Mertl
+'''
+
+import unittest
+import logging
+
+import numpy as np
+import numpy.testing as np_test
+import scipy.signal
+from obspy.core import Trace
+
+import psysmon
+import psysmon.packages.frequency.compute_psd as compute_psd
+
+
+class ComputePsdTestCase(unittest.TestCase):
+    """
+    Test suite for psysmon.packages.frequency.compute_psd.ComputePsdNode
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Configure the logger.
+        logger = logging.getLogger('psysmon')
+        logger.setLevel('INFO')
+        logger.addHandler(psysmon.getLoggerHandler())
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_compute_n_overlap(self):
+        ''' Test the computation of the number of overlapping samples.
+        '''
+        node = compute_psd.ComputePsdNode()
+        self.assertEqual(node.compute_n_overlap(8192, 50), 4096)
+        self.assertEqual(node.compute_n_overlap(8192, 0), 0)
+        self.assertEqual(node.compute_n_overlap(1000, 99), 990)
+
+
+    def test_compute_psd(self):
+        ''' Test the computation of the PSD of multiple traces.
+        '''
+        node = compute_psd.ComputePsdNode()
+        psd_nfft = 1024
+        psd_overlap = 50
+        traces = [Trace(data = np.random.randn(10000),
+                        header = {'sampling_rate': 100.}),
+                  Trace(data = np.random.randn(10000),
+                        header = {'sampling_rate': 100.}),
+                  Trace(data = np.random.randn(500),
+                        header = {'sampling_rate': 100.}),
+                  Trace(data = np.random.randn(10000),
+                        header = {'sampling_rate': 200.})]
+
+        psd_list = node.compute_psd(traces = traces,
+                                    psd_nfft = psd_nfft,
+                                    psd_overlap = psd_overlap)
+        self.assertEqual(len(psd_list), len(traces))
+
+        for cur_trace, (frequ, P) in zip(traces, psd_list):
+            n_samples = len(cur_trace.data)
+            if n_samples < psd_nfft:
+                nperseg = n_samples // 4
+                nfft = psd_nfft
+            else:
+                nperseg = psd_nfft
+                nfft = None
+            exp_frequ, exp_P = scipy.signal.welch(cur_trace.data,
+                                                  fs = cur_trace.stats.sampling_rate,
+                                                  nperseg = nperseg,
+                                                  noverlap = nperseg // 2,
+                                                  nfft = nfft,
+                                                  detrend = 'constant')
+            self.assertEqual(len(frequ), psd_nfft // 2 + 1)
+            self.assertEqual(len(P), psd_nfft // 2 + 1)
+            self.assertFalse(np.iscomplexobj(P))
+            np_test.assert_allclose(frequ, exp_frequ)
+            np_test.assert_allclose(P, exp_P)
+
+        # The single precision computation.
+        psd_list = node.compute_psd(traces = traces[:2],
+                                    psd_nfft = psd_nfft,
+                                    psd_overlap = psd_overlap,
+                                    single_precision = True)
+        for cur_trace, (frequ, P) in zip(traces, psd_list):
+            exp_frequ, exp_P = scipy.signal.welch(cur_trace.data,
+                                                  fs = cur_trace.stats.sampling_rate,
+                                                  nperseg = psd_nfft,
+                                                  noverlap = psd_nfft // 2,
+                                                  detrend = 'constant')
+            self.assertEqual(P.dtype, np.float32)
+            np_test.assert_allclose(P, exp_P, rtol = 1e-4)
+
+        # The PSD in decibel.
+        psd_list = node.compute_psd(traces = traces[:2],
+                                    psd_nfft = psd_nfft,
+                                    psd_overlap = psd_overlap,
+                                    db = True)
+        for cur_trace, (frequ, P) in zip(traces, psd_list):
+            exp_frequ, exp_P = scipy.signal.welch(cur_trace.data,
+                                                  fs = cur_trace.stats.sampling_rate,
+                                                  nperseg = psd_nfft,
+                                                  noverlap = psd_nfft // 2,
+                                                  detrend = 'constant')
+            self.assertEqual(P.dtype, np.float32)
+            np_test.assert_allclose(P, 10 * np.log10(exp_P), rtol = 1e-5, atol = 1e-4)
+
+
+    def test_pyfftw_psd(self):
+        ''' Test the PSD computed with the cached pyFFTW plans.
+        '''
+        if compute_psd.pyfftw is None:
+            self.skipTest('pyFFTW is not available.')
+
+        node = compute_psd.ComputePsdNode()
+        traces = [Trace(data = np.random.randn(10000),
+                        header = {'sampling_rate': 100.}),
+                  Trace(data = np.random.randn(500),
+                        header = {'sampling_rate': 100.})]
+
+        use_pyfftw = compute_psd.use_pyfftw
+        try:
+            compute_psd.use_pyfftw = False
+            exp_psd_list = node.compute_psd(traces = traces,
+                                            psd_nfft = 1024,
+                                            psd_overlap = 50)
+
+            compute_psd.use_pyfftw = True
+            compute_psd.fft_plans.clear()
+            for k in range(2):
+                # The second run reuses the cached plans.
+                psd_list = node.compute_psd(traces = traces,
+                                            psd_nfft = 1024,
+                                            psd_overlap = 50)
+                self.assertEqual(len(compute_psd.fft_plans), 2)
+                for (exp_frequ, exp_P), (frequ, P) in zip(exp_psd_list, psd_list):
+                    np_test.assert_allclose(frequ, exp_frequ)
+                    np_test.assert_allclose(P, exp_P)
+        finally:
+            compute_psd.use_pyfftw = use_pyfftw
+
+
+
+def suite():
+    return unittest.makeSuite(ComputePsdTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -222,11 +222,18 @@ class DbInventory(Inventory):
             self.load_arrays()
         except Exception:
             self.logger.exception("Error loading the geometry from the database.")
+        finally:
+            self.clear_index()
+            self.clear_element_cache()
 
     def commit(self):
         ''' Commit the database changes.
+
+        The changed flag of the inventory is reset after a successful
+        commit.
         '''
         self.db_session.commit()
+        self.clear_changed()
 
 
     @classmethod
@@ -631,7 +638,7 @@ class DbStation(Station):
         attr_map['agency_uri'] = 'agency_uri'
         attr_map['creation_time'] = 'creation_time'
 
-        self.__dict__[attr] = value
+        Station.__setattr__(self, attr, value)
 
         if attr in iter(attr_map.keys()):
             if 'orm' in self.__dict__:
@@ -736,12 +743,10 @@ class DbRecorder(Recorder):
         attr_map['agency_uri'] = 'agency_uri'
         attr_map['creation_time'] = 'creation_time'
 
+        Recorder.__setattr__(self, attr, value)
         if attr in iter(attr_map.keys()):
-            self.__dict__[attr] = value
             if 'orm' in self.__dict__:
                 setattr(self.orm, attr_map[attr], value)
-        else:
-            self.__dict__[attr] = value
 
 
     def add_stream(self, cur_stream):
@@ -1231,12 +1236,10 @@ class DbSensor(Sensor):
         attr_map['agency_uri'] = 'agency_uri'
         attr_map['creation_time'] = 'creation_time'
 
+        Sensor.__setattr__(self, attr, value)
         if attr in iter(attr_map.keys()):
-            self.__dict__[attr] = value
             if 'orm' in self.__dict__:
                 setattr(self.orm, attr_map[attr], value)
-        else:
-            self.__dict__[attr] = value
 
 
     def add_component(self, cur_component):
@@ -480,31 +480,29 @@ class EditGeometryDlg(wx.Frame):
             # This returns a Python list of files that were selected.
             path = dlg.GetPath()
 
-            export_values = []
-
             # Get the EPSG code for the best fitting UTM projection.
             code = self.selected_inventory.get_utm_epsg()
-            proj = pyproj.Proj(init = 'epsg:' + code[0][0])
-
-            for cur_network in self.selected_inventory.networks:
-                for cur_station in cur_network.stations:
-                    x, y = proj(cur_station.get_lon_lat()[0],
-                                cur_station.get_lon_lat()[1])
-                    value_list = [cur_station.name,
-                                  cur_station.network,
-                                  cur_station.location,
-                                  cur_station.x,
-                                  cur_station.y,
-                                  cur_station.z,
-                                  cur_station.coord_system,
-                                  x,
-                                  y,
-                                  'epsg:' + code[0][0],
-                                  cur_station.description]
-                    #for k, cur_value in enumerate(value_list):
-                    #    if isinstance(cur_value, str):
-                    #        value_list[k] = cur_value.encode('utf8')
-                    export_values.append(value_list)
+            transformer = geom_util.get_transformer('epsg:4326',
+                                                    'epsg:' + code[0][0])
+
+            def export_rows():
+                ''' Create the CSV rows one station at a time.
+                '''
+                for cur_network in self.selected_inventory.networks:
+                    for cur_station in cur_network.stations:
+                        lon, lat = cur_station.get_lon_lat()
+                        x, y = transformer.transform(lon, lat)
+                        yield [cur_station.name,
+                               cur_station.network,
+                               cur_station.location,
+                               cur_station.x,
+                               cur_station.y,
+                               cur_station.z,
+                               cur_station.coord_system,
+                               x,
+                               y,
+                               'epsg:' + code[0][0],
+                               cur_station.description]
 
             header = ['name',
                       'network',
@@ -521,7 +519,7 @@ class EditGeometryDlg(wx.Frame):
                 writer = csv.writer(fid,
                                     quoting = csv.QUOTE_MINIMAL)
                 writer.writerow(header)
-                writer.writerows(export_values)
+                writer.writerows(export_rows())
 
 
     def onExportStations2StationXML(self, event):
@@ -986,6 +984,9 @@ class EditGeometryDlg(wx.Frame):
             self.logger.debug("Updating the existing project inventory database.")
             self.db_inventory.commit()
 
+        # The elements of the selected inventory have been saved.
+        self.selected_inventory.clear_changed()
+
         # Load the updated inventory into the project inventory.
         self.psyProject.load_geometry_inventory()
 
@@ -2249,8 +2250,7 @@ class MapViewPanel(wx.Panel):
         if self.mapConfig['hemisphere'] == 'south':
             search_dict['south'] = True
 
-        epsg_dict = geom_util.get_epsg_dict()
-        code = [(c, x) for c, x in list(epsg_dict.items()) if  x == search_dict]
+        code = geom_util.get_epsg_code(search_dict)
 
         # Setup the pyproj projection.projection
         #proj = pyproj.Proj(proj = 'utm', zone = self.mapConfig['utmZone'], ellps = self.mapConfig['ellips'].upper())
@@ -2321,8 +2321,7 @@ class MapViewPanel(wx.Panel):
         if self.mapConfig['hemisphere'] == 'south':
             search_dict['south'] = True
 
-        epsg_dict = geom_util.get_epsg_dict()
-        code = [(c, x) for c, x in list(epsg_dict.items()) if  x == search_dict]
+        code = geom_util.get_epsg_code(search_dict)
 
         # Setup the pyproj projection.projection
         #proj = pyproj.Proj(proj = 'utm', zone = self.mapConfig['utmZone'], ellps = self.mapConfig['ellips'].upper())
@@ -33,7 +33,6 @@ inventory.
 
 from builtins import str
 from builtins import object
-import itertools
 
 import pandas as pd
 import psysmon
@@ -41,13 +40,69 @@ import obspy.core.inventory as obs_inv
 from obspy.core.utcdatetime import UTCDateTime
 from psysmon.core.error import PsysmonError
 import psysmon.packages.geometry.util as geom_util
-import pyproj
 import numpy as np
 import warnings
 import logging
 from operator import attrgetter
 
 
+def filter_by_attributes(elements, valid_keys, kwargs):
+    ''' Filter the inventory elements by their attribute values.
+
+    Parameters
+    ----------
+    elements : list
+        The elements to filter.
+
+    valid_keys : :obj:`list` of str
+        The attributes which can be used for filtering.
+
+    kwargs : dict
+        The attribute values to match. Keys that are not in valid_keys
+        are ignored with a warning.
+
+    Returns
+    -------
+    list
+        The elements matching all attribute values.
+    '''
+    unknown_keys = kwargs.keys() - set(valid_keys)
+    if unknown_keys:
+        warnings.warn('Search attribute %s is not existing.' % ', '.join(sorted(unknown_keys)),
+                      RuntimeWarning)
+
+    getters = [(attrgetter(k), v) for k, v in kwargs.items() if k in valid_keys]
+
+    if not getters:
+        return elements
+    elif len(getters) == 1:
+        getter, value = getters[0]
+        return [x for x in elements if getter(x) == value]
+    else:
+        return [x for x in elements if all(g(x) == v for g, v in getters)]
+
+
+def get_active_at(elements, timestamp):
+    ''' Get the timespan elements active at a given time.
+
+    Parameters
+    ----------
+    elements : list
+        The elements with a start_time and end_time attribute
+        (:class:`TimeBox`, stream or component parameters).
+
+    timestamp : float
+        The POSIX timestamp of the time to check.
+
+    Returns
+    -------
+    list
+        The elements without an end time or with an end time later
+        than the timestamp.
+    '''
+    return [x for x in elements if x.end_time is None or x.end_time.timestamp > timestamp]
+
+
 class Inventory(object):
     ''' The geometry inventory.
 
@@ -78,6 +133,18 @@ class Inventory(object):
         The arrays of the inventory.
     '''
 
+    # The attributes used to index the elements of the inventory lists.
+    index_keys = {'recorders': 'serial',
+                  'sensors': 'serial',
+                  'networks': 'name',
+                  'arrays': 'name'}
+
+    # The channel search keys which select the station of the channel
+    # mapped to the station attributes.
+    channel_station_keys = {'network': 'network',
+                            'station': 'name',
+                            'location': 'location'}
+
     def __init__(self, name, type = None):
         ''' Initialize the instance.
         '''
@@ -108,22 +175,42 @@ class Inventory(object):
         ## The arrays contained in the inventory.
         self.arrays = []
 
+        # The lookup indexes of the inventory lists. The indexes are built
+        # on the first lookup and are cleared if an element is removed or
+        # its index key is changed.
+        self.element_index = {}
+
+        # The flattened lists of the streams, components, stations and
+        # channels. The lists are built on the first request and are
+        # cleared if an element is added or removed.
+        self.element_cache = {}
+
+        # Indicates if an element of the inventory has been changed. The
+        # flag is set by the recorders, sensors and networks.
+        self.changed = False
+
+        # The UTM coordinates of the stations computed by
+        # compute_utm_coordinates. The rows are ordered like the stations
+        # returned by get_station.
+        self.utm_coordinates = None
+
 
     def __str__(self):
         ''' Print the string representation of the inventory.
         '''
-        out = "Inventory %s of type %s\n" % (self.name, self.type) 
+        # Collect the parts and join them once.
+        parts = ["Inventory %s of type %s\n" % (self.name, self.type)]
 
         # Print the networks.
-        out =  out + str(len(self.networks)) + " network(s) in the inventory:\n"
-        out = out + "\n".join([net.__str__() for net in self.networks])
+        parts.append("%d network(s) in the inventory:\n" % len(self.networks))
+        parts.append("\n".join(str(net) for net in self.networks))
 
         # Print the recorders.
-        out = out + '\n\n'
-        out =  out + str(len(self.recorders)) + " recorder(s) in the inventory:\n"
-        out = out + "\n".join([rec.__str__() for rec in self.recorders])
+        parts.append('\n\n')
+        parts.append("%d recorder(s) in the inventory:\n" % len(self.recorders))
+        parts.append("\n".join(str(rec) for rec in self.recorders))
 
-        return out
+        return ''.join(parts)
 
 
 
@@ -131,11 +218,38 @@ class Inventory(object):
         ''' Test for equality.
         '''
         if type(self) is type(other):
-            compare_attributes = ['name', 'type', 'recorders', 'networks', 'arrays']
+            compare_attributes = ['name', 'type']
             for cur_attribute in compare_attributes:
                 if getattr(self, cur_attribute) != getattr(other, cur_attribute):
                     return False
 
+            # Compare the element lists as multisets independent of their
+            # order. The elements are grouped by their identifying key and
+            # each element is matched with an equal element of the other
+            # list having the same key. Elements with duplicate keys are
+            # handled too. The comparison stops at the first element
+            # without a match.
+            compare_lists = ['recorders', 'networks', 'arrays']
+            for cur_list in compare_lists:
+                self_list = getattr(self, cur_list)
+                other_list = getattr(other, cur_list)
+                if len(self_list) != len(other_list):
+                    return False
+
+                key = self.index_keys[cur_list]
+                other_by_key = {}
+                for cur_element in other_list:
+                    other_by_key.setdefault(getattr(cur_element, key), []).append(cur_element)
+
+                for cur_element in self_list:
+                    candidates = other_by_key.get(getattr(cur_element, key), [])
+                    for k, cur_candidate in enumerate(candidates):
+                        if cur_element == cur_candidate:
+                            del candidates[k]
+                            break
+                    else:
+                        return False
+
             return True
         else:
             return False
@@ -148,6 +262,10 @@ class Inventory(object):
         self.arrays = []
         self.recorders = []
         self.sensors = []
+        self.clear_index()
+        self.clear_element_cache()
+        self.changed = False
+        self.utm_coordinates = None
         
 
     def as_dict(self, style = None):
@@ -182,6 +300,8 @@ class Inventory(object):
 
         if not self.get_recorder(serial = recorder.serial):
             self.recorders.append(recorder)
+            self.add_to_index('recorders', recorder)
+            self.clear_element_cache('streams')
             recorder.parent_inventory = self
             added_recorder = recorder
         else:
@@ -201,6 +321,8 @@ class Inventory(object):
         '''
         if recorder in self.recorders:
             self.recorders.remove(recorder)
+            self.clear_index('recorders')
+            self.clear_element_cache('streams')
 
 
 
@@ -276,6 +398,8 @@ class Inventory(object):
                                model = sensor_to_add.model,
                                producer = sensor_to_add.producer):
             self.sensors.append(sensor_to_add)
+            self.add_to_index('sensors', sensor_to_add)
+            self.clear_element_cache('components')
             sensor_to_add.parent_inventory = self
             added_sensor = sensor_to_add
         else:
@@ -295,6 +419,8 @@ class Inventory(object):
         '''
         if sensor_to_remove in self.sensors:
             self.sensors.remove(sensor_to_remove)
+            self.clear_index('sensors')
+            self.clear_element_cache('components')
 
 
     def add_network(self, network):
@@ -314,6 +440,8 @@ class Inventory(object):
 
         if not self.get_network(name = network.name):
             self.networks.append(network)
+            self.add_to_index('networks', network)
+            self.clear_element_cache('stations')
             network.parent_inventory = self
             added_network = network
         else:
@@ -331,6 +459,8 @@ class Inventory(object):
         '''
         if network_to_remove in self.networks:
             self.networks.remove(network_to_remove)
+            self.clear_index('networks')
+            self.clear_element_cache('stations')
 
 
     def remove_network(self, name):
@@ -352,6 +482,8 @@ class Inventory(object):
 
         if len(net_2_remove) == 1:
             self.networks.remove(net_2_remove[0])
+            self.clear_index('networks')
+            self.clear_element_cache('stations')
             removed_network = net_2_remove[0]
         else:
             # This shouldn't happen.
@@ -377,6 +509,7 @@ class Inventory(object):
 
         if not self.get_array(name = array.name):
             self.arrays.append(array)
+            self.add_to_index('arrays', array)
             array.parent_inventory = self
             added_array = array
         else:
@@ -385,6 +518,116 @@ class Inventory(object):
         return added_array
 
 
+    def get_index(self, list_name):
+        ''' Get the lookup index of an inventory list.
+
+        The index maps the value of the index key attribute to the
+        elements of the list. It is built on the first request.
+
+        Parameters
+        ----------
+        list_name : str
+            The name of the inventory list (recorders, sensors, networks,
+            arrays).
+
+        Returns
+        -------
+        dict
+            The elements of the list indexed by the index key.
+        '''
+        cur_index = self.element_index.get(list_name, None)
+        if cur_index is None:
+            key = self.index_keys[list_name]
+            cur_index = {}
+            for cur_element in getattr(self, list_name):
+                cur_index.setdefault(getattr(cur_element, key), []).append(cur_element)
+            self.element_index[list_name] = cur_index
+        return cur_index
+
+
+    def add_to_index(self, list_name, element):
+        ''' Add an element to the lookup index of an inventory list.
+
+        Parameters
+        ----------
+        list_name : str
+            The name of the inventory list.
+
+        element : object
+            The element added to the list.
+        '''
+        cur_index = self.element_index.get(list_name, None)
+        if cur_index is not None:
+            key = getattr(element, self.index_keys[list_name])
+            cur_index.setdefault(key, []).append(element)
+
+
+    def clear_index(self, list_name = None):
+        ''' Clear the lookup index of an inventory list.
+
+        The index is rebuilt on the next lookup.
+
+        Parameters
+        ----------
+        list_name : str
+            The name of the inventory list. If None, the indexes of
+            all lists are cleared.
+        '''
+        if list_name is None:
+            self.element_index = {}
+        else:
+            self.element_index.pop(list_name, None)
+
+
+    def get_element_cache(self, name):
+        ''' Get the flattened list of inventory sub-elements.
+
+        Parameters
+        ----------
+        name : str
+            The name of the sub-elements (streams, components, stations,
+            channels).
+
+        Returns
+        -------
+        list
+            All sub-elements of the inventory. The list is shared and
+            must not be changed.
+        '''
+        cur_cache = self.element_cache.get(name, None)
+        if cur_cache is None:
+            if name == 'streams':
+                cur_cache = [s for x in self.recorders for s in x.streams]
+            elif name == 'components':
+                cur_cache = [c for x in self.sensors for c in x.components]
+            elif name == 'stations':
+                cur_cache = [s for x in self.networks for s in x.stations]
+            elif name == 'channels':
+                cur_cache = [c for x in self.get_element_cache('stations') for c in x.channels]
+            else:
+                raise ValueError("Unknown element name %s." % name)
+            self.element_cache[name] = cur_cache
+        return cur_cache
+
+
+    def clear_element_cache(self, name = None):
+        ''' Clear the flattened list of inventory sub-elements.
+
+        Parameters
+        ----------
+        name : str
+            The name of the sub-elements. If None, all lists are cleared.
+            The channels depend on the stations and are cleared together
+            with them.
+        '''
+        if name is None:
+            self.element_cache = {}
+        else:
+            self.element_cache.pop(name, None)
+            if name == 'stations':
+                self.element_cache.pop('channels', None)
+
+
     def has_changed(self):
         ''' Check if any element in the inventory has been changed.
 
@@ -393,22 +636,19 @@ class Inventory(object):
         bool:
             True if the inventory has changed, False otherwise.
         '''
-        for cur_sensor in self.sensors:
-            if cur_sensor.has_changed is True:
-                self.logger.debug('Sensor changed')
-                return True
+        return self.changed
 
-        for cur_recorder in self.recorders:
-            if cur_recorder.has_changed is True:
-                self.logger.debug('Recorder changed')
-                return True
 
-        for cur_network in self.networks:
-            if cur_network.has_changed is True:
-                self.logger.debug('Network changed.')
-                return True
+    def mark_changed(self):
+        ''' Mark the inventory as changed.
+        '''
+        self.changed = True
+
 
-        return False
+    def clear_changed(self):
+        ''' Reset the changed flag of the inventory.
+        '''
+        self.changed = False
 
 
     def merge(self, merge_inventory):
@@ -419,61 +659,77 @@ class Inventory(object):
         merge_inventory: :class:`Inventory`
             The inventory to merge.
         '''
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+
         # Merge the sensors.
         for cur_sensor in merge_inventory.sensors:
-            self.logger.debug('Checking sensor %s.', cur_sensor.serial)
-            exist_sensor = self.get_sensor(serial = cur_sensor.serial,
-                                   model = cur_sensor.model,
-                                   producer = cur_sensor.producer)
-            if not exist_sensor:
-                self.logger.debug('Adding the sensor to the inventory.')
+            if debug:
+                self.logger.debug('Checking sensor %s.', cur_sensor.serial)
+            exist_sensor = None
+            for cur_candidate in self.get_index('sensors').get(cur_sensor.serial, []):
+                if cur_candidate.model == cur_sensor.model and cur_candidate.producer == cur_sensor.producer:
+                    exist_sensor = cur_candidate
+                    break
+
+            if exist_sensor is None:
+                if debug:
+                    self.logger.debug('Adding the sensor to the inventory.')
                 self.add_sensor(cur_sensor)
             else:
-                exist_sensor = exist_sensor[0]
-                self.logger.debug('Merging the sensor with existing sensor %s.', exist_sensor.serial)
+                if debug:
+                    self.logger.debug('Merging the sensor with existing sensor %s.', exist_sensor.serial)
                 exist_sensor.merge(cur_sensor)
 
         # Merge the recorders.
         for cur_recorder in merge_inventory.recorders:
-            self.logger.debug('Checking recorder %s.', cur_recorder.serial)
-            exist_recorder = self.get_recorder(serial = cur_recorder.serial,
-                                               model = cur_recorder.model,
-                                               producer = cur_recorder.producer)
-            if not exist_recorder:
-                self.logger.debug('Adding the recorder to the inventory.')
+            if debug:
+                self.logger.debug('Checking recorder %s.', cur_recorder.serial)
+            exist_recorder = None
+            for cur_candidate in self.get_index('recorders').get(cur_recorder.serial, []):
+                if cur_candidate.model == cur_recorder.model and cur_candidate.producer == cur_recorder.producer:
+                    exist_recorder = cur_candidate
+                    break
+
+            if exist_recorder is None:
+                if debug:
+                    self.logger.debug('Adding the recorder to the inventory.')
                 self.add_recorder(cur_recorder)
             else:
-                exist_recorder = exist_recorder[0]
-                self.logger.debug('Merging the recorder with existing recorder %s.', exist_recorder.serial)
+                if debug:
+                    self.logger.debug('Merging the recorder with existing recorder %s.', exist_recorder.serial)
                 exist_recorder.merge(cur_recorder)
 
         # Merge the networks.
         for cur_network in merge_inventory.networks:
-            self.logger.debug('Checking network %s.', cur_network.name)
-
-            exist_network = self.get_network(name = cur_network.name)
+            if debug:
+                self.logger.debug('Checking network %s.', cur_network.name)
+            exist_network = self.get_index('networks').get(cur_network.name, None)
 
             if not exist_network:
-                self.logger.debug('Adding the network to the inventory.')
+                if debug:
+                    self.logger.debug('Adding the network to the inventory.')
                 self.add_network(cur_network)
             else:
                 exist_network = exist_network[0]
-                self.logger.debug('Merging the network with existing network %s.', exist_network.name)
+                if debug:
+                    self.logger.debug('Merging the network with existing network %s.', exist_network.name)
                 exist_network.merge(cur_network)
 
 
         # Merge the arrays.
         for cur_array in merge_inventory.arrays:
-            self.logger.debug('Checking array %s.', cur_array.name)
-
-            exist_array = self.get_array(name = cur_array.name)
+            if debug:
+                self.logger.debug('Checking array %s.', cur_array.name)
+            exist_array = self.get_index('arrays').get(cur_array.name, None)
 
             if not exist_array:
-                self.logger.debug('Adding the array to the inventory.')
+                if debug:
+                    self.logger.debug('Adding the array to the inventory.')
                 self.add_array(cur_array)
             else:
                 exist_array = exist_array[0]
-                self.logger.debug('Merging the array with existing array %s.', exist_array.name)
+                if debug:
+                    self.logger.debug('Merging the array with existing array %s.', exist_array.name)
                 exist_array.merge(cur_array)
 
 
@@ -530,15 +786,13 @@ class Inventory(object):
         :obj:`list` of :class:`Recorder`
             The recorder(s) in the inventory matching the search criteria.
         '''
-        ret_recorder = self.recorders
+        if 'serial' in kwargs:
+            ret_recorder = self.get_index('recorders').get(kwargs['serial'], [])
+        else:
+            ret_recorder = self.recorders
 
         valid_keys = ['serial', 'model', 'producer']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_recorder = [x for x in ret_recorder if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_recorder = filter_by_attributes(ret_recorder, valid_keys, kwargs)
 
         return ret_recorder
 
@@ -566,15 +820,10 @@ class Inventory(object):
             The streams matching the search criteria.
 
         '''
-        ret_stream = list(itertools.chain.from_iterable([x.streams for x in self.recorders]))
+        ret_stream = self.get_element_cache('streams')
 
         valid_keys = ['name', 'serial', 'model', 'producer']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_stream = [x for x in ret_stream if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_stream = list(filter_by_attributes(ret_stream, valid_keys, kwargs))
 
         return ret_stream
 
@@ -601,15 +850,13 @@ class Inventory(object):
         :obj:`list` of :class:`Sensor`
             The sensors matching the search criteria.
         '''
-        ret_sensor = self.sensors
+        if 'serial' in kwargs:
+            ret_sensor = self.get_index('sensors').get(kwargs['serial'], [])
+        else:
+            ret_sensor = self.sensors
 
         valid_keys = ['serial', 'model', 'producer']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_sensor = [x for x in ret_sensor if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_sensor = filter_by_attributes(ret_sensor, valid_keys, kwargs)
 
         return ret_sensor
 
@@ -636,15 +883,10 @@ class Inventory(object):
         :obj:`list` of :class:`SensorComponent`
             The sensor components matching the search criteria.
         '''
-        ret_component = list(itertools.chain.from_iterable([x.components for x in self.sensors]))
+        ret_component = self.get_element_cache('components')
 
         valid_keys = ['name', 'serial', 'model', 'producer']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_component = [x for x in ret_component if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_component = list(filter_by_attributes(ret_component, valid_keys, kwargs))
 
         return ret_component
 
@@ -668,15 +910,10 @@ class Inventory(object):
         :obj:`list` of :class:`Station`
             The stations matching the search criteria.
         '''
-        ret_station = list(itertools.chain.from_iterable([x.stations for x in self.networks]))
+        ret_station = self.get_element_cache('stations')
 
         valid_keys = ['name', 'network', 'location']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_station = [x for x in ret_station if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_station = list(filter_by_attributes(ret_station, valid_keys, kwargs))
 
         return ret_station
 
@@ -704,30 +941,16 @@ class Inventory(object):
             The channels matching the search criteria.
         '''
 
-        search_dict = {}
-        if 'network' in kwargs.keys():
-            search_dict['network'] = kwargs['network']
-            kwargs.pop('network')
-
-        if 'station' in kwargs.keys():
-            search_dict['name'] = kwargs['station']
-            kwargs.pop('station')
-
-        if 'location' in kwargs.keys():
-            search_dict['location'] = kwargs['location']
-            kwargs.pop('location')
-
-        stations = self.get_station(**search_dict)
-
-        ret_channel = list(itertools.chain.from_iterable([x.channels for x in stations]))
+        search_dict = {self.channel_station_keys[k]: kwargs.pop(k) for k in list(kwargs) if k in self.channel_station_keys}
 
-        valid_keys = ['name',]
+        if search_dict:
+            stations = self.get_station(**search_dict)
+            ret_channel = [c for x in stations for c in x.channels]
+        else:
+            ret_channel = self.get_element_cache('channels')
 
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_channel = [x for x in ret_channel if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        valid_keys = ['name']
+        ret_channel = list(filter_by_attributes(ret_channel, valid_keys, kwargs))
         return ret_channel
 
 
@@ -747,7 +970,7 @@ class Inventory(object):
         kwargs
             The Keyword arguments passed to :meth:`get_stream`.
         '''
-        ret_channel = list(itertools.chain.from_iterable(x.channels for x in self.get_station()))
+        ret_channel = self.get_element_cache('channels')
 
         ret_channel = [x for x in ret_channel if x.get_stream(start_time = start_time,
                                                               end_time = end_time,
@@ -771,14 +994,13 @@ class Inventory(object):
         :obj:`list` of :class:`Network`
             The networks matching the search criteria.
         '''
-        ret_network = self.networks
+        if 'name' in kwargs:
+            ret_network = self.get_index('networks').get(kwargs['name'], [])
+        else:
+            ret_network = self.networks
 
         valid_keys = ['name', 'type']
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_network = [x for x in ret_network if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_network = filter_by_attributes(ret_network, valid_keys, kwargs)
 
         return ret_network
 
@@ -796,14 +1018,13 @@ class Inventory(object):
         :obj:`list` of :class:`Array`
             The arrays matching the search criteria.
         '''
-        ret_array = self.arrays
+        if 'name' in kwargs:
+            ret_array = self.get_index('arrays').get(kwargs['name'], [])
+        else:
+            ret_array = self.arrays
 
         valid_keys = ['name']
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_array = [x for x in ret_array if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_array = filter_by_attributes(ret_array, valid_keys, kwargs)
 
         return ret_array
 
@@ -818,21 +1039,19 @@ class Inventory(object):
 
         See Also
         --------
-        :meth:`mss_dataserver.geometry.util.get_epsg_dict`
+        :meth:`psysmon.packages.geometry.util.get_epsg_code`
         '''
         # Get the lon/lat limits of the inventory.
-        lonLat = []
-        for curNet in self.networks:
-            lonLat.extend([stat.get_lon_lat() for stat in curNet.stations])
+        lonLat = self.get_lon_lat()
 
         if len(lonLat) == 0:
             self.logger.error("Length of lonLat is zero. No stations found in the inventory. Can't compute the UTM zone.")
             return
 
-        lonLatMin = np.min(lonLat, 0)
-        lonLatMax = np.max(lonLat, 0)
-        utm_zone = geom_util.lon2UtmZone(np.mean([lonLatMin[0], lonLatMax[0]]))
-        if np.mean([lonLatMin[1], lonLatMax[1]]) >= 0:
+        # The center of the lon/lat limits.
+        lonMid, latMid = (lonLat.min(0) + lonLat.max(0)) / 2
+        utm_zone = geom_util.lon2UtmZone(lonMid)
+        if latMid >= 0:
             hemisphere = 'north'
         else:
             hemisphere = 'south'
@@ -846,133 +1065,152 @@ class Inventory(object):
         if hemisphere == 'south':
             search_dict['south'] = True
 
-        epsg_dict = geom_util.get_epsg_dict()
-        code = [(c, x) for c, x in epsg_dict.items() if  x == search_dict]
+        code = geom_util.get_epsg_code(search_dict)
         return code
 
     def compute_utm_coordinates(self):
         ''' Compute the UTM coordinates of all stations in the inventory.
+
+        The coordinates are assigned to the stations and are kept as a
+        (n, 2) array in the utm_coordinates attribute of the inventory.
         '''
         code = self.get_utm_epsg()
-        proj = pyproj.Proj(init = 'epsg:' + code[0][0])
+        stations = self.get_station()
+        x_utm, y_utm = self.transform_to_utm(self.get_lon_lat(), code)
 
-        for cur_station in self.get_station():
-            x, y = proj(cur_station.get_lon_lat()[0],
-                        cur_station.get_lon_lat()[1])
+        utm_coordinates = np.column_stack((x_utm, y_utm))
+        utm_coordinates.flags.writeable = False
+        self.utm_coordinates = utm_coordinates
+
+        for cur_station, (x, y) in zip(stations, utm_coordinates.tolist()):
             cur_station.x_utm = x
             cur_station.y_utm = y
 
+
+    def get_lon_lat(self):
+        ''' Get the WGS84 coordinates of all stations in the inventory.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The longitude and latitude of the stations. The rows are
+            ordered like the stations returned by :meth:`get_station`.
+        '''
+        if not self.networks:
+            return np.empty((0, 2))
+        return np.vstack([x.get_lon_lat() for x in self.networks])
+
+
+    def transform_to_utm(self, lon_lat, code):
+        ''' Transform WGS84 coordinates to UTM coordinates.
+
+        All coordinates are transformed with a single call.
+
+        Parameters
+        ----------
+        lon_lat : :class:`numpy.ndarray`
+            The longitude and latitude of the points to transform.
+
+        code : tuple
+            The epsg code of the UTM coordinate system as returned by
+            :meth:`get_utm_epsg`.
+
+        Returns
+        -------
+        x_utm : :class:`numpy.ndarray`
+            The UTM easting of the points.
+
+        y_utm : :class:`numpy.ndarray`
+            The UTM northing of the points.
+        '''
+        transformer = geom_util.get_transformer('epsg:4326',
+                                                'epsg:' + code[0][0])
+        return transformer.transform(lon_lat[:, 0], lon_lat[:, 1])
+
             
     def to_dataframe(self, level = 'station'):
         ''' Convert the inventory to pandas dataframe.
         '''
-        df = None
-        export_values = []
-
-        # Get the EPSG code for the best fitting UTM projection.
+        # Get the EPSG code for the best fitting UTM projection and
+        # transform the coordinates of all stations.
         code = self.get_utm_epsg()
-        proj = pyproj.Proj(init = 'epsg:' + code[0][0])
-            
-        if level == 'station':
-            for cur_network in self.networks:
-                for cur_station in cur_network.stations:
-                    x, y = proj(cur_station.get_lon_lat()[0],
-                                cur_station.get_lon_lat()[1])
-                    value_list = [cur_station.name,
-                                  cur_station.network,
-                                  cur_station.location,
-                                  cur_station.x,
-                                  cur_station.y,
-                                  cur_station.z,
-                                  cur_station.coord_system,
-                                  x,
-                                  y,
-                                  'epsg:' + code[0][0],
-                                  cur_station.description]
-                    export_values.append(value_list)
-
-            columns = ['name',
-                       'network',
-                       'location',
-                       'x',
-                       'y',
-                       'z',
-                       'coord_system',
-                       'x_utm',
-                       'y_utm',
-                       'coord_system_utm',
-                       'description']
-
-            df = pd.DataFrame(export_values,
-                              columns = columns)
-
-        elif level == 'channel':
-            now = UTCDateTime()
-            for cur_network in self.networks:
-                for cur_station in cur_network.stations:
-                    x, y = proj(cur_station.get_lon_lat()[0],
-                                cur_station.get_lon_lat()[1])
-                    for cur_channel in cur_station.channels:
-                        active_streams = cur_channel.get_stream(start_time = now)
-                        for cur_stream in active_streams:
-                            stream_parameter = cur_stream.get_parameter(start_time = now)
-                            component = cur_stream.get_component(start_time = now)
-
-                            stream_parameter = stream_parameter[0]
-                            component = component[0]
-                            comp_parameter = component.get_parameter(start_time = now)
-                            comp_parameter = comp_parameter[0]
-
-                            overall_sensitivity = (stream_parameter.gain * comp_parameter.sensitivity) / stream_parameter.bitweight
-
-                            value_list = [cur_station.name,
-                                          cur_station.network,
-                                          cur_station.location,
-                                          cur_channel.name,
-                                          cur_station.x,
-                                          cur_station.y,
-                                          cur_station.z,
-                                          cur_station.coord_system,
-                                          x,
-                                          y,
-                                          'epsg:' + code[0][0],
-                                          cur_station.description,
-                                          cur_stream.parent_recorder.model,
-                                          cur_stream.parent_recorder.serial,
-                                          stream_parameter.bitweight,
-                                          stream_parameter.gain,
-                                          component.model,
-                                          component.serial,
-                                          comp_parameter.sensitivity,
-                                          overall_sensitivity]
-                            export_values.append(value_list)
-
-            columns = ['name',
-                       'network',
-                       'location',
-                       'channel',
-                       'x',
-                       'y',
-                       'z',
-                       'coord_system',
-                       'x_utm',
-                       'y_utm',
-                       'coord_system_utm',
-                       'description',
-                       'recorder_model',
-                       'recorder_serial',
-                       'adc_bitweight [V/count]',
-                       'adc_preamp_gain',
-                       'sensor_model',
-                       'sensor_serial',
-                       'sensor_sensitivity [V/m/s]',
-                       'overall_sensitivity [count/m/s]']
-        
+        stations = self.get_station()
+        x_utm, y_utm = self.transform_to_utm(self.get_lon_lat(), code)
+        coord_system_utm = 'epsg:' + code[0][0]
+
+        # The dataframe is created from the column data. The coordinates
+        # are passed as float arrays to avoid the dtype inference.
+        n_stations = len(stations)
+        coords = {}
+        for cur_key in ['x', 'y', 'z']:
+            coords[cur_key] = np.fromiter(map(attrgetter(cur_key), stations),
+                                          dtype = np.float64,
+                                          count = n_stations)
+
+        columns = {'name': [x.name for x in stations],
+                   'network': [x.network for x in stations],
+                   'location': [x.location for x in stations],
+                   'x': coords['x'],
+                   'y': coords['y'],
+                   'z': coords['z'],
+                   'coord_system': [x.coord_system for x in stations],
+                   'x_utm': x_utm,
+                   'y_utm': y_utm,
+                   'coord_system_utm': pd.Categorical([coord_system_utm] * n_stations),
+                   'description': [x.description for x in stations]}
+
+        if level == 'channel':
+            # Compare the timestamps instead of the UTCDateTime instances.
+            now = UTCDateTime().timestamp
+            station_ind = []
+            channel_columns = {'channel': [],
+                               'recorder_model': [],
+                               'recorder_serial': [],
+                               'adc_bitweight [V/count]': [],
+                               'adc_preamp_gain': [],
+                               'sensor_model': [],
+                               'sensor_serial': [],
+                               'sensor_sensitivity [V/m/s]': []}
+            for k, cur_station in enumerate(stations):
+                for cur_channel in cur_station.channels:
+                    for cur_stream in get_active_at(cur_channel.streams, now):
+                        stream_parameter = get_active_at(cur_stream.parameters, now)[0]
+                        component = get_active_at(cur_stream.components, now)[0]
+                        comp_parameter = get_active_at(component.parameters, now)[0]
+
+                        station_ind.append(k)
+                        channel_columns['channel'].append(cur_channel.name)
+                        channel_columns['recorder_model'].append(cur_stream.parent_recorder.model)
+                        channel_columns['recorder_serial'].append(cur_stream.parent_recorder.serial)
+                        channel_columns['adc_bitweight [V/count]'].append(stream_parameter.bitweight)
+                        channel_columns['adc_preamp_gain'].append(stream_parameter.gain)
+                        channel_columns['sensor_model'].append(component.model)
+                        channel_columns['sensor_serial'].append(component.serial)
+                        channel_columns['sensor_sensitivity [V/m/s]'].append(comp_parameter.sensitivity)
+
+            # Repeat the station values for each channel row and add the
+            # channel columns after the location.
+            station_ind = np.array(station_ind, dtype = np.intp)
+            station_columns = columns
+            columns = {}
+            for cur_name, cur_values in station_columns.items():
+                if isinstance(cur_values, list):
+                    columns[cur_name] = [cur_values[k] for k in station_ind]
+                else:
+                    columns[cur_name] = cur_values.take(station_ind)
+
+                if cur_name == 'location':
+                    columns['channel'] = channel_columns.pop('channel')
+            columns.update(channel_columns)
 
-            df = pd.DataFrame(export_values,
-                              columns = columns)
+            gain = np.array(columns['adc_preamp_gain'], dtype = np.float64)
+            sensitivity = np.array(columns['sensor_sensitivity [V/m/s]'], dtype = np.float64)
+            bitweight = np.array(columns['adc_bitweight [V/count]'], dtype = np.float64)
+            columns['overall_sensitivity [count/m/s]'] = (gain * sensitivity) / bitweight
+        elif level != 'station':
+            return None
 
-        return df
+        return pd.DataFrame(columns)
 
     
     def to_stationxml(self):
@@ -982,6 +1220,33 @@ class Inventory(object):
         exp_inv = obs_inv.Inventory(networks = [],
                                     source = "psysmon")
 
+        # The equipment type and the response stage description of the
+        # recorder streams and sensor components. The strings are built
+        # only once for each element.
+        labels = {}
+        def get_labels(element):
+            cur_labels = labels.get(id(element), None)
+            if cur_labels is None:
+                cur_labels = (' - '.join((element.producer, element.model)),
+                              ','.join((element.producer, element.model,
+                                        element.serial, element.name)))
+                labels[id(element)] = cur_labels
+            return cur_labels
+
+        # The parameters of the recorder streams and sensor components for
+        # the deployment timespans.
+        parameters = {}
+        def get_parameter(element, start_time, end_time):
+            key = (id(element),
+                   None if start_time is None else start_time.timestamp,
+                   None if end_time is None else end_time.timestamp)
+            cur_parameter = parameters.get(key, None)
+            if cur_parameter is None:
+                cur_parameter = element.get_parameter(start_time = start_time,
+                                                      end_time = end_time)
+                parameters[key] = cur_parameter
+            return cur_parameter
+
         for cur_network in self.networks:
             sx_network = obs_inv.Network(code = cur_network.name,
                                          description = cur_network.description)
@@ -1002,7 +1267,8 @@ class Inventory(object):
                             continue
                         
                         cur_rec_stream = cur_stream_timebox.item
-                        sx_datalogger = obs_inv.Equipment(type = ' - '.join((cur_rec_stream.producer, cur_rec_stream.model)),
+                        rec_type, rec_description = get_labels(cur_rec_stream)
+                        sx_datalogger = obs_inv.Equipment(type = rec_type,
                                                           manufacturer = cur_rec_stream.producer,
                                                           model = cur_rec_stream.model,
                                                           serial_number = cur_rec_stream.serial,
@@ -1011,23 +1277,26 @@ class Inventory(object):
 
                         for cur_comp_timebox in cur_rec_stream.components:
                             cur_component = cur_comp_timebox.item
-                            sx_sensor = obs_inv.Equipment(type = ' - '.join((cur_component.producer, cur_component.model)),
+                            sensor_type, sensor_description = get_labels(cur_component)
+                            sx_sensor = obs_inv.Equipment(type = sensor_type,
                                                           manufacturer = cur_component.producer,
                                                           model = cur_component.model,
                                                           serial_number = cur_component.serial,
                                                           installation_date = cur_comp_timebox.start_time,
                                                           removal_date = cur_comp_timebox.end_time)
 
-                            cur_rec_parameter = cur_rec_stream.get_parameter(start_time = cur_comp_timebox.start_time,
-                                                                             end_time = cur_comp_timebox.end_time)
+                            cur_rec_parameter = get_parameter(cur_rec_stream,
+                                                              start_time = cur_comp_timebox.start_time,
+                                                              end_time = cur_comp_timebox.end_time)
 
                             if len(cur_rec_parameter) > 1:
                                 raise RuntimeError("Currently only one recorder parameter per deployment time is supported.")
                             elif len(cur_rec_parameter) == 1:
                                 cur_rec_parameter = cur_rec_parameter[0]
 
-                            cur_sensor_parameter = cur_component.get_parameter(start_time = cur_comp_timebox.start_time,
-                                                                               end_time = cur_comp_timebox.end_time)
+                            cur_sensor_parameter = get_parameter(cur_component,
+                                                                 start_time = cur_comp_timebox.start_time,
+                                                                 end_time = cur_comp_timebox.end_time)
 
                             if len(cur_sensor_parameter) > 1:
                                 raise RuntimeError("Currently only one sensor parameter per deployment time is supported.")
@@ -1050,10 +1319,7 @@ class Inventory(object):
                                                                                    normalization_factor = cur_sensor_parameter.tf_normalization_factor,
                                                                                    zeros = cur_sensor_parameter.tf_zeros,
                                                                                    poles = cur_sensor_parameter.tf_poles,
-                                                                                   description = ','.join((cur_component.producer,
-                                                                                                           cur_component.model,
-                                                                                                           cur_component.serial,
-                                                                                                           cur_component.name)))
+                                                                                   description = sensor_description)
                                     response.response_stages.append(sensor_stage)
                                     stage_number += 1
                                 else:
@@ -1062,10 +1328,7 @@ class Inventory(object):
                                                                          stage_gain_frequency = stage_frequency,
                                                                          input_units = cur_component.output_unit,
                                                                          output_units = cur_component.deliver_unit,
-                                                                         description = ','.join((cur_component.producer,
-                                                                                                 cur_component.model,
-                                                                                                 cur_component.serial,
-                                                                                                 cur_component.name)))
+                                                                         description = sensor_description)
                                     response.response_stages.append(sensor_stage)
                                     stage_number += 1
 
@@ -1075,10 +1338,7 @@ class Inventory(object):
                                                                        stage_gain_frequency = stage_frequency,
                                                                        input_units = 'V',
                                                                        output_units = 'V',
-                                                                       description = ','.join((cur_rec_stream.producer,
-                                                                                               cur_rec_stream.model,
-                                                                                               cur_rec_stream.serial,
-                                                                                               cur_rec_stream.name)))
+                                                                       description = rec_description)
                                 response.response_stages.append(recorder_stage)
                                 stage_number += 1
 
@@ -1087,10 +1347,7 @@ class Inventory(object):
                                                                          stage_gain_frequency = stage_frequency,
                                                                          input_units = 'V',
                                                                          output_units = 'COUNTS',
-                                                                         description = ','.join((cur_rec_stream.producer,
-                                                                                                 cur_rec_stream.model,
-                                                                                                 cur_rec_stream.serial,
-                                                                                                 cur_rec_stream.name)))
+                                                                         description = rec_description)
                                 response.response_stages.append(decimation_stage)
                                 stage_number += 1
 
@@ -1257,6 +1514,21 @@ class Recorder(object):
         return out
 
 
+    def __setattr__(self, attr, value):
+        ''' Control the attribute assignements.
+        '''
+        self.__dict__[attr] = value
+
+        if self.__dict__.get('parent_inventory', None) is not None:
+            # The serial is the index key of the parent inventory.
+            if attr == 'serial':
+                self.parent_inventory.clear_index('recorders')
+
+            # Propagate the changed flag to the parent inventory.
+            if attr in ['has_changed', 'parent_inventory'] and self.__dict__.get('has_changed', False):
+                self.parent_inventory.mark_changed()
+
+
     def __setitem__(self, name, value):
         self.__dict__[name] = value
         self.has_changed = True 
@@ -1276,6 +1548,13 @@ class Recorder(object):
 
 
 
+    def clear_inventory_cache(self):
+        ''' Clear the stream list cache of the parent inventory.
+        '''
+        if self.parent_inventory is not None:
+            self.parent_inventory.clear_element_cache('streams')
+
+
     def add_stream(self, cur_stream):
         ''' Add a stream to the recorder.
 
@@ -1289,6 +1568,7 @@ class Recorder(object):
             self.streams.append(cur_stream)
             cur_stream.parent_recorder = self
             added_stream = cur_stream
+            self.clear_inventory_cache()
 
         return added_stream
 
@@ -1307,6 +1587,7 @@ class Recorder(object):
             if stream in self.streams:
                 self.streams.remove(stream)
                 removed_stream = stream
+                self.clear_inventory_cache()
 
         return removed_stream
 
@@ -1340,6 +1621,9 @@ class Recorder(object):
             cur_stream.parent_recorder = None
             streams_popped.append(self.streams.pop(self.streams.index(cur_stream)))
 
+        if streams_popped:
+            self.clear_inventory_cache()
+
         return streams_popped
 
 
@@ -1369,12 +1653,7 @@ class Recorder(object):
         ret_stream = self.streams
 
         valid_keys = ['name', 'label', 'agency_uri', 'author_uri']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_stream = [x for x in ret_stream if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_stream = filter_by_attributes(ret_stream, valid_keys, kwargs)
 
         return ret_stream
 
@@ -1709,12 +1988,7 @@ class RecorderStream(object):
         ret_component = self.components
 
         valid_keys = ['serial', 'name']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_component = [x for x in ret_component if getattr(x.item, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_component = filter_by_attributes(ret_component, valid_keys, kwargs)
 
         if start_time is not None:
             ret_component = [x for x in ret_component if (x.end_time is None) or (x.end_time > start_time)]
@@ -2126,6 +2400,21 @@ class Sensor(object):
         self.has_changed = False
 
 
+    def __setattr__(self, attr, value):
+        ''' Control the attribute assignements.
+        '''
+        self.__dict__[attr] = value
+
+        if self.__dict__.get('parent_inventory', None) is not None:
+            # The serial is the index key of the parent inventory.
+            if attr == 'serial':
+                self.parent_inventory.clear_index('sensors')
+
+            # Propagate the changed flag to the parent inventory.
+            if attr in ['has_changed', 'parent_inventory'] and self.__dict__.get('has_changed', False):
+                self.parent_inventory.mark_changed()
+
+
     def __setitem__(self, name, value):
         self.__dict__[name] = value
         self.has_changed = True
@@ -2150,6 +2439,13 @@ class Sensor(object):
         return self.__str__()
 
 
+    def clear_inventory_cache(self):
+        ''' Clear the component list cache of the parent inventory.
+        '''
+        if self.parent_inventory is not None:
+            self.parent_inventory.clear_element_cache('components')
+
+
     def add_component(self, component_to_add):
         ''' Add a component to the sensor.
 
@@ -2167,6 +2463,7 @@ class Sensor(object):
             self.components.append(component_to_add)
             component_to_add.parent_sensor = self
             added_component = component_to_add
+            self.clear_inventory_cache()
 
         return added_component
 
@@ -2192,12 +2489,7 @@ class Sensor(object):
         ret_component = self.components
 
         valid_keys = ['name', 'agency_uri', 'author_uri']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_component = [x for x in ret_component if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_component = filter_by_attributes(ret_component, valid_keys, kwargs)
 
         return ret_component
 
@@ -2221,6 +2513,7 @@ class Sensor(object):
             if component in self.components:
                 self.components.remove(component)
                 removed_component = component
+                self.clear_inventory_cache()
 
         return removed_component
 
@@ -2251,6 +2544,9 @@ class Sensor(object):
             cur_component.parent_recorder = None
             components_popped.append(self.components.pop(self.components.index(cur_component)))
 
+        if components_popped:
+            self.clear_inventory_cache()
+
         return components_popped
 
 
@@ -3184,6 +3480,16 @@ class Station(object):
             return self.end_time.isoformat()
         
 
+    def __setattr__(self, attr, value):
+        ''' Control the attribute assignements.
+        '''
+        self.__dict__[attr] = value
+
+        # Clear the coordinate cache of the parent network.
+        if attr in ['x', 'y', 'coord_system'] and self.__dict__.get('parent_network', None) is not None:
+            self.parent_network.clear_lon_lat_cache()
+
+
     def __setitem__(self, name, value):
         self.logger.debug("Setting the %s attribute to %s.", name, value)
         self.__dict__[name] = value
@@ -3253,13 +3559,17 @@ class Station(object):
         if self.coord_system == dest_sys:
             return(self.x, self.y)
 
-        src_proj = pyproj.Proj(init=self.coord_system)
-        dst_proj = pyproj.Proj(init=dest_sys) 
+        transformer = geom_util.get_transformer(self.coord_system, dest_sys)
+        lon, lat = transformer.transform(self.x, self.y)
+        self.logger.debug('Converting from "%s" to "%s"', self.coord_system, dest_sys)
+        return (lon, lat)
 
 
-        lon, lat = pyproj.transform(src_proj, dst_proj, self.x, self.y)
-        self.logger.debug('Converting from "%s" to "%s"', src_proj.srs, dst_proj.srs)
-        return (lon, lat)
+    def clear_inventory_cache(self):
+        ''' Clear the channel list cache of the parent inventory.
+        '''
+        if self.parent_inventory is not None:
+            self.parent_inventory.clear_element_cache('channels')
 
 
     def add_channel(self, cur_channel):
@@ -3280,6 +3590,7 @@ class Station(object):
             self.channels.append(cur_channel)
             self.has_changed = True
             added_channel = cur_channel
+            self.clear_inventory_cache()
 
         return added_channel
 
@@ -3294,6 +3605,7 @@ class Station(object):
         '''
         if channel in self.channels:
             self.channels.remove(channel)
+            self.clear_inventory_cache()
 
 
 
@@ -3312,12 +3624,7 @@ class Station(object):
         ret_channel = self.channels
 
         valid_keys = ['name']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_channel = [x for x in ret_channel if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_channel = filter_by_attributes(ret_channel, valid_keys, kwargs)
 
         return ret_channel
 
@@ -3861,6 +4168,9 @@ class Network(object):
         ## The stations contained in the network.
         self.stations = []
 
+        # The cached WGS84 coordinates of the stations.
+        self.lon_lat_cache = None
+
         # Indicates if the attributes have been changed.
         self.has_changed = False
 
@@ -3884,6 +4194,14 @@ class Network(object):
 
         self.__dict__['has_changed'] = True
 
+        if self.__dict__.get('parent_inventory', None) is not None:
+            # The name is the index key of the parent inventory.
+            if attr == 'name':
+                self.parent_inventory.clear_index('networks')
+
+            # Propagate the changed flag to the parent inventory.
+            self.parent_inventory.mark_changed()
+
 
     def __eq__(self, other):
         if type(self) is type(other):
@@ -3949,12 +4267,61 @@ class Network(object):
         if((station.name, station.location) not in available_sl):
             station.parent_network = self
             self.stations.append(station)
+            self.clear_lon_lat_cache()
+            self.clear_inventory_cache()
             return station
         else:
             self.logger.error("The station with SL code %s is already in the network.", station.name + ':' + station.location)
             return None
 
 
+    def get_lon_lat(self):
+        ''' Get the WGS84 coordinates of the stations.
+
+        The coordinates are cached until a station is added, removed or
+        its coordinates are changed.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The longitude and latitude of the stations. The rows are
+            ordered like the stations of the network.
+        '''
+        if self.lon_lat_cache is None:
+            lon_lat = np.array([(x.x, x.y) for x in self.stations],
+                               dtype = np.float64).reshape(-1, 2)
+
+            # Transform the stations of each coordinate system with a
+            # single call.
+            coord_systems = {}
+            for k, cur_station in enumerate(self.stations):
+                coord_systems.setdefault(cur_station.coord_system, []).append(k)
+            coord_systems.pop('epsg:4326', None)
+            for cur_coord_system, cur_ind in coord_systems.items():
+                transformer = geom_util.get_transformer(cur_coord_system, 'epsg:4326')
+                lon, lat = transformer.transform(lon_lat[cur_ind, 0], lon_lat[cur_ind, 1])
+                lon_lat[cur_ind, 0] = lon
+                lon_lat[cur_ind, 1] = lat
+
+            lon_lat.flags.writeable = False
+            # Bypass the attribute change tracking.
+            self.__dict__['lon_lat_cache'] = lon_lat
+        return self.lon_lat_cache
+
+
+    def clear_lon_lat_cache(self):
+        ''' Clear the cached WGS84 coordinates of the stations.
+        '''
+        self.__dict__['lon_lat_cache'] = None
+
+
+    def clear_inventory_cache(self):
+        ''' Clear the station list cache of the parent inventory.
+        '''
+        if self.parent_inventory is not None:
+            self.parent_inventory.clear_element_cache('stations')
+
+
     def remove_station_by_instance(self, station_to_remove):
         ''' Remove a station instance from the network.
 
@@ -3963,6 +4330,8 @@ class Network(object):
         '''
         if station_to_remove in self.stations:
             self.stations.remove(station_to_remove)
+            self.clear_lon_lat_cache()
+            self.clear_inventory_cache()
 
 
     def remove_station(self, name, location):
@@ -3990,6 +4359,8 @@ class Network(object):
         elif len(station_2_remove) == 1:
             station_2_remove = station_2_remove[0]
             self.stations.remove(station_2_remove)
+            self.clear_lon_lat_cache()
+            self.clear_inventory_cache()
             station_2_remove.network = None
             station_2_remove.parent_network = None
             removed_station = station_2_remove
@@ -4024,12 +4395,7 @@ class Network(object):
         ret_station = self.stations
 
         valid_keys = ['name', 'network', 'location', 'id', 'snl', 'snl_string']
-
-        for cur_key, cur_value in kwargs.items():
-            if cur_key in valid_keys:
-                ret_station = [x for x in ret_station if getattr(x, cur_key) == cur_value]
-            else:
-                warnings.warn('Search attribute %s is not existing.' % cur_key, RuntimeWarning)
+        ret_station = filter_by_attributes(ret_station, valid_keys, kwargs)
 
         return ret_station
 
@@ -4147,6 +4513,10 @@ class Array(object):
 
         self.__dict__['has_changed'] = True
 
+        # The name is the index key of the parent inventory.
+        if attr == 'name' and self.__dict__.get('parent_inventory', None) is not None:
+            self.parent_inventory.clear_index('arrays')
+
 
     def __eq__(self, other):
         if type(self) is type(other):
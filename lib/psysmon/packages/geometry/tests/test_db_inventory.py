@@ -1118,6 +1118,29 @@ class DbInventoryTestCase(unittest.TestCase):
         db_inventory.close()
 
 
+    def test_commit_clears_changed(self):
+        db_inventory = DbInventory(self.project)
+
+        try:
+            rec_2_add = Recorder(serial = 'AAAA',
+                                 model = 'recorder1_model',
+                                 producer = 'recorder1_producer')
+            added_recorder = db_inventory.add_recorder(rec_2_add)
+            db_inventory.add_network(Network(name = 'XX'))
+            self.assertTrue(db_inventory.has_changed())
+
+            db_inventory.commit()
+            self.assertFalse(db_inventory.has_changed())
+
+            added_recorder['model'] = 'changed model'
+            self.assertTrue(db_inventory.has_changed())
+
+            db_inventory.commit()
+            self.assertFalse(db_inventory.has_changed())
+        finally:
+            db_inventory.close()
+
+
     def test_xml_to_db_inventory(self):
         xml_file = os.path.join(self.data_path, 'simple_inventory.xml')
         xml_parser = InventoryXmlParser()
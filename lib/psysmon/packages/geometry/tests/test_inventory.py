@@ -175,6 +175,122 @@ class InventoryTestCase(unittest.TestCase):
 
 
 
+    def test_inventory_index(self):
+        inventory = Inventory('inventory_name')
+
+        network1 = Network(name = 'XX')
+        network2 = Network(name = 'YY')
+        inventory.add_network(network1)
+        inventory.add_network(network2)
+        self.assertEqual(inventory.get_network(name = 'XX'), [network1])
+
+        # Add an element to an existing index.
+        network3 = Network(name = 'ZZ')
+        inventory.add_network(network3)
+        self.assertEqual(inventory.get_network(name = 'ZZ'), [network3])
+        self.assertIsNone(inventory.add_network(Network(name = 'ZZ')))
+        self.assertEqual(len(inventory.networks), 3)
+
+        # Rename an element.
+        network1.name = 'AA'
+        self.assertEqual(inventory.get_network(name = 'XX'), [])
+        self.assertEqual(inventory.get_network(name = 'AA'), [network1])
+
+        # Remove an element.
+        inventory.remove_network(name = 'YY')
+        self.assertEqual(inventory.get_network(name = 'YY'), [])
+
+        recorder1 = Recorder(serial = 'AAAA', model = 'test_model',
+                             producer = 'test_producer')
+        inventory.add_recorder(recorder1)
+        self.assertEqual(inventory.get_recorder(serial = 'AAAA'), [recorder1])
+        self.assertEqual(inventory.get_recorder(serial = 'AAAA',
+                                                model = 'other_model'), [])
+        recorder1.serial = 'BBBB'
+        self.assertEqual(inventory.get_recorder(serial = 'AAAA'), [])
+        self.assertEqual(inventory.get_recorder(serial = 'BBBB'), [recorder1])
+
+
+
+    def test_inventory_equality(self):
+        inventory1 = Inventory('inventory_name')
+        inventory2 = Inventory('inventory_name')
+        for cur_name in ['XX', 'YY']:
+            inventory1.add_network(Network(name = cur_name))
+        for cur_name in ['YY', 'XX']:
+            inventory2.add_network(Network(name = cur_name))
+        self.assertEqual(inventory1, inventory2)
+
+        inventory2.add_network(Network(name = 'ZZ'))
+        self.assertNotEqual(inventory1, inventory2)
+
+        inventory1.add_network(Network(name = 'AA'))
+        self.assertNotEqual(inventory1, inventory2)
+
+        # Recorders with duplicate serials.
+        inventory1 = Inventory('inventory_name')
+        inventory2 = Inventory('inventory_name')
+        for cur_model in ['model_a', 'model_b']:
+            inventory1.recorders.append(Recorder(serial = 'AAAA',
+                                                 model = cur_model,
+                                                 producer = 'producer'))
+        for cur_model in ['model_b', 'model_a']:
+            inventory2.recorders.append(Recorder(serial = 'AAAA',
+                                                 model = cur_model,
+                                                 producer = 'producer'))
+        self.assertEqual(inventory1, inventory2)
+
+        inventory2.recorders[0].model = 'model_a'
+        self.assertNotEqual(inventory1, inventory2)
+
+
+
+    def test_inventory_has_changed(self):
+        inventory = Inventory('inventory_name')
+        recorder = Recorder(serial = 'AAAA', model = 'test_model',
+                            producer = 'test_producer')
+        inventory.add_recorder(recorder)
+        self.assertFalse(inventory.has_changed())
+
+        recorder['model'] = 'other_model'
+        self.assertTrue(inventory.has_changed())
+
+        inventory.clear_changed()
+        self.assertFalse(inventory.has_changed())
+
+        inventory.add_network(Network(name = 'XX'))
+        self.assertTrue(inventory.has_changed())
+
+
+
+    def test_network_lon_lat(self):
+        network = Network(name = 'XX')
+        station1 = Station(name = 'station1_name',
+                           location = '00',
+                           x = 15.5,
+                           y = 47.5,
+                           z = 300,
+                           coord_system = 'epsg:4326')
+        network.add_station(station1)
+        self.assertEqual(network.get_lon_lat().tolist(), [[15.5, 47.5]])
+
+        station2 = Station(name = 'station2_name',
+                           location = '00',
+                           x = 16.,
+                           y = 48.,
+                           z = 300,
+                           coord_system = 'epsg:4326')
+        network.add_station(station2)
+        self.assertEqual(network.get_lon_lat().tolist(), [[15.5, 47.5], [16., 48.]])
+
+        station1.x = 15.
+        self.assertEqual(network.get_lon_lat().tolist(), [[15., 47.5], [16., 48.]])
+
+        network.remove_station_by_instance(station2)
+        self.assertEqual(network.get_lon_lat().tolist(), [[15., 47.5]])
+
+
+
     def test_add_sensor_to_inventory(self):
         inventory = Inventory('inventory_name')
 
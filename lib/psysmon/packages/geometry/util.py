@@ -29,6 +29,7 @@ The geometry util module.
 
 This module contains helper functions used in the geometry package.
 '''
+import functools
 
 
 def lon2UtmZone(lon):
@@ -72,13 +73,15 @@ def epsg_from_srs(srs):
             return v
 
 
+@functools.lru_cache(maxsize = 1)
 def get_epsg_dict():
     ''' Create a dictionary for mapping proj projection arguments to epsg codes.
 
     This function is a modified version of the one included in mpl_toolkits.basemap.
     It reads the epsg file in the matplotlib data directory and creates a dictionary 
     with the epsg codes as the keys and the responding proj projection arguments as 
-    the values.
+    the values. The file is read only once, the returned dictionary is shared
+    and must not be changed.
     '''
     # create dictionary that maps epsg codes to Basemap kwargs.
     import os
@@ -135,6 +138,63 @@ def get_epsg_dict():
     return epsg_dict
 
 
+@functools.lru_cache(maxsize = 1)
+def get_epsg_reverse_dict():
+    ''' Create a dictionary for mapping proj projection arguments to epsg codes.
+
+    The keys are the frozen sets of the projection argument items of
+    :func:`get_epsg_dict`, the values are the lists of the matching epsg
+    codes.
+    '''
+    reverse_dict = {}
+    for code, kw_args in get_epsg_dict().items():
+        reverse_dict.setdefault(frozenset(kw_args.items()), []).append(code)
+    return reverse_dict
+
+
+def get_epsg_code(search_dict):
+    ''' Get the epsg codes matching the proj projection arguments.
+
+    Parameters
+    ----------
+    search_dict : dict
+        The proj projection arguments.
+
+    Returns
+    -------
+    :obj:`list` of :obj:`tuple`
+        The matching epsg codes and their projection arguments
+        (code, projection arguments).
+    '''
+    epsg_dict = get_epsg_dict()
+    codes = get_epsg_reverse_dict().get(frozenset(search_dict.items()), [])
+    return [(c, epsg_dict[c]) for c in codes]
+
+
+@functools.lru_cache(maxsize = 16)
+def get_transformer(src_crs, dst_crs):
+    ''' Get a coordinate transformer between two coordinate systems.
+
+    The transformers are cached, so the PROJ initialization is done only
+    once for each pair of coordinate systems.
+
+    Parameters
+    ----------
+    src_crs : str
+        The source coordinate system (e.g. 'epsg:4326').
+
+    dst_crs : str
+        The destination coordinate system.
+
+    Returns
+    -------
+    :class:`pyproj.Transformer`
+        The transformer using the x, y (longitude, latitude) axis order.
+    '''
+    import pyproj
+    return pyproj.Transformer.from_crs(src_crs, dst_crs, always_xy = True)
+
+
 ellipsoids = {}
 ellipsoids['wgs84'] = (6378137, 6356752.314245179)
 
@@ -17,6 +17,7 @@ from psysmon.core.test_util import create_psybase
 from psysmon.core.test_util import create_full_project
 from psysmon.core.test_util import drop_project_database_tables
 from psysmon.core.test_util import remove_project_filestructure
+from psysmon.core.test_util import sql_echo
 
 from psysmon.packages.pick.core import Pick
 from psysmon.packages.geometry.db_inventory import DbChannel
@@ -100,7 +101,7 @@ class PickTestCase(unittest.TestCase):
                     time = pick_time,
                     amp1 = 10,
                     channel = channel)
-        self.project.dbEngine.echo = True
+        self.project.dbEngine.echo = sql_echo
         pick.write_to_database(self.project)
 
         db_event_orm = self.project.dbTables['pick']
@@ -127,7 +128,7 @@ class PickTestCase(unittest.TestCase):
                     time = pick_time,
                     amp1 = 10,
                     channel = channel)
-        self.project.dbEngine.echo = True
+        self.project.dbEngine.echo = sql_echo
         pick.write_to_database(self.project)
         db_id = pick.db_id
 
@@ -161,7 +162,7 @@ class PickTestCase(unittest.TestCase):
                     time = pick_time,
                     amp1 = 10,
                     channel = channel)
-        self.project.dbEngine.echo = True
+        self.project.dbEngine.echo = sql_echo
         pick.write_to_database(self.project)
 
         pick_orm_class = self.project.dbTables['pick']
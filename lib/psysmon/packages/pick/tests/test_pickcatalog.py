@@ -43,6 +43,7 @@ from psysmon.core.test_util import create_psybase
 from psysmon.core.test_util import create_full_project
 from psysmon.core.test_util import drop_project_database_tables
 from psysmon.core.test_util import remove_project_filestructure
+from psysmon.core.test_util import sql_echo
 
 import psysmon.packages.pick.core as pick_core
 
@@ -64,7 +65,7 @@ class PickCatalogTestCase(unittest.TestCase):
         # Create an empty project.
         cls.psybase = create_psybase()
         cls.project = create_full_project(cls.psybase)
-        cls.project.dbEngine.echo = True
+        cls.project.dbEngine.echo = sql_echo
 
     @classmethod
     def tearDownClass(cls):
@@ -367,8 +367,7 @@ class SourceMap(object):
         search_dict = {'projection': 'utm', 'ellps': self.map_config['ellips'].upper(), 'zone': self.map_config['utmZone'], 'no_defs': True, 'units': 'm'}
         if self.map_config['hemisphere'] == 'south':
             search_dict['south'] = True
-        epsg_dict = geom_util.get_epsg_dict()
-        code = [(c, x) for c, x in list(epsg_dict.items()) if  x == search_dict]
+        code = geom_util.get_epsg_code(search_dict)
 
         self.map_config['epsg'] = 'epsg:'+code[0][0]
 
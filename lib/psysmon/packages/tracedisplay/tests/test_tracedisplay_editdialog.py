@@ -28,6 +28,7 @@ from psysmon.core.test_util import create_full_project
 from psysmon.core.test_util import drop_project_database_tables
 from psysmon.core.test_util import remove_project_filestructure
 from psysmon.core.test_util import clean_unittest_database
+from psysmon.core.test_util import sql_echo
 import psysmon.core.gui as psygui
 import psysmon.gui.main.app as psy_app
 
@@ -48,7 +49,7 @@ class TracedisplayEditDialogTestCase(unittest.TestCase):
         cls.psybase = create_psybase()
         create_full_project(cls.psybase)
         cls.project = cls.psybase.project
-        cls.project.dbEngine.echo = True
+        cls.project.dbEngine.echo = sql_echo
 
 
     @classmethod
@@ -54,7 +54,8 @@ def create_ext_modules():
     
     # LIBSIGNAL
     path = os.path.join(root_dir, 'core', 'src')
-    files = [os.path.join(path, 'moving_average.c'), ]
+    files = [os.path.join(path, 'moving_average.c'),
+             os.path.join(path, 'sta_lta.c')]
     cur_ext = Extension(name = get_lib_name('signal'),
                         sources = files)
     ext_list.append(cur_ext)